@@ -2,6 +2,7 @@ import traceback
 from quart import Blueprint, jsonify, request
 from quart_auth import login_required, current_user
 from src.extensions import AsyncSession
+from src.services.league.league_metrics_service import LeagueMetricsService
 from src.services.league.league_service import LeagueService
 from src.utils.api_response import ApiResponse
 
@@ -82,6 +83,16 @@ async def league_analytics_route(league_id: str):
         traceback.print_exc()
         return await ApiResponse.error(e)
     
+@league_bp.get('/<league_id>/player-metrics')
+async def league_player_metrics_route(league_id: str):
+    try:
+        league_category_id = request.args.get("category")
+        result = await LeagueMetricsService().get_league_metrics(league_id, league_category_id)
+        return await ApiResponse.payload(result)
+    except Exception as e:
+        traceback.print_exc()
+        return await ApiResponse.error(e)
+
 @league_bp.post('/create-new')
 @login_required
 async def create_new_league_route():
@@ -5,11 +5,13 @@ from quart_auth import login_required, current_user
 from src.utils.api_response import ApiResponse, ApiException
 from src.utils.rate_limiter import rate_limit, login_limit
 from src.services.league_staff_service import LeagueStaffService
+from src.services.match.scorebook_sync_service import ScorebookSyncService
 from quart_jwt_extended import jwt_required, get_jwt_identity
 
 league_staff_bp = Blueprint("league_staff", __name__, url_prefix="/league-staff")
 
 service = LeagueStaffService()
+sync_service = ScorebookSyncService()
 
 STAFF_COOKIE_KEY = "STAFF_ACCESS_TOKEN"
 
@@ -194,4 +196,18 @@ async def get_current_staff_route():
             })
     except Exception as e:
         traceback.print_exc()
-        return await ApiResponse.error(e)
\ No newline at end of file
+        return await ApiResponse.error(e)
+
+@league_staff_bp.post("/sync")
+@jwt_required
+async def sync_scorebook_route():
+    try:
+        data = await request.get_json()
+        if not data or not isinstance(data.get("matches"), list):
+            raise ApiException("matches is required", 400)
+
+        result = await sync_service.sync(data, staff_id=get_jwt_identity())
+        return await ApiResponse.payload(result)
+    except Exception as e:
+        traceback.print_exc()
+        return await ApiResponse.error(e)
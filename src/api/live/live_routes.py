@@ -0,0 +1,91 @@
+import asyncio
+import json
+import traceback
+from quart import Blueprint, make_response, request
+from src.extensions import settings
+from src.services.live.live_stream_hub import LiveStreamHub
+from src.services.live.viewer_presence import ViewerPresenceService
+from src.services.redis_service import RedisService
+from src.utils.api_response import ApiResponse
+
+live_bp = Blueprint('live', __name__, url_prefix='/live')
+
+presence = ViewerPresenceService()
+stream_hub = LiveStreamHub()
+
+@live_bp.get('/matches/<league_match_id>/viewers')
+async def get_match_viewers_route(league_match_id: str):
+    try:
+        result = await presence.get_match_counts(league_match_id)
+        return await ApiResponse.payload(result)
+    except Exception as e:
+        traceback.print_exc()
+        return await ApiResponse.error(e)
+
+@live_bp.get('/leagues/<league_id>/viewers')
+async def get_league_viewers_route(league_id: str):
+    try:
+        result = await presence.get_league_counts(league_id)
+        return await ApiResponse.payload(result)
+    except Exception as e:
+        traceback.print_exc()
+        return await ApiResponse.error(e)
+
+def _sse(event: str, data, event_id: int | None = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+@live_bp.get('/<room>/stream')
+async def stream_live_match_route(room: str):
+    # note: read-only spectator feed, same event log as the /live namespace
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    last_seq = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    keepalive = settings.get("live_sse_keepalive_seconds", 15)
+
+    async def generate():
+        queue = stream_hub.subscribe(room)
+        try:
+            sent_seq = None
+            resume_from = last_seq
+            while True:
+                payload = await RedisService().get_resume_payload(room, resume_from)
+                if payload["snapshot"] is not None or resume_from is None:
+                    yield _sse("snapshot", {
+                        "seq": payload["snapshot_seq"] or 0,
+                        "state": payload["snapshot"],
+                    }, payload["snapshot_seq"] or 0)
+                for event in payload["events"]:
+                    yield _sse(event["type"], event["data"], event["seq"])
+                if payload["clock"]:
+                    yield _sse("clock", payload["clock"])
+                sent_seq = payload["seq"]
+
+                while True:
+                    try:
+                        event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                    except asyncio.TimeoutError:
+                        yield ": keepalive\n\n"
+                        continue
+
+                    if event is LiveStreamHub.LAGGING:
+                        resume_from = sent_seq
+                        break
+                    if event["type"] == "clock":
+                        yield _sse("clock", event["data"])
+                    elif event["seq"] > sent_seq:
+                        sent_seq = event["seq"]
+                        yield _sse(event["type"], event["data"], event["seq"])
+        finally:
+            stream_hub.unsubscribe(room, queue)
+
+    response = await make_response(generate())
+    response.timeout = None
+    response.mimetype = "text/event-stream"
+    # note: resumes differ per client, fresh connects can be coalesced by a caching proxy
+    response.headers["Cache-Control"] = f"public, max-age={settings.get('live_sse_cache_seconds', 1)}, no-transform"
+    response.headers["Vary"] = "Last-Event-ID"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
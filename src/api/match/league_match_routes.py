@@ -26,12 +26,25 @@ async def get_all_matches(user_id: str):
 async def finalize_one_match_route(league_match_id: str):
     try:
         data = await request.get_json()
-        result = await service.finalize_match_result(league_match_id,data)
+        result = await service.finalize_match_result(
+            league_match_id,
+            data,
+            idempotency_key=request.headers.get("Idempotency-Key"),
+        )
         return await ApiResponse.success(message=result)
     except Exception as e:
         traceback.print_exc()
         return await ApiResponse.error(e)
 
+@league_match_bp.get('/<league_match_id>/box-score')
+async def get_box_score_route(league_match_id: str):
+    try:
+        result = await service.get_box_score(league_match_id)
+        return await ApiResponse.payload(result)
+    except Exception as e:
+        traceback.print_exc()
+        return await ApiResponse.error(e)
+
 @league_match_bp.put('/<league_round_id>')
 async def get_update_one_route(league_round_id: str):
     try:
@@ -29,7 +29,12 @@ async def send_message_route():
 @message_bp.get('/conversations/<user_id>')
 async def get_conversations_route(user_id: str):
     try:
-        conversations = await service.get_conversations(user_id)
+        conversations = await service.get_conversations(
+            user_id,
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", type=int),
+            since=request.args.get("since"),
+        )
         return await ApiResponse.payload(conversations)
     except Exception as e:
         traceback.print_exc()
@@ -27,4 +27,42 @@ async def delete_one_router(nofification_id: str):
         return await ApiResponse.success(message=result)
     except Exception as e:
         traceback.print_exc()
-        return await ApiResponse.error(e)
\ No newline at end of file
+        return await ApiResponse.error(e)
+        
+@notification_bp.get('/<user_id>')
+async def get_notifications_route(user_id: str):
+    try:
+        result = await service.get_notifications(
+            user_id,
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", type=int),
+        )
+        
+        return await ApiResponse.payload({
+            **result,
+            "notifications": [n.to_json() for n in result["notifications"]],
+        })
+    except Exception as e:
+        traceback.print_exc()
+        return await ApiResponse.error(e)
+    
+@notification_bp.get('/<user_id>/unread-count')
+async def get_unread_count_route(user_id: str):
+    try:
+        result = await service.get_unread_count(user_id)
+        
+        return await ApiResponse.payload({"unread_count": result})
+    except Exception as e:
+        traceback.print_exc()
+        return await ApiResponse.error(e)
+    
+@notification_bp.put('/<user_id>/mark-read')
+async def mark_read_route(user_id: str):
+    try:
+        data = await request.get_json(silent=True) or {}
+        updated = await service.mark_read(user_id, data.get("notification_ids"))
+        
+        return await ApiResponse.success(message=f"{updated} notifications marked as read")
+    except Exception as e:
+        traceback.print_exc()
+        return await ApiResponse.error(e)
@@ -1,6 +1,7 @@
 import traceback
 from quart import Blueprint
 from src.services.scheduler.job_wrapper import monitor_match_status_wrapper
+from src.services.scheduler.match_reminders import MatchReminderService
 from src.utils.api_response import ApiException, ApiResponse
 
 scheduler_bp = Blueprint('scheduler', __name__, url_prefix='/scheduler')
@@ -15,7 +16,7 @@ async def add_test_job():
         print(f"Test job executed at {datetime.datetime.now()}")
 
     trigger = IntervalTrigger(seconds=5)
-    scheduler_manager.add_job(test_job, job_id="test_job", trigger=trigger)
+    scheduler_manager.add_job(test_job, job_id="test_job", trigger=trigger, persistent=False)
 
     return {"status": "job_added"}, 200
 
@@ -31,4 +32,47 @@ async def add_match_monitor_job(league_match_id: str):
 
     except Exception as e:
         traceback.print_exc()
-        return await ApiResponse.error(e)
\ No newline at end of file
+        return await ApiResponse.error(e)
+
+@scheduler_bp.get('/reminders')
+async def reminder_queue_stats():
+    try:
+        result = await MatchReminderService().pending_count()
+        return await ApiResponse.payload(result)
+    except Exception as e:
+        traceback.print_exc()
+        return await ApiResponse.error(e)
+
+@scheduler_bp.get('/workers')
+async def worker_stats():
+    from src.container import cluster_worker
+    try:
+        return await ApiResponse.payload({
+            "identity": cluster_worker.identity,
+            "mode": cluster_worker.mode,
+            "is_leader": cluster_worker.is_leader,
+            "partitioner": cluster_worker.partitioner.get_stats() if cluster_worker.partitioner else None,
+        })
+    except Exception as e:
+        traceback.print_exc()
+        return await ApiResponse.error(e)
+
+@scheduler_bp.get('/outbox')
+async def outbox_stats():
+    from src.services.notification_outbox_service import NotificationOutboxService
+    try:
+        result = await NotificationOutboxService().get_stats()
+        return await ApiResponse.payload(result)
+    except Exception as e:
+        traceback.print_exc()
+        return await ApiResponse.error(e)
+
+@scheduler_bp.get('/digests')
+async def digest_stats():
+    from src.services.notification_digest_service import NotificationDigestService
+    try:
+        result = await NotificationDigestService().get_stats()
+        return await ApiResponse.payload(result)
+    except Exception as e:
+        traceback.print_exc()
+        return await ApiResponse.error(e)
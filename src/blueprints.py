@@ -24,6 +24,7 @@ from src.api.ai_automatch_routes import auto_matcher_bp
 from src.api.scheduler import scheduler_bp
 from src.api.test import test_bp
 from src.api.league_admin_staff_route import league_staff_bp
+from src.api.live.live_routes import live_bp
 
 all_blueprints = [
     static_data_bp,
@@ -51,5 +52,6 @@ all_blueprints = [
     auto_matcher_bp,
     scheduler_bp,
     test_bp,
-    league_staff_bp
+    league_staff_bp,
+    live_bp
 ]
\ No newline at end of file
@@ -14,5 +14,25 @@ if __name__ == "__main__":
         alembic_cmd("revision", "--autogenerate", "-m", sys.argv[2] if len(sys.argv) > 2 else "update")
     elif cmd == "migrate":
         alembic_cmd("upgrade", "head")
+    elif cmd == "backfill-player-stats":
+        import asyncio
+        from src.services.match.player_match_stats_service import PlayerMatchStatsService
+
+        chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+        total = asyncio.run(PlayerMatchStatsService().backfill(chunk_size))
+        print(f"Backfilled {total} player match stat lines")
+    elif cmd == "schedule-reminders":
+        import asyncio
+        from src.services.scheduler.match_reminders import MatchReminderService
+
+        total = asyncio.run(MatchReminderService().schedule_upcoming())
+        print(f"Queued reminders for {total} scheduled matches")
+    elif cmd == "subscribe-fcm-topics":
+        import asyncio
+        from src.services.fcm_topic_service import FcmTopicService
+
+        chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+        total = asyncio.run(FcmTopicService().backfill(chunk_size))
+        print(f"Subscribed {total} tokens to their team topics")
     else:
-        print("Usage: python cli.py [makemigration 'msg' | migrate]")
+        print("Usage: python -m src.cli [makemigration 'msg' | migrate | backfill-player-stats [chunk_size] | schedule-reminders | subscribe-fcm-topics [chunk_size]]")
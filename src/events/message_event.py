@@ -2,6 +2,7 @@ import time
 import socketio
 import traceback
 from src.services.message_service import MessageService
+from src.services.user_presence_service import UserPresenceService
 
 class MessageEvent:
     def __init__(self, sio: socketio.AsyncServer, message_service: MessageService):
@@ -32,6 +33,7 @@ class MessageEvent:
                     room = f"user:{user_id}"
                     await self.sio.enter_room(sid, room)
                     await self.sio.save_session(sid, {'user_id': user_id})
+                    await UserPresenceService().join(sid, UserPresenceService.CHAT_ROOM, user_id)
                     await self.sio.emit('joined_room', {
                         'room': room,
                         'status': 'success'
@@ -65,10 +67,15 @@ class MessageEvent:
                 room = f"user:{user_id}"
                 await self.sio.enter_room(sid, room)
                 
-                conversations = await self.message_service.get_conversations(user_id)
+                result = await self.message_service.get_conversations(
+                    user_id,
+                    cursor=data.get('cursor'),
+                    limit=data.get('limit'),
+                    since=data.get('since'),
+                )
                 
                 await self.sio.emit('conversations', {
-                    'conversations': conversations,
+                    **result,
                     'user_id': user_id,
                     'timestamp': time.time()
                 }, room=sid)
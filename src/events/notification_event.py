@@ -2,6 +2,7 @@ import socketio
 import traceback
 import time
 from src.services.notification_service import NotificationService
+from src.services.user_presence_service import UserPresenceService
 
 class NotificationEvent:
     def __init__(self, sio: socketio.AsyncServer, notification_service: NotificationService):
@@ -24,6 +25,7 @@ class NotificationEvent:
                 room = f"notify:{user_id}"
                 await self.sio.enter_room(sid, room)
                 await self.sio.save_session(sid, {"user_id": user_id})
+                await UserPresenceService().join(sid, UserPresenceService.NOTIFY_ROOM, user_id)
 
                 await self.sio.emit("joined_notification_room", {
                     "room": room,
@@ -50,10 +52,14 @@ class NotificationEvent:
                     }, room=sid)
                     return
 
-                notifications = await self.notification_service.get_notifications(user_id)
+                page = await self.notification_service.get_notifications(
+                    user_id, cursor=data.get("cursor"), limit=data.get("limit")
+                )
 
                 await self.sio.emit("notifications", {
-                    "notifications": [n.to_json() for n in notifications],
+                    "notifications": [n.to_json() for n in page["notifications"]],
+                    "next_cursor": page["next_cursor"],
+                    "unread_count": page["unread_count"],
                     "timestamp": time.time()
                 }, room=sid)
 
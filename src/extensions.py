@@ -51,7 +51,7 @@ async def db_session():
     finally:
         await session.close()
 
-socket_service = SocketIOService(redis_url=Config.REDIS_URL)
+socket_service = SocketIOService(redis_url=Config.REDIS_URL, shards=settings.get("socketio_shards", 0))
 sio = socket_service.sio 
 
 firebase_creds_json = os.environ.get('FIREBASE_CREDENTIALS')
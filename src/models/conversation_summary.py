@@ -0,0 +1,76 @@
+import inspect
+from src.extensions import Base
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint, literal_column, text
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from typing import Optional
+from src.utils.db_utils import UpdatedAt, UUIDGenerator
+
+# note: id of the writing transaction, set on every insert and update of a summary. Incremental
+# sync orders by it and only returns rows below the oldest transaction still running, so a
+# change that commits late is never skipped, whatever the order of commits or worker clocks
+CURRENT_XID = literal_column("pg_current_xact_id()::text::bigint")
+SNAPSHOT_XMIN = literal_column("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+# note: one row per user and chat partner, the chat inbox is served from here instead of
+# the messages table, partner name and image are copied on every new message
+class ConversationSummaryModel(Base):
+    __tablename__ = "conversation_summaries_table"
+
+    conversation_summary_id: Mapped[str] = UUIDGenerator("conversation")
+
+    owner_id: Mapped[str] = mapped_column(
+        ForeignKey("users_table.user_id", ondelete="CASCADE"),
+        nullable=False
+    )
+    partner_id: Mapped[str] = mapped_column(
+        ForeignKey("users_table.user_id", ondelete="CASCADE"),
+        nullable=False
+    )
+    partner_entity_id: Mapped[str] = mapped_column(String, nullable=False)
+    partner_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    partner_image_url: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # note: all null once every message of the conversation is deleted, the row stays so
+    # incremental sync can tell the client
+    last_message_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    last_message_sender_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    last_message_content: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    last_message_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    unread_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_read_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    updated_at: Mapped[datetime] = UpdatedAt()
+    change_xid: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text("pg_current_xact_id()::text::bigint"))
+
+    __table_args__ = (
+        UniqueConstraint("owner_id", "partner_id", name="uq_conversation_summaries_owner_partner"),
+        Index("ix_conversation_summaries_owner_last_message", "owner_id", "last_message_at", "conversation_summary_id"),
+        Index("ix_conversation_summaries_owner_change_xid", "owner_id", "change_xid", "conversation_summary_id"),
+    )
+
+    def to_json(self) -> dict:
+        return {
+            "conversation_with": {
+                "user_id": self.partner_id,
+                "entity_id": self.partner_entity_id,
+                "name": self.partner_name,
+                "image_url": self.partner_image_url,
+            },
+            "last_message": {
+                "message_id": self.last_message_id,
+                "sender_id": self.last_message_sender_id,
+                "content": self.last_message_content,
+                "sent_at": self.last_message_at.isoformat(),
+            } if self.last_message_id else None,
+            "unread_count": self.unread_count,
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+_current_module = globals()
+__all__ = [
+    name for name, obj in _current_module.items()
+    if not name.startswith("_")
+    and (inspect.isclass(obj) or inspect.isfunction(obj))
+]
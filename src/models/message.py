@@ -1,5 +1,4 @@
 from __future__ import annotations
-from asyncio import to_thread
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from src.models.user import UserModel
@@ -11,7 +10,6 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 import inspect
 from src.extensions import Base
-from firebase_admin import messaging
 
 class MessageModel(Base):
     __tablename__ = "messages_table"
@@ -71,22 +69,6 @@ class MessageModel(Base):
             'content': self.content,
             'sent_at': self.sent_at.isoformat(),
         }
-        
-    async def send_notification(self, enable: bool = False):
-        receiver_token = getattr(self.receiver, "fcm_token", None)
-        
-        if enable and receiver_token:
-            print("Sending Notification")
-            message = messaging.Message(
-                notification=messaging.Notification(
-                    title=f"From: {self.sender_name}",
-                    body=self.content
-                ),
-                token=receiver_token
-            )
-            await to_thread(messaging.send, message)
-            
-        return self
 
 _current_module = globals()
 __all__ = [
@@ -7,7 +7,7 @@ if TYPE_CHECKING:
     
 from datetime import datetime
 import inspect
-from sqlalchemy import String, ForeignKey, Enum as SqlEnum
+from sqlalchemy import Index, String, ForeignKey, UniqueConstraint, Enum as SqlEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.extensions import Base
 from src.utils.db_utils import CreatedAt, UUIDGenerator
@@ -57,10 +57,19 @@ class NotificationModel(Base):
         default="unread"
     )
 
+    # note: per recipient, a re-run fanout with the same key inserts nothing
+    dedupe_key: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+
     created_at: Mapped[datetime] = CreatedAt()
 
     to_user: Mapped["UserModel"] = relationship("UserModel", foreign_keys=[to_id])
 
+    __table_args__ = (
+        # note: backs the keyset pagination of a user's inbox, newest first
+        Index("ix_notifications_to_id_created_at_id", "to_id", "created_at", "notification_id"),
+        UniqueConstraint("to_id", "dedupe_key", name="uq_notifications_to_id_dedupe_key"),
+    )
+
     def to_json(self):
         return {
             "notification_id": str(self.notification_id),
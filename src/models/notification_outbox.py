@@ -0,0 +1,71 @@
+import inspect
+from src.extensions import Base
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, Enum as SqlEnum
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from typing import Optional
+from src.utils.db_utils import CreatedAt, UUIDGenerator
+
+outbox_status_enum = SqlEnum(
+    "pending",
+    "sent",
+    "dead",
+    name="outbox_status_enum",
+    create_type=True
+)
+
+class NotificationOutboxModel(Base):
+    __tablename__ = "notification_outbox_table"
+
+    outbox_id: Mapped[str] = UUIDGenerator("outbox")
+
+    # note: a retried request or job enqueues the same key again, the conflict drops it
+    dedupe_key: Mapped[Optional[str]] = mapped_column(String(200), unique=True, nullable=True)
+
+    # note: a row goes either to one user's token (to_id) or to an FCM topic
+    to_id: Mapped[Optional[str]] = mapped_column(
+        ForeignKey("users_table.user_id", ondelete="CASCADE"),
+        nullable=True
+    )
+    topic: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    # note: chat pushes are titled with the sender's entity name, which can run to 255 characters
+    title: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    data: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+
+    status: Mapped[str] = mapped_column(outbox_status_enum, nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = CreatedAt()
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = CreatedAt()
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    def to_json(self) -> dict:
+        return {
+            "outbox_id": self.outbox_id,
+            "dedupe_key": self.dedupe_key,
+            "to_id": self.to_id,
+            "topic": self.topic,
+            "title": self.title,
+            "body": self.body,
+            "data": self.data,
+            "status": self.status,
+            "attempts": self.attempts,
+            "next_attempt_at": self.next_attempt_at.isoformat(),
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat(),
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None,
+        }
+
+_current_module = globals()
+__all__ = [
+    name for name, obj in _current_module.items()
+    if not name.startswith("_")
+    and (inspect.isclass(obj) or inspect.isfunction(obj))
+]
@@ -0,0 +1,83 @@
+import inspect
+from src.extensions import Base
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from typing import Optional
+from src.utils.db_utils import CreatedAt, UUIDGenerator
+
+class PlayerMatchStatModel(Base):
+    __tablename__ = "player_match_stats_table"
+
+    player_match_stat_id: Mapped[str] = UUIDGenerator("pms")
+
+    player_id: Mapped[str] = mapped_column(
+        String,
+        ForeignKey("players_table.player_id", ondelete="CASCADE"),
+        nullable=False
+    )
+    league_match_id: Mapped[str] = mapped_column(
+        String,
+        ForeignKey("league_matches_table.league_match_id", ondelete="CASCADE"),
+        nullable=False
+    )
+    league_id: Mapped[str] = mapped_column(
+        String,
+        ForeignKey("leagues_table.league_id", ondelete="CASCADE"),
+        nullable=False
+    )
+    # note: copied from the match's home/away ids, older matches may hold a team_id here
+    league_team_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    side: Mapped[Optional[str]] = mapped_column(String(8), nullable=True)
+    played_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    pts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    fg2m: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    fg2a: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    fg3m: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    fg3a: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    ftm: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    fta: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    reb: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    ast: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    stl: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    blk: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    tov: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    player_match_stat_created_at: Mapped[datetime] = CreatedAt()
+
+    __table_args__ = (
+        UniqueConstraint("player_id", "league_match_id", name="uq_player_match_stat"),
+        Index("ix_player_match_stats_player_played_at", "player_id", "played_at"),
+        Index("ix_player_match_stats_league_player", "league_id", "player_id"),
+    )
+
+    def to_json(self) -> dict:
+        return {
+            "player_match_stat_id": self.player_match_stat_id,
+            "player_id": self.player_id,
+            "league_match_id": self.league_match_id,
+            "league_id": self.league_id,
+            "league_team_id": self.league_team_id,
+            "side": self.side,
+            "played_at": self.played_at.isoformat(),
+            "pts": self.pts,
+            "fg2m": self.fg2m,
+            "fg2a": self.fg2a,
+            "fg3m": self.fg3m,
+            "fg3a": self.fg3a,
+            "ftm": self.ftm,
+            "fta": self.fta,
+            "reb": self.reb,
+            "ast": self.ast,
+            "stl": self.stl,
+            "blk": self.blk,
+            "tov": self.tov,
+        }
+
+_current_module = globals()
+__all__ = [
+    name for name, obj in _current_module.items()
+    if not name.startswith("_")
+    and (inspect.isclass(obj) or inspect.isfunction(obj))
+]
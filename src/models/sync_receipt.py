@@ -0,0 +1,48 @@
+import inspect
+from src.extensions import Base
+from sqlalchemy import String, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from typing import Optional
+from src.utils.db_utils import CreatedAt, UUIDGenerator
+
+class SyncReceiptModel(Base):
+    __tablename__ = "sync_receipts_table"
+
+    receipt_id: Mapped[str] = UUIDGenerator("receipt")
+
+    # note: the dedupe index, a replayed key conflicts here instead of double counting
+    idempotency_key: Mapped[str] = mapped_column(String(128), unique=True, nullable=False)
+
+    item_type: Mapped[str] = mapped_column(String(32), nullable=False)
+
+    league_match_id: Mapped[Optional[str]] = mapped_column(
+        String,
+        ForeignKey("league_matches_table.league_match_id", ondelete="CASCADE"),
+        nullable=True
+    )
+
+    staff_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    result_json: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+
+    receipt_created_at: Mapped[datetime] = CreatedAt()
+
+    def to_json(self) -> dict:
+        return {
+            "receipt_id": self.receipt_id,
+            "idempotency_key": self.idempotency_key,
+            "item_type": self.item_type,
+            "league_match_id": self.league_match_id,
+            "staff_id": self.staff_id,
+            "result_json": self.result_json,
+            "receipt_created_at": self.receipt_created_at.isoformat(),
+        }
+
+_current_module = globals()
+__all__ = [
+    name for name, obj in _current_module.items()
+    if not name.startswith("_")
+    and (inspect.isclass(obj) or inspect.isfunction(obj))
+]
@@ -5,7 +5,7 @@ if TYPE_CHECKING:
     from src.models.player import PlayerModel
 from typing import Optional
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Boolean, Text, DateTime, Enum as SqlEnum
+from sqlalchemy import Integer, String, Boolean, Text, DateTime, Enum as SqlEnum, text
 from argon2.exceptions import HashingError
 import inspect
 from src.extensions import Base, ph
@@ -34,6 +34,8 @@ class UserModel(Base):
     account_type: Mapped[str] = mapped_column(account_type_enum, nullable=False)
 
     fcm_token: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # note: 100 = healthy, lowered by failed sends and reset when the device registers a new token
+    fcm_token_health: Mapped[int] = mapped_column(Integer, default=100, server_default=text("100"), nullable=False)
     
     verification_token: Mapped[str | None] = mapped_column(String(255), nullable=True)
     verification_token_created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
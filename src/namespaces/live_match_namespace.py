@@ -1,28 +1,278 @@
+from collections import OrderedDict
+from urllib.parse import parse_qs
 import socketio
+from src.extensions import settings
 from src.services.redis_service import RedisService
+from src.services.live.live_broadcaster import LiveBroadcaster
+from src.services.live.viewer_presence import ViewerPresenceService
+from src.utils.merge_patch import apply_merge_patch, create_merge_patch, find_null_path
 
 class LiveMatchNamespace(socketio.AsyncNamespace):
+    PUBLISH_ATTEMPTS = 3
+    # note: clients that connect with protocol=2 get "scorebook_delta" frames, older clients
+    # keep the full-state "scorebook_updated" events while live_legacy_events is on
+    DELTA_PROTOCOL = "2"
+
     def __init__(self, namespace="/live"):
         super().__init__(namespace)
         self.redis_service = RedisService()
+        self.broadcaster = LiveBroadcaster(
+            self, self.redis_service.rb, self.redis_service.codec, load_state=self.redis_service.load_state
+        )
+        # note: room -> (seq, state) for rooms scored through this worker, checked against the
+        # room seq before use and dropped once nobody on this worker is in the room
+        self._states: OrderedDict[str, tuple[int, dict]] = OrderedDict()
+        self.state_cache_size = settings.get("live_state_cache_size", 64)
+        self.legacy_events = settings.get("live_legacy_events", True)
+        self.presence = ViewerPresenceService()
+        # note: sid -> {room: league_id} so disconnects can clear presence without a lookup
+        self._joined: dict[str, dict[str, str | None]] = {}
+
+    async def on_connect(self, sid, environ, auth=None):
+        # note: viewers pick their wire format on connect, ?format=msgpack or auth={"format": "msgpack"}
+        query = parse_qs(environ.get("QUERY_STRING", ""))
+        wire_format = (auth or {}).get("format") or query.get("format", [None])[0]
+        self.broadcaster.set_wire_format(sid, wire_format)
+
+        protocol = (auth or {}).get("protocol") or query.get("protocol", [None])[0]
+        if self.legacy_events and str(protocol) != self.DELTA_PROTOCOL:
+            self.broadcaster.set_legacy(sid)
+
+    @staticmethod
+    def _legacy_room(room: str) -> str:
+        return f"{room}:legacy"
+
+    def _cache_state(self, room: str, seq: int, state: dict | None):
+        if state is None:
+            self._states.pop(room, None)
+            return
+        self._states[room] = (seq, state)
+        self._states.move_to_end(room)
+        while len(self._states) > self.state_cache_size:
+            self._states.popitem(last=False)
+
+    def _evict_if_idle(self, room: str, leaving_sid: str):
+        participants = self.server.manager.get_participants(self.namespace, room)
+        if not any(sid != leaving_sid for sid, _ in participants):
+            self._states.pop(room, None)
 
     async def on_join(self, sid, data):
         room = data.get("room")
         if room:
             await self.enter_room(sid, room)
+            if self.broadcaster.is_legacy(sid):
+                await self.enter_room(sid, self._legacy_room(room))
+            self.broadcaster.ensure_listening()
+
+            league_id = data.get("league_id")
+            self._joined.setdefault(sid, {})[room] = league_id
+            await self.presence.join(sid, room, league_id, data.get("viewer_id"))
+
+    async def on_leave(self, sid, data):
+        room = data.get("room")
+        if room:
+            self._evict_if_idle(room, sid)
+            await self.leave_room(sid, room)
+            await self.leave_room(sid, self._legacy_room(room))
+            self.broadcaster.discard_room(sid, room)
+            joined = self._joined.get(sid, {})
+            if room in joined:
+                league_id = joined.pop(room)
+                # note: keep the league presence while another match of the same league is open
+                await self.presence.leave(sid, room, None if league_id in joined.values() else league_id)
+
+    async def on_viewer_heartbeat(self, sid, data):
+        # note: presence is refreshed from the socket lifetime, kept for clients that still send it
+        for room, league_id in self._joined.get(sid, {}).items():
+            await self.presence.heartbeat(sid, room, league_id)
+
+    async def on_get_viewer_counts(self, sid, data):
+        room = data.get("room")
+        league_id = data.get("league_id")
+        counts = {}
+        if room:
+            counts["match"] = await self.presence.get_match_counts(room)
+        if league_id:
+            counts["league"] = await self.presence.get_league_counts(league_id)
+        await self.emit("viewer_counts", counts, to=sid)
+
+    async def on_disconnect(self, sid, reason=None):
+        for room in self.rooms(sid):
+            if room != sid:
+                self._evict_if_idle(room, sid)
+        self.broadcaster.discard(sid)
+        for room, league_id in self._joined.pop(sid, {}).items():
+            await self.presence.leave(sid, room, league_id)
 
     async def on_scorebook_update(self, sid, data):
         room = data.get("room")
         game_state = data.get("data")
-        if room and game_state:
-            await self.redis_service.set_state(room, game_state)
-            await self.emit("scorebook_updated", game_state, to=room, skip_sid=sid)
+        if not (room and game_state):
+            return
+        null_path = find_null_path(game_state)
+        if null_path:
+            # note: a null would be a delete in the merge patch, omit the key instead
+            await self.emit("error", {
+                "message": f"scorebook state cannot contain null values ({null_path}), omit the key instead",
+                "event": "scorebook_update"
+            }, to=sid)
+            return
+
+        for _ in range(self.PUBLISH_ATTEMPTS):
+            cached = self._states.get(room)
+            # note: another worker may have written to the room since this one cached it
+            if cached is None or cached[0] != await self.redis_service.get_latest_seq(room):
+                cached = await self.redis_service.load_state(room)
+                self._cache_state(room, *cached)
+            patch = create_merge_patch(cached[1] or {}, game_state)
+            if not patch:
+                return
+            seq = await self._publish_patch(sid, room, patch, game_state, expected_seq=cached[0])
+            if seq != RedisService.SEQ_CONFLICT:
+                return
+            self._states.pop(room, None)
+
+    async def on_scorebook_patch(self, sid, data):
+        room = data.get("room")
+        patch = data.get("patch")
+        if room and patch:
+            await self._publish_patch(sid, room, patch)
+
+    async def _publish_patch(self, sid, room: str, patch: dict, full_state: dict | None = None, expected_seq: int | None = None) -> int | None:
+        seq = await self.redis_service.append_event(room, "patch", patch, expected_seq=expected_seq)
+        if seq is None or seq == RedisService.SEQ_CONFLICT:
+            return seq
+
+        await self.broadcast_patch(room, seq, patch, full_state, skip_sid=sid)
+        return seq
+
+    async def broadcast_patch(self, room: str, seq: int, patch: dict, state: dict | None = None, skip_sid=None) -> dict | None:
+        """
+        Sends a patch already appended at seq to delta and legacy viewers, also used for
+        patches that arrive through the offline sync. Returns the room state when it was known.
+        """
+        cached = self._states.get(room)
+        if state is None and cached and cached[0] == seq - 1:
+            state = apply_merge_patch(cached[1], patch)
+        self._cache_state(room, seq, state)
+
+        await self.broadcaster.push(room, seq, patch, skip_sid=skip_sid)
+
+        if self.legacy_events:
+            if state is None:
+                _, state = await self.redis_service.load_state(room)
+            await self.emit("scorebook_updated", state, to=self._legacy_room(room), skip_sid=skip_sid)
+        return state
 
     async def on_viewer_request_initial_state(self, sid, data):
         room = data.get("room")
         if room:
-            latest_state = await self.redis_service.get_state(room)
-            await self.emit("scorebook_initial_state", latest_state, to=sid)
+            if self.broadcaster.is_legacy(sid):
+                await self.emit("scorebook_initial_state", await self.redis_service.get_state(room), to=sid)
+                return
+
+            last_seq = data.get("last_seq")
+            payload = await self.redis_service.get_resume_payload(
+                room,
+                int(last_seq) if last_seq is not None else None
+            )
+            await self.emit("scorebook_initial_state", self.broadcaster.encode_for(sid, payload), to=sid)
+
+    # -------------------------
+    # Game clock
+    # -------------------------
+    async def _control_clock(self, sid, data: dict, event: str, operation: str, value: int = 0):
+        room = data.get("room")
+        if not room:
+            return
+        period_length_ms = await self._int_arg(
+            sid, data, "period_length_ms", settings.get("live_period_length_ms", 600000), event, minimum=1
+        )
+        if period_length_ms is None:
+            return
+        clock = await self.redis_service.control_clock(room, operation, value, period_length_ms=period_length_ms)
+        if clock:
+            await self.emit("clock_updated", {"room": room, **clock}, to=room)
+
+    async def on_clock_start(self, sid, data):
+        await self._control_clock(sid, data, "clock_start", "start")
+
+    async def on_clock_stop(self, sid, data):
+        await self._control_clock(sid, data, "clock_stop", "stop")
+
+    async def _int_arg(self, sid, data: dict, key: str, default: int, event: str, minimum: int | None = None) -> int | None:
+        value = data.get(key, default)
+        try:
+            if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+                raise ValueError(value)
+            value = int(value)
+            if minimum is not None and value < minimum:
+                raise ValueError(value)
+            return value
+        except (TypeError, ValueError):
+            await self.emit("error", {
+                "message": f"{key} must be an integer" + (f" of at least {minimum}" if minimum is not None else ""),
+                "event": event
+            }, to=sid)
+        return None
+
+    async def on_clock_adjust(self, sid, data):
+        delta_ms = await self._int_arg(sid, data, "delta_ms", 0, "clock_adjust")
+        if delta_ms is not None:
+            await self._control_clock(sid, data, "clock_adjust", "adjust", delta_ms)
+
+    async def on_clock_set(self, sid, data):
+        remaining_ms = await self._int_arg(sid, data, "remaining_ms", 0, "clock_set", minimum=0)
+        if remaining_ms is not None:
+            await self._control_clock(sid, data, "clock_set", "set", remaining_ms)
+
+    async def on_clock_set_period(self, sid, data):
+        period = await self._int_arg(sid, data, "period", 1, "clock_set_period", minimum=1)
+        if period is not None:
+            await self._control_clock(sid, data, "clock_set_period", "period", period)
+
+    async def on_get_clock(self, sid, data):
+        room = data.get("room")
+        if room:
+            clock = await self.redis_service.get_clock(room)
+            await self.emit("clock_updated", {"room": room, **(clock or {})}, to=sid)
+
+    # -------------------------
+    # Box score
+    # -------------------------
+    async def on_scorebook_stat(self, sid, data):
+        from src.services.match.match_service import LeagueMatchService
+
+        room = data.get("room")
+        player_id = data.get("player_id")
+        side = data.get("side")
+        stat = data.get("stat")
+        if not (room and player_id) or side not in ("home", "away"):
+            return None
+        if stat != "pts" and stat not in LeagueMatchService.STATS_MAP:
+            return None
+
+        # note: the scorer retries an unacknowledged stat with the same key, it is counted once
+        idempotency_key = data.get("idempotency_key")
+        if not idempotency_key:
+            await self.emit("error", {"message": "idempotency_key is required", "event": "scorebook_stat"}, to=sid)
+            return None
+
+        delta = await self._int_arg(sid, data, "delta", 1, "scorebook_stat")
+        if delta is None:
+            return None
+
+        applied, value = await self.redis_service.incr_box_score_once(room, idempotency_key, player_id, side, stat, delta)
+        return {"player_id": player_id, "stat": stat, "value": value, "duplicate": not applied}
+
+    async def on_get_box_score(self, sid, data):
+        room = data.get("room")
+        if room:
+            box_score = await self.redis_service.get_box_score(room)
+            await self.emit("box_score", box_score, to=sid)
+
+    async def on_get_broadcast_stats(self, sid, data=None):
+        await self.emit("broadcast_stats", self.broadcaster.get_stats(), to=sid)
 
     async def on_ping(self, sid, data):
         await self.emit('pong', data, to=sid)
@@ -31,16 +281,27 @@ class LiveMatchNamespace(socketio.AsyncNamespace):
         admin_id = data.get("league_administrator_id")
         match_id = data.get("league_match_id")
         if admin_id and match_id:
-            await self.redis_service.save_admin_live_match(admin_id, match_id)
-            live_admins = await self.redis_service.get_all_admin_live_matches()
-            await self.emit("live_admins", live_admins, namespace="/live")
+            entry, previous = await self.redis_service.save_admin_live_match(admin_id, match_id)
+            if previous:
+                # note: clients key the directory by match, drop the replaced one before adding
+                self._states.pop(previous.get("league_match_id"), None)
+                await self.emit("live_admin_removed", {
+                    "league_administrator_id": admin_id,
+                    "league_match_id": previous.get("league_match_id"),
+                }, namespace="/live")
+            if entry:
+                await self.emit("live_admin_added", entry, namespace="/live")
 
     async def on_admin_stop_live(self, sid, data):
         admin_id = data.get("league_administrator_id")
         if admin_id:
-            await self.redis_service.remove_admin_live_match(admin_id)
-            live_admins = await self.redis_service.get_all_admin_live_matches()
-            await self.emit("live_admins", live_admins, namespace="/live")
+            entry = await self.redis_service.remove_admin_live_match(admin_id)
+            if entry:
+                self._states.pop(entry.get("league_match_id"), None)
+                await self.emit("live_admin_removed", {
+                    "league_administrator_id": admin_id,
+                    "league_match_id": entry.get("league_match_id"),
+                }, namespace="/live")
 
     async def on_get_live_admins(self, sid, data):
         live_admins = await self.redis_service.get_all_admin_live_matches()
@@ -2,6 +2,8 @@ import asyncio, heapq
 from quart_auth import login_user
 from sqlalchemy import select
 from src.services.cloudinary_service import CloudinaryService
+from src.services.fcm_token_service import FcmTokenService
+from src.services.fcm_topic_service import FcmTopicService
 from src.services.league.league_service import LeagueService
 from src.services.league_admin_service import LeagueAdministratorService
 from src.services.player.player_service import PlayerService
@@ -183,9 +185,13 @@ class EntityService():
             auth_user = AuthUser(user)
             login_user(auth_user)
             
-            if fcm_token and user.fcm_token != fcm_token:
-                user.fcm_token = fcm_token
-                await session.commit()
+            if fcm_token:
+                old_token, previous_holders = user.fcm_token, []
+                if old_token != fcm_token:
+                    previous_holders = await FcmTokenService().assign_token(session, user, fcm_token)
+                    await session.commit()
+                # note: resubscribed on every login so a token that missed a roster change catches up
+                FcmTopicService().move_token(user.user_id, fcm_token, old_token, previous_holders)
 
             entity_id = user.user_id
             if user.account_type == "Player":
@@ -231,10 +237,12 @@ class EntityService():
                 if not user:
                     raise ApiException("User not found", 404)
 
-                if user.fcm_token != fcm_token:
-                    user.fcm_token = fcm_token
+                old_token, previous_holders = user.fcm_token, []
+                if old_token != fcm_token:
+                    previous_holders = await FcmTokenService().assign_token(session, user, fcm_token)
                     session.add(user)
                     await session.commit()
+                FcmTopicService().move_token(user.user_id, fcm_token, old_token, previous_holders)
                 return "FCM token updated"
             except (IntegrityError, SQLAlchemyError) as e:
                 await session.rollback()
@@ -0,0 +1,89 @@
+from sqlalchemy import String, column, func, update, values
+from src.extensions import settings
+from src.models.user import UserModel
+from src.services.notification_service import FanoutResult
+
+class FcmTokenService:
+    """
+    Keeps UserModel.fcm_token honest: tokens FCM rejects are nulled, tokens that keep failing
+    lose health and drop out of recipient selection, a successful send restores them.
+    Every update matches on the token that was sent so a freshly registered token is never touched.
+    """
+    HEALTHY = 100
+
+    def __init__(self):
+        self.failure_penalty = settings.get("fcm_failure_penalty", 25)
+        self.min_health = settings.get("fcm_min_health", 50)
+
+    @staticmethod
+    def _token_rows(pairs: set[tuple[str, str]], name: str):
+        return values(
+            column("user_id", String),
+            column("fcm_token", String),
+            name=name,
+        ).data(sorted(pairs))
+
+    async def record_results(self, session, payloads: list[dict], result: FanoutResult) -> dict:
+        dead, degraded, failed_indexes = set(), set(), set()
+        for failure in result.failures:
+            failed_indexes.add(failure.index)
+            if not failure.fcm_token:
+                # note: topic sends have no token to blame
+                continue
+            if failure.kind == "dead_token":
+                dead.add((failure.user_id, failure.fcm_token))
+            elif failure.kind == "transient":
+                degraded.add((failure.user_id, failure.fcm_token))
+
+        delivered = {
+            (data["to_id"], data["fcm_token"])
+            for i, data in enumerate(payloads)
+            if data.get("fcm_token") and i not in failed_indexes
+        }
+
+        if dead:
+            rows = self._token_rows(dead, "dead_tokens")
+            await session.execute(
+                update(UserModel)
+                .where(UserModel.user_id == rows.c.user_id, UserModel.fcm_token == rows.c.fcm_token)
+                .values(fcm_token=None, fcm_token_health=0)
+                .execution_options(synchronize_session=False)
+            )
+        if degraded:
+            rows = self._token_rows(degraded, "degraded_tokens")
+            await session.execute(
+                update(UserModel)
+                .where(UserModel.user_id == rows.c.user_id, UserModel.fcm_token == rows.c.fcm_token)
+                .values(fcm_token_health=func.greatest(0, UserModel.fcm_token_health - self.failure_penalty))
+                .execution_options(synchronize_session=False)
+            )
+        if delivered:
+            rows = self._token_rows(delivered, "delivered_tokens")
+            await session.execute(
+                update(UserModel)
+                .where(
+                    UserModel.user_id == rows.c.user_id,
+                    UserModel.fcm_token == rows.c.fcm_token,
+                    UserModel.fcm_token_health < self.HEALTHY,
+                )
+                .values(fcm_token_health=self.HEALTHY)
+                .execution_options(synchronize_session=False)
+            )
+
+        return {"pruned": len(dead), "degraded": len(degraded)}
+
+    async def assign_token(self, session, user: UserModel, fcm_token: str) -> list[str]:
+        # note: a device signs in as one user at a time, drop the token from whoever had it before
+        result = await session.execute(
+            update(UserModel)
+            .where(UserModel.fcm_token == fcm_token, UserModel.user_id != user.user_id)
+            .values(fcm_token=None, fcm_token_health=0)
+            .returning(UserModel.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        user.fcm_token = fcm_token
+        user.fcm_token_health = self.HEALTHY
+        return list(result.scalars().all())
+
+    def is_healthy(self, user: UserModel) -> bool:
+        return bool(user.fcm_token and user.fcm_token.strip()) and user.fcm_token_health >= self.min_health
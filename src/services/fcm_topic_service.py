@@ -0,0 +1,165 @@
+import asyncio
+import logging
+from asyncio import to_thread
+from firebase_admin import messaging
+from sqlalchemy import select, union
+from src.models.player import PlayerModel, PlayerTeamModel
+from src.models.team import TeamModel
+from src.models.user import UserModel
+from src.extensions import AsyncSession, settings
+from src.utils.notification_utils import ROSTER_STATUSES, team_roster_stmt
+
+logger = logging.getLogger(__name__)
+
+TOPIC_BATCH_SIZE = 1000
+
+class FcmTopicService:
+    """
+    FCM topics per team roster so a broadcast is one topic send instead of one message per token.
+
+    - "team-<team_id>": the team owner and its accepted/guest players
+
+    Subscriptions follow roster changes and are renewed on every login and token update,
+    backfill() subscribes the rosters that existed before the topics did.
+    Roster and token changes only schedule the topic calls, they run in a background task with
+    their own session after the caller commits and do nothing while fcm_topic_broadcasts is off.
+    Failures are logged and never fail the caller, the inbox row is still written.
+    """
+    # note: keeps a reference to running jobs so they are not collected mid-flight
+    _jobs: set[asyncio.Task] = set()
+
+    def __init__(self):
+        self.enabled = settings.get("fcm_topic_broadcasts", False)
+
+    @staticmethod
+    def team_topic(team_id: str) -> str:
+        return f"team-{team_id}"
+
+    async def _apply(self, method, topic: str, tokens) -> int:
+        tokens = list(dict.fromkeys(token.strip() for token in tokens if token and token.strip()))
+        if not tokens:
+            return 0
+
+        # note: the topic management API takes at most 1000 tokens per call
+        chunks = [tokens[i:i + TOPIC_BATCH_SIZE] for i in range(0, len(tokens), TOPIC_BATCH_SIZE)]
+        responses = await asyncio.gather(
+            *(to_thread(method, chunk, topic) for chunk in chunks),
+            return_exceptions=True,
+        )
+
+        applied = 0
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, Exception):
+                logger.error(f"❌ Topic {topic} update failed for {len(chunk)} tokens: {response}")
+                continue
+            applied += response.success_count
+            for error in response.errors:
+                logger.warning(f"⚠️ Topic {topic} rejected token #{error.index}: {error.reason}")
+        return applied
+
+    async def subscribe(self, topic: str, tokens) -> int:
+        return await self._apply(messaging.subscribe_to_topic, topic, tokens)
+
+    async def unsubscribe(self, topic: str, tokens) -> int:
+        return await self._apply(messaging.unsubscribe_from_topic, topic, tokens)
+
+    async def roster_tokens(self, session, team_id: str, player_team_ids: list[str] | None = None, include_owner: bool = True) -> list[str]:
+        result = await session.execute(team_roster_stmt(team_id, player_team_ids, include_owner))
+        return [row.fcm_token for row in result.all() if row.fcm_token]
+
+    async def user_topics(self, session, user_id: str) -> list[str]:
+        owned_teams = select(TeamModel.team_id).where(TeamModel.user_id == user_id)
+        roster_teams = (
+            select(PlayerTeamModel.team_id)
+            .join(PlayerModel, PlayerModel.player_id == PlayerTeamModel.player_id)
+            .where(PlayerModel.user_id == user_id, PlayerTeamModel.is_accepted.in_(ROSTER_STATUSES))
+        )
+
+        team_ids = (await session.scalars(union(owned_teams, roster_teams))).all()
+        return [self.team_topic(team_id) for team_id in team_ids]
+
+    def _spawn(self, job, *args):
+        if not self.enabled:
+            return
+        task = asyncio.create_task(self._run(job, *args))
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+
+    @staticmethod
+    async def _run(job, *args):
+        try:
+            async with AsyncSession() as session:
+                await job(session, *args)
+        except Exception as e:
+            logger.error(f"❌ Topic job {job.__name__} failed: {e}")
+
+    def move_token(self, user_id: str, fcm_token: str, old_token: str | None = None, previous_holders: list[str] | None = None):
+        """
+        Call after FcmTokenService.assign_token commits: the old token leaves the user's topics,
+        the new one leaves the topics of users it was taken from and joins the user's topics.
+        """
+        self._spawn(self._move_token, user_id, fcm_token, old_token, previous_holders or [])
+
+    async def _move_token(self, session, user_id: str, fcm_token: str, old_token: str | None, previous_holders: list[str]):
+        topics = await self.user_topics(session, user_id)
+        for holder_id in previous_holders:
+            for topic in await self.user_topics(session, holder_id):
+                await self.unsubscribe(topic, [fcm_token])
+        for topic in topics:
+            if old_token and old_token != fcm_token:
+                await self.unsubscribe(topic, [old_token])
+            await self.subscribe(topic, [fcm_token])
+
+    def sync_team(self, team_id: str, joined: list[str] = (), left_tokens: list[str] = ()):
+        """
+        Keeps "team-<team_id>" in step with the roster, call after the commit. joined are the
+        player_team_ids that joined the roster, left_tokens the tokens of the players that left,
+        read before their rows are deleted.
+        """
+        if joined or left_tokens:
+            self._spawn(self._sync_team, team_id, list(joined), list(left_tokens))
+
+    async def _sync_team(self, session, team_id: str, joined: list[str], left_tokens: list[str]):
+        topic = self.team_topic(team_id)
+        if joined:
+            await self.subscribe(topic, await self.roster_tokens(session, team_id, joined, include_owner=False))
+        if left_tokens:
+            await self.unsubscribe(topic, left_tokens)
+
+    async def backfill(self, chunk_size: int = 200) -> int:
+        # note: keyset pages over the teams, one roster query per chunk, safe to re-run
+        last_team_id = ""
+        total = 0
+        while True:
+            async with AsyncSession() as session:
+                team_ids = (await session.scalars(
+                    select(TeamModel.team_id)
+                    .where(TeamModel.team_id > last_team_id)
+                    .order_by(TeamModel.team_id)
+                    .limit(chunk_size)
+                )).all()
+                if not team_ids:
+                    break
+
+                players = (
+                    select(PlayerTeamModel.team_id, UserModel.fcm_token)
+                    .join(PlayerModel, PlayerModel.player_id == PlayerTeamModel.player_id)
+                    .join(UserModel, UserModel.user_id == PlayerModel.user_id)
+                    .where(PlayerTeamModel.team_id.in_(team_ids), PlayerTeamModel.is_accepted.in_(ROSTER_STATUSES))
+                )
+                owners = (
+                    select(TeamModel.team_id, UserModel.fcm_token)
+                    .join(UserModel, UserModel.user_id == TeamModel.user_id)
+                    .where(TeamModel.team_id.in_(team_ids))
+                )
+                result = await session.execute(union(players, owners))
+
+            tokens_by_team: dict[str, list[str]] = {}
+            for row in result.all():
+                if row.fcm_token:
+                    tokens_by_team.setdefault(row.team_id, []).append(row.fcm_token)
+            for team_id, tokens in tokens_by_team.items():
+                total += await self.subscribe(self.team_topic(team_id), tokens)
+
+            last_team_id = team_ids[-1]
+        return total
@@ -0,0 +1,204 @@
+import numpy as np
+from sqlalchemy import select
+from src.extensions import AsyncSession
+from src.models.match import LeagueMatchModel
+from src.models.player import PlayerModel
+from src.models.player_match_stat import PlayerMatchStatModel
+from src.services.redis_service import RedisService
+
+class LeagueMetricsService:
+    """
+    League-wide advanced metrics computed from player_match_stats_table in one
+    vectorized pass, cached per league (and category) until a match is finalized.
+
+    The cache key carries a per-league version that invalidate() bumps after the stats
+    commit. The version is read before the stats, so a compute that raced the commit
+    caches under the old version and is never read again.
+    """
+    CACHE_TTL = 86400
+    COUNTING_STATS = ("pts", "fg2m", "fg2a", "fg3m", "fg3a", "ftm", "fta", "reb", "ast", "stl", "blk", "tov")
+    RANKED_METRICS = ("ppg", "rpg", "apg", "ts_pct", "efg_pct", "eff", "usage", "platform_points_per_game")
+
+    @staticmethod
+    def _version_key(league_id: str) -> str:
+        return f"analytics:league:{league_id}:version"
+
+    @staticmethod
+    def _cache_key(league_id: str, version: int) -> str:
+        return f"analytics:league:{league_id}:v{version}"
+
+    async def get_league_metrics(self, league_id: str, league_category_id: str | None = None) -> dict:
+        redis_service = RedisService()
+        field = league_category_id or "all"
+        key = None
+        try:
+            version = int(await redis_service.r.get(self._version_key(league_id)) or 0)
+            key = self._cache_key(league_id, version)
+            cached = await redis_service.rb.hget(key, field)
+            if cached:
+                return redis_service.codec.decode(cached)
+        except Exception as e:
+            print(f"Error reading league metrics cache for {league_id}: {e}")
+
+        metrics = await self.compute(league_id, league_category_id)
+        if key is None:
+            return metrics
+        try:
+            async with redis_service.rb.pipeline(transaction=True) as pipe:
+                pipe.hset(key, field, redis_service.codec.encode(metrics))
+                pipe.expire(key, self.CACHE_TTL)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Error caching league metrics for {league_id}: {e}")
+        return metrics
+
+    async def invalidate(self, *league_ids: str):
+        """
+        Call after the transaction that changed the league's stats commits.
+        """
+        league_ids = [league_id for league_id in dict.fromkeys(league_ids) if league_id]
+        if not league_ids:
+            return
+        try:
+            async with RedisService().r.pipeline(transaction=False) as pipe:
+                for league_id in league_ids:
+                    pipe.incr(self._version_key(league_id))
+                    pipe.expire(self._version_key(league_id), self.CACHE_TTL * 7)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Error invalidating league metrics cache: {e}")
+
+    async def compute(self, league_id: str, league_category_id: str | None = None) -> dict:
+        async with AsyncSession() as session:
+            stmt = (
+                select(
+                    PlayerMatchStatModel.player_id,
+                    PlayerMatchStatModel.league_match_id,
+                    PlayerMatchStatModel.side,
+                    *(getattr(PlayerMatchStatModel, stat) for stat in self.COUNTING_STATS),
+                )
+                .where(PlayerMatchStatModel.league_id == league_id)
+            )
+            if league_category_id:
+                stmt = stmt.join(
+                    LeagueMatchModel,
+                    LeagueMatchModel.league_match_id == PlayerMatchStatModel.league_match_id,
+                ).where(LeagueMatchModel.league_category_id == league_category_id)
+            lines = (await session.execute(stmt)).all()
+
+            if not lines:
+                return self._empty(league_id, league_category_id)
+
+            player_ids = list({line.player_id for line in lines})
+            players = (await session.execute(
+                select(PlayerModel.player_id, PlayerModel.full_name, PlayerModel.profile_image_url)
+                .where(PlayerModel.player_id.in_(player_ids))
+            )).all()
+
+        profiles = {p.player_id: p for p in players}
+        ids, metrics = self.compute_arrays(lines)
+
+        rows = []
+        for i, player_id in enumerate(ids):
+            profile = profiles.get(player_id)
+            rows.append({
+                "player_id": player_id,
+                "full_name": profile.full_name if profile else None,
+                "profile_image_url": profile.profile_image_url if profile else None,
+                **{name: self._to_python(values[i]) for name, values in metrics.items()},
+            })
+        rows.sort(key=lambda row: row["platform_points_per_game"], reverse=True)
+
+        return {
+            "league_id": league_id,
+            "league_category_id": league_category_id,
+            "total_players": len(rows),
+            "total_stat_lines": len(lines),
+            "players": rows,
+        }
+
+    @classmethod
+    def compute_arrays(cls, lines) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        player_ids = np.array([line.player_id for line in lines], dtype=object)
+        # note: a team game is (match, side), usage is a player's share of their team's possessions used
+        team_games = np.array([f"{line.league_match_id}|{line.side}" for line in lines], dtype=object)
+        stats = np.array([[getattr(line, stat) or 0 for stat in cls.COUNTING_STATS] for line in lines], dtype=np.float64)
+        col = {stat: stats[:, i] for i, stat in enumerate(cls.COUNTING_STATS)}
+
+        ids, player_index = np.unique(player_ids, return_inverse=True)
+        _, team_index = np.unique(team_games, return_inverse=True)
+        n = len(ids)
+
+        totals = np.zeros((n, stats.shape[1]))
+        np.add.at(totals, player_index, stats)
+        games = np.bincount(player_index, minlength=n).astype(np.float64)
+        t = {stat: totals[:, i] for i, stat in enumerate(cls.COUNTING_STATS)}
+
+        line_possessions = col["fg2a"] + col["fg3a"] + 0.44 * col["fta"] + col["tov"]
+        team_possessions = np.bincount(team_index, weights=line_possessions)
+        player_team_possessions = np.bincount(player_index, weights=team_possessions[team_index], minlength=n)
+
+        fga = t["fg2a"] + t["fg3a"]
+        fgm = t["fg2m"] + t["fg3m"]
+        per_game = np.maximum(games, 1)
+
+        metrics = {
+            "games_played": games.astype(np.int64),
+            "ppg": t["pts"] / per_game,
+            "rpg": t["reb"] / per_game,
+            "apg": t["ast"] / per_game,
+            "spg": t["stl"] / per_game,
+            "bpg": t["blk"] / per_game,
+            "topg": t["tov"] / per_game,
+            "fg_pct": cls._ratio(fgm, fga) * 100,
+            "fg3_pct": cls._ratio(t["fg3m"], t["fg3a"]) * 100,
+            "ft_pct": cls._ratio(t["ftm"], t["fta"]) * 100,
+            "ts_pct": cls._ratio(t["pts"], 2 * (fga + 0.44 * t["fta"])) * 100,
+            "efg_pct": cls._ratio(fgm + 0.5 * t["fg3m"], fga) * 100,
+            "eff": (
+                t["pts"] + t["reb"] + t["ast"] + t["stl"] + t["blk"]
+                - (fga - fgm) - (t["fta"] - t["ftm"]) - t["tov"]
+            ) / per_game,
+            "usage": cls._ratio(
+                fga + 0.44 * t["fta"] + t["tov"], player_team_possessions
+            ) * 100,
+            # note: same weights as PlayerModel.platform_points, scoped to this league
+            "platform_points_per_game": (
+                t["pts"] * 1.0 + t["reb"] * 1.2 + t["ast"] * 1.5
+                + t["stl"] * 3.0 + t["blk"] * 3.0 - t["tov"] * 2.0
+                + t["fg2m"] / np.maximum(t["fg2a"], 1) * 10
+                + t["fg3m"] / np.maximum(t["fg3a"], 1) * 15
+                + t["ftm"] / np.maximum(t["fta"], 1) * 5
+            ) / per_game,
+        }
+        for name in cls.RANKED_METRICS:
+            metrics[f"{name}_percentile"] = cls.percentile_ranks(metrics[name])
+        return ids, metrics
+
+    @staticmethod
+    def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        return np.divide(numerator, denominator, out=np.zeros_like(numerator, dtype=np.float64), where=denominator > 0)
+
+    @staticmethod
+    def percentile_ranks(values: np.ndarray) -> np.ndarray:
+        # note: midpoint rule, tied players share a percentile
+        ordered = np.sort(values)
+        below = np.searchsorted(ordered, values, side="left")
+        at_or_below = np.searchsorted(ordered, values, side="right")
+        return (below + at_or_below) / 2 / len(values) * 100
+
+    @staticmethod
+    def _to_python(value):
+        if isinstance(value, np.integer):
+            return int(value)
+        return round(float(value), 2)
+
+    @staticmethod
+    def _empty(league_id: str, league_category_id: str | None) -> dict:
+        return {
+            "league_id": league_id,
+            "league_category_id": league_category_id,
+            "total_players": 0,
+            "total_stat_lines": 0,
+            "players": [],
+        }
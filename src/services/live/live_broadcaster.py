@@ -0,0 +1,240 @@
+import asyncio
+import logging
+from collections import OrderedDict, deque
+import socketio
+from src.extensions import settings
+from src.utils.codec import StorageCodec, get_wire_codec
+from src.utils.merge_patch import MergePatchConflict, compose_merge_patches
+
+logger = logging.getLogger(__name__)
+
+class ClientOutbox:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.frames: deque[dict] = deque()
+        self.ready = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.last_seq = 0
+
+    def offer(self, frame: dict) -> int:
+        # note: latest-frame-wins, a full outbox collapses into one up-to-date frame
+        dropped = 0
+        if len(self.frames) >= self.maxsize:
+            merged = self.frames.popleft()
+            dropped = 1
+            while self.frames:
+                merged = LiveBroadcaster.merge_or_resync(merged, self.frames.popleft())
+                dropped += 1
+            frame = LiveBroadcaster.merge_or_resync(merged, frame)
+        self.frames.append(frame)
+        self.ready.set()
+        return dropped
+
+class LiveBroadcaster:
+    CHANNEL = "live:frames"
+    EVENT = "scorebook_delta"
+
+    ENCODED_CACHE_SIZE = 256
+
+    def __init__(self, namespace: socketio.AsyncNamespace, redis, codec: StorageCodec, load_state=None):
+        self.namespace = namespace
+        self.redis = redis
+        self.codec = codec
+        # note: async (room) -> (seq, state), used when a slow client's frames cannot be merged
+        self.load_state = load_state
+        self._wire_formats: dict[str, str] = {}
+        # note: sids of clients that still expect full-state "scorebook_updated" events
+        self._legacy: set[str] = set()
+        self._encoded: OrderedDict[tuple, bytes] = OrderedDict()
+        self.tick = settings.get("live_broadcast_tick_ms", 150) / 1000
+        self.outbox_size = settings.get("live_outbox_size", 8)
+        self.transport_backlog = settings.get("live_transport_backlog", 4)
+        self._pending: dict[str, dict] = {}
+        # note: keyed by (sid, room) so frames of different matches never merge
+        self._outboxes: dict[tuple[str, str], ClientOutbox] = {}
+        self._listener: asyncio.Task | None = None
+        self.stats = {
+            "frames_received": 0,
+            "frames_coalesced": 0,
+            "frames_published": 0,
+            "frames_sent": 0,
+            "frames_dropped": 0,
+            "frames_resynced": 0,
+        }
+
+    @staticmethod
+    def merge_frames(older: dict, newer: dict) -> dict:
+        """
+        Raises MergePatchConflict when the two patches cannot be expressed as one, a frame
+        already marked "resync" absorbs anything merged into it.
+        """
+        if older.get("resync") or newer.get("resync"):
+            return {**newer, "from_seq": older["from_seq"], "patch": None, "resync": True}
+        return {
+            **newer,
+            "from_seq": older["from_seq"],
+            "patch": compose_merge_patches(older["patch"], newer["patch"]),
+        }
+
+    @classmethod
+    def merge_or_resync(cls, older: dict, newer: dict) -> dict:
+        # note: the resync frame is replaced by the full room state when it is sent
+        try:
+            return cls.merge_frames(older, newer)
+        except MergePatchConflict:
+            return {**newer, "from_seq": older["from_seq"], "patch": None, "resync": True}
+
+    # -------------------------
+    # Scorer side: per-room coalescing
+    # -------------------------
+    async def push(self, room: str, seq: int, patch: dict, skip_sid: str = None):
+        self.ensure_listening()
+        self.stats["frames_received"] += 1
+        frame = {"room": room, "from_seq": seq, "seq": seq, "patch": patch, "skip_sid": skip_sid}
+
+        pending = self._pending.get(room)
+        if pending:
+            try:
+                self._pending[room] = self.merge_frames(pending, frame)
+                self.stats["frames_coalesced"] += 1
+            except MergePatchConflict:
+                # note: publish what is pending now, the tick already scheduled sends this frame
+                self._pending[room] = frame
+                await self._publish(pending)
+            return
+
+        self._pending[room] = frame
+        asyncio.create_task(self._flush_after_tick(room))
+
+    async def _flush_after_tick(self, room: str):
+        await asyncio.sleep(self.tick)
+        frame = self._pending.pop(room, None)
+        if frame:
+            await self._publish(frame)
+
+    async def _publish(self, frame: dict):
+        room = frame["room"]
+        try:
+            await self.redis.publish(self.CHANNEL, self.codec.encode(frame))
+            self.stats["frames_published"] += 1
+        except Exception as e:
+            logger.error(f"❌ Failed to publish live frame for {room}: {e}")
+
+    # -------------------------
+    # Viewer side: every worker delivers to its own sockets
+    # -------------------------
+    def ensure_listening(self):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.CHANNEL)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    self.deliver(self.codec.decode(message["data"]))
+                except Exception as e:
+                    logger.error(f"❌ Failed to deliver live frame: {e}")
+        finally:
+            await pubsub.unsubscribe(self.CHANNEL)
+
+    def deliver(self, frame: dict):
+        skip_sid = frame.pop("skip_sid", None)
+        room = frame["room"]
+        manager = self.namespace.server.manager
+        for sid, eio_sid in manager.get_participants(self.namespace.namespace, room):
+            if sid == skip_sid or sid in self._legacy:
+                continue
+            outbox = self._outboxes.get((sid, room))
+            if outbox is None:
+                outbox = ClientOutbox(self.outbox_size)
+                outbox.task = asyncio.create_task(self._drain((sid, room), eio_sid, outbox))
+                self._outboxes[(sid, room)] = outbox
+            self.stats["frames_dropped"] += outbox.offer(frame)
+
+    async def _resync_frame(self, frame: dict) -> dict:
+        seq, state = await self.load_state(frame["room"])
+        self.stats["frames_resynced"] += 1
+        return {"room": frame["room"], "from_seq": frame["from_seq"], "seq": seq, "state": state}
+
+    def _transport_queue_size(self, eio_sid: str) -> int:
+        eio_socket = self.namespace.server.eio.sockets.get(eio_sid)
+        return eio_socket.queue.qsize() if eio_socket else 0
+
+    async def _drain(self, key: tuple[str, str], eio_sid: str, outbox: ClientOutbox):
+        sid = key[0]
+        while key in self._outboxes:
+            await outbox.ready.wait()
+            # note: hold frames while the transport is still flushing older packets,
+            # new frames collapse in the outbox instead of piling up in engine.io
+            if self._transport_queue_size(eio_sid) >= self.transport_backlog:
+                await asyncio.sleep(self.tick)
+                continue
+            if not outbox.frames:
+                outbox.ready.clear()
+                continue
+            frame = outbox.frames.popleft()
+            if frame["seq"] <= outbox.last_seq:
+                continue
+            try:
+                if frame.get("resync"):
+                    frame = await self._resync_frame(frame)
+                outbox.last_seq = frame["seq"]
+                await self.namespace.emit(self.EVENT, self.encode_for(sid, frame), to=sid, ignore_queue=True)
+                self.stats["frames_sent"] += 1
+            except Exception as e:
+                logger.error(f"❌ Failed to send live frame to {sid}: {e}")
+
+    # -------------------------
+    # Per-client wire format
+    # -------------------------
+    def set_wire_format(self, sid: str, wire_format: str | None):
+        if get_wire_codec(wire_format) is not None:
+            self._wire_formats[sid] = wire_format
+
+    def set_legacy(self, sid: str):
+        self._legacy.add(sid)
+
+    def is_legacy(self, sid: str) -> bool:
+        return sid in self._legacy
+
+    def encode_for(self, sid: str, payload: dict):
+        wire_format = self._wire_formats.get(sid)
+        codec = get_wire_codec(wire_format)
+        if codec is None:
+            return payload
+
+        # note: frames are shared by every viewer of a room, encode each one once per format
+        key = (wire_format, payload.get("room"), payload.get("from_seq"), payload.get("seq"), "state" in payload)
+        if key[2] is None:
+            return codec.encode(payload)
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = codec.encode(payload)
+            self._encoded[key] = encoded
+            if len(self._encoded) > self.ENCODED_CACHE_SIZE:
+                self._encoded.popitem(last=False)
+        return encoded
+
+    def discard_room(self, sid: str, room: str):
+        # note: a viewer switching matches keeps its socket, release the outbox of the old room
+        outbox = self._outboxes.pop((sid, room), None)
+        if outbox and outbox.task:
+            outbox.task.cancel()
+
+    def discard(self, sid: str):
+        self._wire_formats.pop(sid, None)
+        self._legacy.discard(sid)
+        for _, room in [k for k in self._outboxes if k[0] == sid]:
+            self.discard_room(sid, room)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "pending_rooms": len(self._pending),
+            "outboxes": len(self._outboxes),
+            "queued_frames": sum(len(o.frames) for o in self._outboxes.values()),
+        }
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from src.services.redis_service import RedisService
+
+logger = logging.getLogger(__name__)
+
+class RoomFeed:
+    def __init__(self):
+        self.subscribers: set[asyncio.Queue] = set()
+        self.task: asyncio.Task | None = None
+
+class LiveStreamHub:
+    """
+    One XREAD loop per room per worker, fanned out to every SSE subscriber of that room,
+    so a thousand spectators of a match cost one blocking Redis read instead of a thousand.
+    """
+    LAGGING = {"type": "lagging"}
+    BLOCK_MS = 15000
+
+    def __init__(self, queue_size: int = 256):
+        self.redis_service = RedisService()
+        self.queue_size = queue_size
+        self._feeds: dict[str, RoomFeed] = {}
+
+    def subscribe(self, room: str) -> asyncio.Queue:
+        feed = self._feeds.setdefault(room, RoomFeed())
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        feed.subscribers.add(queue)
+        if feed.task is None or feed.task.done():
+            feed.task = asyncio.create_task(self._follow(room, feed))
+        return queue
+
+    def unsubscribe(self, room: str, queue: asyncio.Queue):
+        feed = self._feeds.get(room)
+        if not feed:
+            return
+        feed.subscribers.discard(queue)
+        if not feed.subscribers:
+            self._feeds.pop(room, None)
+            if feed.task:
+                feed.task.cancel()
+
+    def _fan_out(self, feed: RoomFeed, event: dict):
+        for queue in feed.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # note: a slow reader gets one lagging marker and resyncs from the log
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.LAGGING)
+
+    async def _follow(self, room: str, feed: RoomFeed):
+        rs = self.redis_service
+        events_key = rs._events_key(room)
+        clock_key = rs._clock_log_key(room)
+        streams = {
+            events_key: f"{await rs.get_latest_seq(room)}-0",
+            clock_key: "$",
+        }
+        while feed.subscribers:
+            try:
+                result = await rs.rb.xread(streams, block=self.BLOCK_MS, count=100)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Live stream read failed for {room}: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            for key, entries in result or []:
+                key = key.decode() if isinstance(key, bytes) else key
+                for entry_id, fields in entries:
+                    streams[key] = entry_id
+                    if key == events_key:
+                        self._fan_out(feed, rs._decode_event(entry_id, fields))
+                    else:
+                        clock = rs._decode_clock([
+                            fields[b"running"], fields[b"period"], fields[b"remaining_ms"],
+                            fields[b"anchor_ms"], fields[b"version"],
+                        ])
+                        self._fan_out(feed, {"type": "clock", "data": {**clock, "server_time_ms": clock["anchor_ms"]}})
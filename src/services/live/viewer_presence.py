@@ -0,0 +1,110 @@
+import asyncio
+import time
+from src.extensions import settings
+from src.services.redis_service import RedisService
+
+class ViewerPresenceService:
+    """
+    Viewer counts per match and per league, shared by every worker through Redis.
+    Unique viewers are a HyperLogLog, concurrent viewers a sorted set of sid -> last seen.
+
+    Each worker re-scores its own joined sockets every ttl / 3 seconds, so a viewer stays
+    counted for the lifetime of its socket without sending anything. Sockets of a worker
+    that died age out after the ttl.
+    """
+    def __init__(self):
+        self.r = RedisService().r
+        self.ttl = settings.get("live_presence_ttl_seconds", 90)
+        # note: (sid, match_id) -> league_id for the sockets of this worker
+        self._local: dict[tuple[str, str], str | None] = {}
+        self._refresh_task: asyncio.Task | None = None
+
+    @staticmethod
+    def _unique_key(scope: str, scope_id: str) -> str:
+        return f"presence:{scope}:{scope_id}:unique"
+
+    @staticmethod
+    def _viewers_key(scope: str, scope_id: str) -> str:
+        return f"presence:{scope}:{scope_id}:viewers"
+
+    def _scopes(self, match_id: str, league_id: str | None) -> list[tuple[str, str]]:
+        scopes = [("match", match_id)]
+        if league_id:
+            scopes.append(("league", league_id))
+        return scopes
+
+    async def join(self, sid: str, match_id: str, league_id: str | None = None, viewer_id: str | None = None):
+        now = time.time()
+        try:
+            async with self.r.pipeline(transaction=False) as pipe:
+                for scope, scope_id in self._scopes(match_id, league_id):
+                    pipe.pfadd(self._unique_key(scope, scope_id), viewer_id or sid)
+                    pipe.zadd(self._viewers_key(scope, scope_id), {sid: now})
+                    pipe.expire(self._unique_key(scope, scope_id), RedisService.STATE_TTL)
+                    pipe.expire(self._viewers_key(scope, scope_id), RedisService.STATE_TTL)
+                await pipe.execute()
+            self._local[(sid, match_id)] = league_id
+            self._ensure_refreshing()
+        except Exception as e:
+            print(f"Error recording viewer presence for {match_id}: {e}")
+
+    async def heartbeat(self, sid: str, match_id: str, league_id: str | None = None):
+        try:
+            async with self.r.pipeline(transaction=False) as pipe:
+                for scope, scope_id in self._scopes(match_id, league_id):
+                    pipe.zadd(self._viewers_key(scope, scope_id), {sid: time.time()})
+                await pipe.execute()
+        except Exception as e:
+            print(f"Error refreshing viewer presence for {match_id}: {e}")
+
+    async def leave(self, sid: str, match_id: str, league_id: str | None = None):
+        self._local.pop((sid, match_id), None)
+        try:
+            async with self.r.pipeline(transaction=False) as pipe:
+                for scope, scope_id in self._scopes(match_id, league_id):
+                    pipe.zrem(self._viewers_key(scope, scope_id), sid)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Error removing viewer presence for {match_id}: {e}")
+
+    def _ensure_refreshing(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self):
+        while self._local:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                now = time.time()
+                async with self.r.pipeline(transaction=False) as pipe:
+                    for (sid, match_id), league_id in list(self._local.items()):
+                        for scope, scope_id in self._scopes(match_id, league_id):
+                            pipe.zadd(self._viewers_key(scope, scope_id), {sid: now})
+                    await pipe.execute()
+            except Exception as e:
+                print(f"Error refreshing viewer presence: {e}")
+
+    async def get_counts(self, scope: str, scope_id: str) -> dict:
+        viewers_key = self._viewers_key(scope, scope_id)
+        try:
+            async with self.r.pipeline(transaction=False) as pipe:
+                # note: sockets that died without a disconnect age out after the ttl
+                pipe.zremrangebyscore(viewers_key, "-inf", time.time() - self.ttl)
+                pipe.zcard(viewers_key)
+                pipe.pfcount(self._unique_key(scope, scope_id))
+                _, concurrent, unique = await pipe.execute()
+        except Exception as e:
+            print(f"Error getting viewer counts for {scope} {scope_id}: {e}")
+            concurrent, unique = 0, 0
+
+        return {
+            f"{scope}_id": scope_id,
+            "concurrent_viewers": concurrent,
+            "unique_viewers": unique,
+        }
+
+    async def get_match_counts(self, match_id: str) -> dict:
+        return await self.get_counts("match", match_id)
+
+    async def get_league_counts(self, league_id: str) -> dict:
+        return await self.get_counts("league", league_id)
@@ -1,7 +1,12 @@
 import asyncio
 from typing import List, Optional
-from sqlalchemy import  and_, func, or_, select, update
+from sqlalchemy import  Integer, String, and_, column, delete, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from src.models.records import LeagueMatchRecordModel
+from src.models.sync_receipt import SyncReceiptModel
+from src.services.match.player_match_stats_service import PlayerMatchStatsService
+from src.services.league.league_metrics_service import LeagueMetricsService
+from src.services.redis_service import RedisService
 from src.services.scheduler.job_wrapper import monitor_match_status_wrapper
 from src.models.player import LeaguePlayerModel, PlayerModel, PlayerTeamModel
 from src.services.league.league_category_service import LeagueCategoryService
@@ -418,143 +423,361 @@ class LeagueMatchService:
         self,
         league_match_id: str,
         data: dict,
+        idempotency_key: Optional[str] = None,
+        staff_id: Optional[str] = None,
     ) -> Optional[str]:
+        message, _ = await self.finalize_match_once(league_match_id, data, idempotency_key, staff_id)
+        return message
+
+    async def finalize_match_once(
+        self,
+        league_match_id: str,
+        data: dict,
+        idempotency_key: Optional[str] = None,
+        staff_id: Optional[str] = None,
+    ) -> tuple[Optional[str], bool]:
+        """
+        Returns the result message and whether this call applied it, False when the
+        idempotency_key was already finalized and the stored message is returned.
+        """
+        async with AsyncSession() as session:
+            if idempotency_key:
+                receipt_id = await self.claim_receipt(session, idempotency_key, "finalize", league_match_id, staff_id)
+                if receipt_id is None:
+                    # note: replayed request, answer with the stored result instead of double counting
+                    return await self.get_receipt_message(session, idempotency_key), False
+
+            message = await self.finalize_match_in_session(session, league_match_id, data)
+            if idempotency_key:
+                await self.complete_receipt(session, receipt_id, {"message": message})
+            await session.commit()
+            await LeagueMetricsService().invalidate(*session.info.get("finalized_league_ids", ()))
+            return message, True
+
+    async def finalize_match_in_session(self, session, league_match_id: str, data: dict) -> str:
         try:
-            async with AsyncSession() as session:
-                stmt = (
-                    select(LeagueMatchModel)
-                    .where(LeagueMatchModel.league_match_id == league_match_id)
-                    .options(
-                        selectinload(LeagueMatchModel.home_team),
-                        selectinload(LeagueMatchModel.away_team), 
-                        selectinload(LeagueMatchModel.home_team, LeagueTeamModel.team),
-                        selectinload(LeagueMatchModel.away_team, LeagueTeamModel.team),
-                    )
+            stmt = (
+                select(LeagueMatchModel)
+                .where(LeagueMatchModel.league_match_id == league_match_id)
+                .options(
+                    selectinload(LeagueMatchModel.home_team),
+                    selectinload(LeagueMatchModel.away_team), 
+                    selectinload(LeagueMatchModel.home_team, LeagueTeamModel.team),
+                    selectinload(LeagueMatchModel.away_team, LeagueTeamModel.team),
                 )
-                res = await session.execute(stmt)
-                match = res.scalars().first()
-
-                if not match:
-                    raise ValueError(f"Match {league_match_id} not found")
-
-                if match.status == "Completed":
-                    raise ValueError(f"Match {league_match_id} has already been finalized")
-
-                if match.home_team_id is None or match.away_team_id is None:
-                    raise ValueError("Cannot finalize match with unresolved teams")
-
-                home_players = data['home_team']['players']
-                away_players = data['away_team']['players']
-                all_players_data = home_players + away_players
-
-                player_ids_in_match = [p['player_id'] for p in all_players_data]
-
-                if player_ids_in_match:
-                    stmt = select(PlayerModel).where(PlayerModel.player_id.in_(player_ids_in_match))
-                    result = await session.execute(stmt)
-                    player_models_map = {p.player_id: p for p in result.scalars().all()}
-                else:
-                    player_models_map = {}
-
-                for player_data in all_players_data:
-                    player_id = player_data['player_id']
-                    player_stats = player_data['summary']
-                    player_model = player_models_map.get(player_id)
-
-                    if not player_model:
-                        continue
-
-                    player_model.total_games_played += 1
-                    player_model.total_points_scored += player_data.get('total_score', 0)
+            )
+            res = await session.execute(stmt)
+            match = res.scalars().first()
 
-                    for json_key, model_attr in self.STATS_MAP.items():
-                        stat_value = player_stats.get(json_key, 0)
-                        current_value = getattr(player_model, model_attr, 0)
-                        setattr(player_model, model_attr, current_value + stat_value)
+            if not match:
+                raise ValueError(f"Match {league_match_id} not found")
+
+            if match.status == "Completed":
+                raise ValueError(f"Match {league_match_id} has already been finalized")
+
+            if match.home_team_id is None or match.away_team_id is None:
+                raise ValueError("Cannot finalize match with unresolved teams")
+
+            # note: callers drop the cached league metrics once the transaction commits
+            session.info.setdefault("finalized_league_ids", set()).add(match.league_id)
+
+            record, all_players_data = await self._resolve_final_record(league_match_id, data)
+            home_total_score = record['home_total_score']
+            away_total_score = record['away_total_score']
+
+            updated_player_ids = await self._apply_player_stat_increments(session, all_players_data)
+            await PlayerMatchStatsService.insert_rows(session, PlayerMatchStatsService.build_rows(
+                all_players_data,
+                league_match_id=match.league_match_id,
+                league_id=match.league_id,
+                home_team_id=match.home_team_id,
+                away_team_id=match.away_team_id,
+                played_at=match.scheduled_date,
+                player_ids=updated_player_ids,
+            ))
+
+            match.home_team_score = home_total_score
+            match.away_team_score = away_total_score
+
+            if home_total_score > away_total_score:
+                match.winner_team_id = match.home_team_id
+                match.loser_team_id = match.away_team_id
+                winner_name = match.home_team.team.team_name
+                winner_score = home_total_score
+                loser_score = away_total_score
+
+            elif away_total_score > home_total_score:
+                match.winner_team_id = match.away_team_id
+                match.loser_team_id = match.home_team_id
+                winner_name = match.away_team.team.team_name
+                winner_score = away_total_score
+                loser_score = home_total_score
+
+            else:
+                raise ValueError("Draws are not allowed in this format")
+
+            match.status = "Completed"
+            match.finalized_at = datetime.utcnow()
+
+            league_team_ids = [match.home_team_id, match.away_team_id]
+            stmt = select(LeagueTeamModel.league_team_id, LeagueTeamModel.team_id).where(
+                LeagueTeamModel.league_team_id.in_(league_team_ids),
+                LeagueTeamModel.league_category_id == match.league_category_id
+            )
+            team_rows = (await session.execute(stmt)).all()
 
-                home_total_score = data['home_total_score']
-                away_total_score = data['away_total_score']
+            if not team_rows:
+                stmt = select(LeagueTeamModel.league_team_id, LeagueTeamModel.team_id).where(
+                    LeagueTeamModel.team_id.in_(league_team_ids),
+                    LeagueTeamModel.league_category_id == match.league_category_id
+                )
+                team_rows = (await session.execute(stmt)).all()
 
-                match.home_team_score = home_total_score
-                match.away_team_score = away_total_score
+            winner_team = next(
+                (t for t in team_rows if t.league_team_id == match.winner_team_id or t.team_id == match.winner_team_id),
+                None
+            )
+            loser_team = next(
+                (t for t in team_rows if t.league_team_id == match.loser_team_id or t.team_id == match.loser_team_id),
+                None
+            )
 
-                if home_total_score > away_total_score:
-                    match.winner_team_id = match.home_team_id
-                    match.loser_team_id = match.away_team_id
-                    winner_name = match.home_team.team.team_name
-                    winner_score = home_total_score
-                    loser_score = away_total_score
+            team_results = []
+            if winner_team:
+                team_results.append((winner_team.league_team_id, winner_team.team_id, 1, 0, winner_score))
+            if loser_team:
+                team_results.append((loser_team.league_team_id, loser_team.team_id, 0, 1, loser_score))
+            await self._apply_team_result_increments(session, team_results)
 
-                elif away_total_score > home_total_score:
-                    match.winner_team_id = match.away_team_id
-                    match.loser_team_id = match.home_team_id
-                    winner_name = match.away_team.team.team_name
-                    winner_score = away_total_score
-                    loser_score = home_total_score
+            home_team_name = match.home_team.team.team_name
+            away_team_name = match.away_team.team.team_name
 
-                else:
-                    raise ValueError("Draws are not allowed in this format")
+            new_record = LeagueMatchRecordModel(
+                league_id=match.league_id,
+                league_match_id=match.league_match_id,
+                record_json=record
+            )
 
-                match.status = "Completed"
-                match.finalized_at = datetime.utcnow()
+            session.add(new_record)
 
-                league_team_ids = [match.home_team_id, match.away_team_id]
-                stmt = select(LeagueTeamModel).where(
-                    LeagueTeamModel.league_team_id.in_(league_team_ids),
-                    LeagueTeamModel.league_category_id == match.league_category_id
-                )
-                result = await session.execute(stmt)
-                team_models = {team.league_team_id: team for team in result.scalars().all()}
+            return f"{home_team_name} vs {away_team_name} finalized winner: {winner_name}"
 
-                if not team_models:
-                    stmt = select(LeagueTeamModel).where(
-                        LeagueTeamModel.team_id.in_(league_team_ids),
-                        LeagueTeamModel.league_category_id == match.league_category_id
-                    )
-                    result = await session.execute(stmt)
-                    team_models = {team.team_id: team for team in result.scalars().all()}
+        except KeyError as e:
+            raise ValueError(f"Malformed match data: missing key {e}") from e
+        except Exception:
+            raise
 
-                winner_team = team_models.get(match.winner_team_id) or next(
-                    (t for t in team_models.values() if t.team_id == match.winner_team_id or t.league_team_id == match.winner_team_id),
-                    None
-                )
-                loser_team = team_models.get(match.loser_team_id) or next(
-                    (t for t in team_models.values() if t.team_id == match.loser_team_id or t.league_team_id == match.loser_team_id),
-                    None
-                )
+    @staticmethod
+    async def _resolve_final_record(league_match_id: str, data: dict) -> tuple[dict, list[dict]]:
+        """
+        Picks what a finalization applies: the dict stored as the match record and the
+        per-player stats the increments are applied from.
+
+        - data["score_source"] == "box_score" or "payload" picks one explicitly
+        - a client payload is stored as sent, when the live box score has the same totals
+          its per-event stats drive the increments, otherwise the payload's own stats do
+        - without a payload the box score is applied, when it has points for someone
+        """
+        source = data.get("score_source")
+        if source not in (None, "box_score", "payload"):
+            raise ValueError(f"Unknown score_source {source}")
+
+        has_payload = "home_total_score" in data and "away_total_score" in data
+        if source == "payload":
+            return data, PlayerMatchStatsService.players_from_record(data)
+
+        box_score = await RedisService().get_box_score(league_match_id)
+        box_totals = (box_score['home_total_score'], box_score['away_total_score'])
+        if source == "box_score" or not has_payload:
+            if not box_score['players'] or box_totals == (0, 0):
+                raise ValueError("No final score was sent and the live box score has no points")
+            return box_score, box_score['players']
+
+        # note: the payload keeps its team names and per-team layout, the record shape clients read
+        if box_score['players'] and box_totals == (data['home_total_score'], data['away_total_score']):
+            return data, box_score['players']
+        return data, PlayerMatchStatsService.players_from_record(data)
+
+        box_score = await RedisService().get_box_score(league_match_id)
+        box_totals = (box_score['home_total_score'], box_score['away_total_score'])
+        if source == "box_score" or not has_payload:
+            if not box_score['players'] or box_totals == (0, 0):
+                raise ValueError("No final score was sent and the live box score has no points")
+            return box_score
+
+        if source is None and box_score['players'] and box_totals == (data['home_total_score'], data['away_total_score']):
+            return box_score
+        return data
 
-                if winner_team:
-                    winner_team.wins += 1
-                    winner_team.points += winner_score
+    @staticmethod
+    async def claim_receipt(
+        session,
+        idempotency_key: str,
+        item_type: str,
+        league_match_id: Optional[str] = None,
+        staff_id: Optional[str] = None,
+    ) -> Optional[str]:
+        # note: returns None when the key was already applied, the unique index does the dedupe
+        stmt = (
+            pg_insert(SyncReceiptModel)
+            .values(
+                idempotency_key=idempotency_key,
+                item_type=item_type,
+                league_match_id=league_match_id,
+                staff_id=staff_id,
+            )
+            .on_conflict_do_nothing(index_elements=[SyncReceiptModel.idempotency_key])
+            .returning(SyncReceiptModel.receipt_id)
+        )
+        return (await session.execute(stmt)).scalar_one_or_none()
 
-                    if winner_team.team:
-                        winner_team.team.total_wins += 1
-                        winner_team.team.total_points += winner_score
+    @staticmethod
+    async def claim_receipts(
+        session,
+        idempotency_keys: list[str],
+        item_type: str,
+        league_match_id: Optional[str] = None,
+        staff_id: Optional[str] = None,
+    ) -> set[str]:
+        # note: batch form of claim_receipt, returns the keys that were not applied before
+        idempotency_keys = list(dict.fromkeys(idempotency_keys))
+        if not idempotency_keys:
+            return set()
+        stmt = (
+            pg_insert(SyncReceiptModel)
+            .values([
+                {
+                    "idempotency_key": key,
+                    "item_type": item_type,
+                    "league_match_id": league_match_id,
+                    "staff_id": staff_id,
+                }
+                for key in idempotency_keys
+            ])
+            .on_conflict_do_nothing(index_elements=[SyncReceiptModel.idempotency_key])
+            .returning(SyncReceiptModel.idempotency_key)
+        )
+        return set((await session.execute(stmt)).scalars().all())
 
-                if loser_team:
-                    loser_team.losses += 1
-                    loser_team.points += loser_score
+    @staticmethod
+    async def release_receipts(session, idempotency_keys: list[str]):
+        if idempotency_keys:
+            await session.execute(
+                delete(SyncReceiptModel).where(SyncReceiptModel.idempotency_key.in_(idempotency_keys))
+            )
 
-                    if loser_team.team:
-                        loser_team.team.total_losses += 1
-                        loser_team.team.total_points += loser_score
+    @staticmethod
+    async def complete_receipt(session, receipt_id: str, result: dict):
+        await session.execute(
+            update(SyncReceiptModel)
+            .where(SyncReceiptModel.receipt_id == receipt_id)
+            .values(result_json=result)
+        )
 
-                new_record = LeagueMatchRecordModel(
-                    league_id=match.league_id,
-                    league_match_id=match.league_match_id,
-                    record_json=data
-                )
+    @staticmethod
+    async def get_receipt_message(session, idempotency_key: str) -> Optional[str]:
+        result = await session.execute(
+            select(SyncReceiptModel.result_json)
+            .where(SyncReceiptModel.idempotency_key == idempotency_key)
+        )
+        result_json = result.scalar_one_or_none() or {}
+        return result_json.get("message", "Already applied")
+
+    async def _apply_player_stat_increments(self, session, players_data: list[dict]) -> set[str]:
+        # note: one UPDATE ... FROM (VALUES ...) for every player in the match,
+        # no PlayerModel objects (and their eager-loaded relationships) are loaded
+        increments: dict[str, dict] = {}
+        for player_data in players_data:
+            player_stats = player_data['summary']
+            row = increments.setdefault(player_data['player_id'], {
+                "games": 0,
+                "points": 0,
+                **{json_key: 0 for json_key in self.STATS_MAP},
+            })
+            row["games"] += 1
+            row["points"] += player_data.get('total_score', 0)
+            for json_key in self.STATS_MAP:
+                row[json_key] += player_stats.get(json_key, 0)
+
+        if not increments:
+            return set()
+
+        stat_keys = ["games", "points", *self.STATS_MAP]
+        rows = values(
+            column("player_id", String),
+            *(column(key, Integer) for key in stat_keys),
+            name="player_increments",
+        ).data([
+            (player_id, *(row[key] for key in stat_keys))
+            for player_id, row in increments.items()
+        ])
 
-                session.add(new_record)
-                await session.commit()
-                await session.refresh(match)
+        result = await session.execute(
+            update(PlayerModel)
+            .where(PlayerModel.player_id == rows.c.player_id)
+            .values(
+                total_games_played=PlayerModel.total_games_played + rows.c.games,
+                total_points_scored=PlayerModel.total_points_scored + rows.c.points,
+                **{
+                    model_attr: getattr(PlayerModel, model_attr) + rows.c[json_key]
+                    for json_key, model_attr in self.STATS_MAP.items()
+                },
+            )
+            .returning(PlayerModel.player_id)
+            .execution_options(synchronize_session=False)
+        )
+        return set(result.scalars().all())
+
+    async def _apply_team_result_increments(self, session, team_results: list[tuple]):
+        # note: rows are (league_team_id, team_id, wins, losses, points), applied to
+        # league teams and their teams with one UPDATE ... FROM (VALUES ...) each
+        if not team_results:
+            return
+
+        league_rows = values(
+            column("league_team_id", String),
+            column("wins", Integer),
+            column("losses", Integer),
+            column("points", Integer),
+            name="league_team_increments",
+        ).data([(league_team_id, wins, losses, points) for league_team_id, _, wins, losses, points in team_results])
+
+        await session.execute(
+            update(LeagueTeamModel)
+            .where(LeagueTeamModel.league_team_id == league_rows.c.league_team_id)
+            .values(
+                wins=LeagueTeamModel.wins + league_rows.c.wins,
+                losses=LeagueTeamModel.losses + league_rows.c.losses,
+                points=LeagueTeamModel.points + league_rows.c.points,
+            )
+            .execution_options(synchronize_session=False)
+        )
 
-                return f"{match.home_team.team.team_name} vs {match.away_team.team.team_name} finalized winner: {winner_name}"
+        team_results = [result for result in team_results if result[1]]
+        if not team_results:
+            return
+
+        team_rows = values(
+            column("team_id", String),
+            column("wins", Integer),
+            column("losses", Integer),
+            column("points", Integer),
+            name="team_increments",
+        ).data([(team_id, wins, losses, points) for _, team_id, wins, losses, points in team_results])
+
+        await session.execute(
+            update(TeamModel)
+            .where(TeamModel.team_id == team_rows.c.team_id)
+            .values(
+                total_wins=TeamModel.total_wins + team_rows.c.wins,
+                total_losses=TeamModel.total_losses + team_rows.c.losses,
+                total_points=TeamModel.total_points + team_rows.c.points,
+            )
+            .execution_options(synchronize_session=False)
+        )
 
-        except KeyError as e:
-            raise ValueError(f"Malformed match data: missing key {e}") from e
-        except Exception:
-            raise
+    async def get_box_score(self, league_match_id: str) -> dict:
+        return await RedisService().get_box_score(league_match_id)
         
     async def get_user_matches(self, user_id: str, data: dict):
         async with AsyncSession() as session:
@@ -0,0 +1,136 @@
+from datetime import datetime, timezone
+from sqlalchemy import Integer, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from src.extensions import AsyncSession
+from src.services.league.league_metrics_service import LeagueMetricsService
+from src.models.match import LeagueMatchModel
+from src.models.player import PlayerModel
+from src.models.player_match_stat import PlayerMatchStatModel
+from src.models.records import LeagueMatchRecordModel
+
+class PlayerMatchStatsService:
+    STAT_COLUMNS = tuple(
+        c.name for c in PlayerMatchStatModel.__table__.columns
+        if isinstance(c.type, Integer)
+    )
+
+    @staticmethod
+    def players_from_record(record_json: dict) -> list[dict]:
+        # note: box score records already carry a side, client payloads split players per team
+        if record_json.get("players") is not None:
+            return record_json["players"]
+        return (
+            [{**p, "side": "home"} for p in record_json["home_team"]["players"]]
+            + [{**p, "side": "away"} for p in record_json["away_team"]["players"]]
+        )
+
+    @classmethod
+    def build_rows(
+        cls,
+        players_data: list[dict],
+        league_match_id: str,
+        league_id: str,
+        home_team_id: str | None,
+        away_team_id: str | None,
+        played_at: datetime | None,
+        player_ids: set[str] | None = None,
+    ) -> list[dict]:
+        team_ids = {"home": home_team_id, "away": away_team_id}
+        played_at = played_at or datetime.now(timezone.utc)
+        rows: dict[str, dict] = {}
+        for player_data in players_data:
+            player_id = player_data.get("player_id")
+            if not player_id or (player_ids is not None and player_id not in player_ids):
+                continue
+
+            summary = player_data.get("summary") or {}
+            row = rows.setdefault(player_id, {
+                "player_id": player_id,
+                "league_match_id": league_match_id,
+                "league_id": league_id,
+                "league_team_id": team_ids.get(player_data.get("side")),
+                "side": player_data.get("side"),
+                "played_at": played_at,
+                **{stat: 0 for stat in cls.STAT_COLUMNS},
+            })
+            row["pts"] += player_data.get("total_score", 0)
+            for stat in cls.STAT_COLUMNS:
+                if stat != "pts":
+                    row[stat] += summary.get(stat, 0)
+        return list(rows.values())
+
+    @staticmethod
+    async def insert_rows(session, rows: list[dict]):
+        if not rows:
+            return
+        await session.execute(
+            pg_insert(PlayerMatchStatModel).on_conflict_do_nothing(
+                index_elements=["player_id", "league_match_id"]
+            ),
+            rows,
+        )
+
+    async def backfill(self, chunk_size: int = 200) -> int:
+        # note: keyset pages over the records, one short transaction per chunk
+        # so the backfill can run next to live traffic and be restarted safely
+        last_record_id = ""
+        total = 0
+        while True:
+            async with AsyncSession() as session:
+                result = await session.execute(
+                    select(
+                        LeagueMatchRecordModel.record_id,
+                        LeagueMatchRecordModel.record_json,
+                        LeagueMatchRecordModel.record_created_at,
+                        LeagueMatchModel.league_match_id,
+                        LeagueMatchModel.league_id,
+                        LeagueMatchModel.home_team_id,
+                        LeagueMatchModel.away_team_id,
+                        LeagueMatchModel.scheduled_date,
+                    )
+                    .join(LeagueMatchModel, LeagueMatchModel.league_match_id == LeagueMatchRecordModel.league_match_id)
+                    .where(LeagueMatchRecordModel.record_id > last_record_id)
+                    .order_by(LeagueMatchRecordModel.record_id)
+                    .limit(chunk_size)
+                )
+                records = result.all()
+                if not records:
+                    break
+
+                players_by_record = {}
+                for record in records:
+                    try:
+                        players_by_record[record.record_id] = self.players_from_record(record.record_json)
+                    except (KeyError, TypeError, AttributeError):
+                        print(f"Skipping malformed record {record.record_id}")
+
+                player_ids = {
+                    p.get("player_id")
+                    for players in players_by_record.values()
+                    for p in players
+                    if p.get("player_id")
+                }
+                existing = set((await session.execute(
+                    select(PlayerModel.player_id).where(PlayerModel.player_id.in_(player_ids))
+                )).scalars().all()) if player_ids else set()
+
+                rows = []
+                for record in records:
+                    rows.extend(self.build_rows(
+                        players_by_record.get(record.record_id, []),
+                        league_match_id=record.league_match_id,
+                        league_id=record.league_id,
+                        home_team_id=record.home_team_id,
+                        away_team_id=record.away_team_id,
+                        played_at=record.scheduled_date or record.record_created_at,
+                        player_ids=existing,
+                    ))
+
+                await self.insert_rows(session, rows)
+                await session.commit()
+            await LeagueMetricsService().invalidate(*{record.league_id for record in records})
+
+            total += len(rows)
+            last_record_id = records[-1].record_id
+            print(f"Backfilled {len(records)} records, {len(rows)} stat lines (last {last_record_id})")
+        return total
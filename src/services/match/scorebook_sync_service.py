@@ -0,0 +1,152 @@
+import traceback
+from src.extensions import AsyncSession
+from src.services.match.match_service import LeagueMatchService
+from src.services.redis_service import RedisService
+
+class ScorebookSyncService:
+    """
+    Applies a staff device's queued scorebook work in one call.
+    Every item carries an idempotency key, replays come back as "duplicate" instead of double counting.
+    """
+    def __init__(self):
+        self.match_service = LeagueMatchService()
+        self.redis_service = RedisService()
+
+    async def sync(self, data: dict, staff_id: str | None = None) -> dict:
+        results = []
+        for match_item in data.get("matches", []):
+            results.extend(await self._sync_match(match_item, staff_id))
+
+        return {
+            "results": results,
+            "applied": sum(1 for r in results if r["status"] == "applied"),
+            "duplicates": sum(1 for r in results if r["status"] == "duplicate"),
+            "errors": sum(1 for r in results if r["status"] == "error"),
+        }
+
+    async def _sync_match(self, match_item: dict, staff_id: str | None) -> list[dict]:
+        league_match_id = match_item.get("league_match_id")
+        if not league_match_id:
+            return [self._result(None, None, "match", "error", "league_match_id is required")]
+
+        # note: events first, finalization reads the box score they build
+        results = await self._apply_events(league_match_id, match_item.get("events", []), staff_id)
+
+        finalize = match_item.get("finalize")
+        if finalize:
+            results.append(await self._apply_finalize(league_match_id, finalize, staff_id))
+        return results
+
+    @staticmethod
+    def _validate_event(event: dict) -> str | None:
+        if not event.get("idempotency_key"):
+            return "idempotency_key is required"
+        event_type = event.get("type")
+        if event_type == "stat":
+            stat = event.get("stat")
+            if (
+                event.get("side") not in ("home", "away")
+                or not event.get("player_id")
+                or (stat != "pts" and stat not in LeagueMatchService.STATS_MAP)
+            ):
+                return "Invalid stat event"
+            try:
+                int(event.get("delta", 1))
+            except (TypeError, ValueError):
+                return "Invalid stat event"
+        elif event_type != "patch":
+            return f"Unknown event type {event_type}"
+        return None
+
+    async def _apply_events(self, league_match_id: str, events: list[dict], staff_id: str | None) -> list[dict]:
+        """
+        Receipts for the events are written in one transaction that commits after the events
+        reach Redis, a replay is a duplicate no matter how long after. The Redis applied set
+        still gates each event so a commit that fails after the Redis writes is not applied
+        twice on retry.
+        """
+        results = [None] * len(events)
+        valid = []
+        for index, event in enumerate(events):
+            error = self._validate_event(event)
+            if error:
+                results[index] = self._result(league_match_id, event.get("idempotency_key"), event.get("type"), "error", error)
+            else:
+                valid.append((index, event))
+
+        if valid:
+            try:
+                async with AsyncSession() as session:
+                    claimed = await self.match_service.claim_receipts(
+                        session, [event["idempotency_key"] for _, event in valid], "event", league_match_id, staff_id
+                    )
+                    failed = []
+                    for index, event in valid:
+                        key = event["idempotency_key"]
+                        if key not in claimed:
+                            results[index] = self._result(league_match_id, key, event["type"], "duplicate")
+                            continue
+                        try:
+                            applied = await self._apply_event(league_match_id, event)
+                            results[index] = self._result(league_match_id, key, event["type"], "applied" if applied else "duplicate")
+                        except Exception as e:
+                            traceback.print_exc()
+                            failed.append(key)
+                            results[index] = self._result(league_match_id, key, event["type"], "error", str(e))
+                    # note: failed events keep no receipt so the device can send them again
+                    await self.match_service.release_receipts(session, failed)
+                    await session.commit()
+            except Exception as e:
+                traceback.print_exc()
+                for index, event in valid:
+                    if results[index] is None or results[index]["status"] == "applied":
+                        results[index] = self._result(league_match_id, event["idempotency_key"], event["type"], "error", str(e))
+        return results
+
+    async def _apply_event(self, league_match_id: str, event: dict) -> bool:
+        key = event["idempotency_key"]
+        if event["type"] == "stat":
+            applied, _ = await self.redis_service.incr_box_score_once(
+                league_match_id, key, event["player_id"], event["side"], event["stat"], int(event.get("delta", 1))
+            )
+        else:
+            patch = event.get("patch") or {}
+            applied, seq = await self.redis_service.append_event_once(league_match_id, key, "patch", patch)
+            if applied:
+                await self._broadcast_patch(league_match_id, seq, patch)
+        return applied
+
+    @staticmethod
+    async def _broadcast_patch(league_match_id: str, seq: int, patch: dict):
+        # note: same path as a live scorer's patch, the event is already in the log if this fails
+        from src.extensions import socket_service
+
+        try:
+            await socket_service.live_match_namespace.broadcast_patch(league_match_id, seq, patch)
+        except Exception as e:
+            print(f"Failed to broadcast synced patch for {league_match_id}: {e}")
+
+    async def _apply_finalize(self, league_match_id: str, finalize: dict, staff_id: str | None) -> dict:
+        key = finalize.get("idempotency_key")
+        if not key:
+            return self._result(league_match_id, key, "finalize", "error", "idempotency_key is required")
+
+        try:
+            message, applied = await self.match_service.finalize_match_once(
+                league_match_id, finalize.get("data") or {}, key, staff_id
+            )
+        except Exception as e:
+            traceback.print_exc()
+            return self._result(league_match_id, key, "finalize", "error", str(e))
+
+        return self._result(league_match_id, key, "finalize", "applied" if applied else "duplicate", message)
+
+    @staticmethod
+    def _result(league_match_id, idempotency_key, item_type, status: str, message: str | None = None) -> dict:
+        return {
+            "league_match_id": league_match_id,
+            "idempotency_key": idempotency_key,
+            "type": item_type,
+            "status": status,
+            "message": message,
+        }
@@ -1,13 +1,17 @@
-from collections import defaultdict
 import time
 import socketio
-from sqlalchemy import or_, select, desc
+from sqlalchemy import and_, func, or_, select, desc, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import selectinload
 from src.models.user import UserModel
 from src.models.message import MessageModel
+from src.models.conversation_summary import CURRENT_XID, SNAPSHOT_XMIN, ConversationSummaryModel
+from src.services.notification_outbox_service import NotificationOutboxService
+from src.services.user_presence_service import UserPresenceService
 from src.extensions import AsyncSession
 from src.utils.api_response import ApiException
+from src.utils.db_utils import decode_cursor, decode_xid_cursor, encode_cursor, encode_xid_cursor
 import traceback
 
 class MessageService:
@@ -20,99 +24,171 @@ class MessageService:
             self._sio = socket_service.sio
         return self._sio
 
-    async def get_conversations(self, user_id: str):
-        async with AsyncSession() as session:
-            try:
-                result = await session.execute(
-                    select(MessageModel)
-                    .where(
-                        or_(
-                            MessageModel.sender_id == user_id,
-                            MessageModel.receiver_id == user_id,
-                        )
-                    )
-                    .options(
-                        selectinload(MessageModel.sender).selectinload(UserModel.player),
-                        selectinload(MessageModel.sender).selectinload(UserModel.league_administrator),
-                        selectinload(MessageModel.receiver).selectinload(UserModel.player),
-                        selectinload(MessageModel.receiver).selectinload(UserModel.league_administrator),
-                    )
-                    .order_by(MessageModel.sent_at.asc())
-                )
-                messages = result.scalars().all()
-                conversations = defaultdict(list)
+    PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
 
-                def resolve_image(user: UserModel) -> str | None:
-                    if user.league_administrator:
-                        return user.league_administrator.organization_logo_url
-                    elif user.player:
-                        return user.player.profile_image_url
-                    return None
+    async def get_conversations(self, user_id: str, cursor: str | None = None, limit: int | None = None, since: str | None = None) -> dict:
+        """
+        Chat inbox from conversation_summaries_table.
 
-                for msg in messages:
-                    try:
-                        if msg.sender_id == user_id:
-                            other_user = msg.receiver
-                            other_id = msg.receiver_entity_id
-                            other_name = msg.receiver_name
-                            other_user_id = msg.receiver_id
-                        else:
-                            other_user = msg.sender
-                            other_id = msg.sender_entity_id
-                            other_name = msg.sender_name
-                            other_user_id = msg.sender_id
+        - without since: conversations newest first, pass next_cursor back as cursor for the
+          next page, the first page also returns since
+        - with since: every conversation changed after it, oldest change first, including ones
+          whose messages were all deleted (last_message is None), keep the returned since.
+          A since from before the transaction id cursor starts the sync over
+        """
+        limit = min(max(int(limit or self.PAGE_SIZE), 1), self.MAX_PAGE_SIZE)
+        summary = ConversationSummaryModel
 
-                        conversation_key = other_user_id
-                        image_url = resolve_image(other_user)
+        if since:
+            since_xid, summary_id = decode_xid_cursor(since) or (0, "")
+            stmt = (
+                select(summary)
+                .where(
+                    summary.owner_id == user_id,
+                    tuple_(summary.change_xid, summary.conversation_summary_id) > tuple_(since_xid, summary_id),
+                )
+                .order_by(summary.change_xid, summary.conversation_summary_id)
+                .limit(limit + 1)
+            )
+        else:
+            stmt = (
+                select(summary)
+                .where(summary.owner_id == user_id, summary.last_message_at.is_not(None))
+                .order_by(summary.last_message_at.desc(), summary.conversation_summary_id.desc())
+                .limit(limit + 1)
+            )
+            if cursor:
+                last_message_at, summary_id = decode_cursor(cursor)
+                stmt = stmt.where(
+                    tuple_(summary.last_message_at, summary.conversation_summary_id) < tuple_(last_message_at, summary_id)
+                )
 
-                        conversations[conversation_key].append({
-                            "message": msg.to_json(),
-                            "user_id": other_user_id,
-                            "entity_id": other_id,
-                            "name": other_name,
-                            "image_url": image_url,
-                        })
-                    except Exception:
-                        continue
+        async with AsyncSession() as session:
+            try:
+                # note: every transaction below the horizon has finished, read before the rows so
+                # whatever they show is at least as new as the horizon
+                horizon = await session.scalar(select(SNAPSHOT_XMIN))
 
-                response = []
-                for conversation_key, msgs in conversations.items():
-                    if not msgs:
-                        continue
+                if since:
+                    rows = (await session.scalars(stmt.where(summary.change_xid < horizon))).all()
+                    page = rows[:limit]
+                    has_more = len(rows) > limit
+                    return {
+                        "conversations": [row.to_json() for row in page],
+                        "has_more": has_more,
+                        "since": (
+                            encode_xid_cursor(page[-1].change_xid, page[-1].conversation_summary_id) if has_more
+                            else encode_xid_cursor(max(horizon, since_xid), "")
+                        ),
+                    }
 
-                    try:
-                        meta = msgs[0]
-                        messages_data = [m["message"] for m in msgs]
-                        messages_data.sort(key=lambda x: x.get('sent_at', ''))
+                rows = (await session.scalars(stmt)).all()
+                page = rows[:limit]
+                has_more = len(rows) > limit
+                response = {
+                    "conversations": [row.to_json() for row in page],
+                    "next_cursor": encode_cursor(page[-1].last_message_at, page[-1].conversation_summary_id) if has_more else None,
+                }
+                if not cursor:
+                    response["since"] = encode_xid_cursor(horizon, "")
+                return response
+            except Exception as e:
+                traceback.print_exc()
+                raise e
 
-                        conversation = {
-                            "conversation_with": {
-                                "user_id": meta["user_id"],
-                                "entity_id": meta["entity_id"],
-                                "name": meta["name"],
-                                "image_url": meta["image_url"],
-                            },
-                            "messages": messages_data,
-                            "last_message_at": messages_data[-1].get('sent_at') if messages_data else None,
-                        }
+    @staticmethod
+    def _resolve_image(user: UserModel) -> str | None:
+        if user.league_administrator:
+            return user.league_administrator.organization_logo_url
+        elif user.player:
+            return user.player.profile_image_url
+        return None
 
-                        response.append(conversation)
-                    except Exception:
-                        continue
+    async def _record_message(self, session, msg: MessageModel, sender: UserModel, receiver: UserModel):
+        # note: both sides of the conversation in one upsert, only the receiver gains an unread
+        last_message = {
+            "last_message_id": msg.message_id,
+            "last_message_sender_id": msg.sender_id,
+            "last_message_content": msg.content,
+            "last_message_at": msg.sent_at,
+        }
+        stmt = pg_insert(ConversationSummaryModel).values([
+            {
+                "owner_id": msg.sender_id,
+                "partner_id": msg.receiver_id,
+                "partner_entity_id": msg.receiver_entity_id,
+                "partner_name": msg.receiver_name,
+                "partner_image_url": self._resolve_image(receiver),
+                "unread_count": 0,
+                "updated_at": func.now(),
+                **last_message,
+            },
+            {
+                "owner_id": msg.receiver_id,
+                "partner_id": msg.sender_id,
+                "partner_entity_id": msg.sender_entity_id,
+                "partner_name": msg.sender_name,
+                "partner_image_url": self._resolve_image(sender),
+                "unread_count": 1,
+                "updated_at": func.now(),
+                **last_message,
+            },
+        ])
+        await session.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_conversation_summaries_owner_partner",
+                set_={
+                    **{key: stmt.excluded[key] for key in (
+                        "partner_entity_id", "partner_name", "partner_image_url", *last_message
+                    )},
+                    "unread_count": ConversationSummaryModel.unread_count + stmt.excluded.unread_count,
+                    "updated_at": func.now(),
+                    "change_xid": CURRENT_XID,
+                },
+            )
+        )
 
-                response.sort(
-                    key=lambda x: x.get('last_message_at', ''),
-                    reverse=True
+    async def _record_deletion(self, session, message: MessageModel):
+        # note: call after the delete is flushed so the previous message becomes the last one
+        summary = ConversationSummaryModel
+        latest = (await session.scalars(
+            select(MessageModel)
+            .where(
+                or_(
+                    and_(MessageModel.sender_id == message.sender_id, MessageModel.receiver_id == message.receiver_id),
+                    and_(MessageModel.sender_id == message.receiver_id, MessageModel.receiver_id == message.sender_id),
                 )
+            )
+            .order_by(MessageModel.sent_at.desc())
+            .limit(1)
+        )).first()
 
-                for conv in response:
-                    conv.pop('last_message_at', None)
+        await session.execute(
+            update(summary)
+            .where(summary.last_message_id == message.message_id)
+            .values(
+                last_message_id=latest.message_id if latest else None,
+                last_message_sender_id=latest.sender_id if latest else None,
+                last_message_content=latest.content if latest else None,
+                last_message_at=latest.sent_at if latest else None,
+                updated_at=func.now(),
+                change_xid=CURRENT_XID,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(
+            update(summary)
+            .where(
+                summary.owner_id == message.receiver_id,
+                summary.partner_id == message.sender_id,
+                summary.unread_count > 0,
+                or_(summary.last_read_at.is_(None), summary.last_read_at < message.sent_at),
+            )
+            .values(unread_count=summary.unread_count - 1, updated_at=func.now(), change_xid=CURRENT_XID)
+            .execution_options(synchronize_session=False)
+        )
 
-                return response
-            except Exception as e:
-                traceback.print_exc()
-                raise e
-    
     async def send_message_notification(self, data: dict, enable_notification: bool) -> str:
         async with AsyncSession() as session:
             try:
@@ -166,13 +242,27 @@ class MessageService:
 
                 msg = MessageModel(**enriched_data)
                 session.add(msg)
+                await session.flush()
+                await self._record_message(session, msg, sender, receiver)
+
+                # note: the push is queued with the message and sent by the outbox dispatcher,
+                # a receiver with a socket in user:<receiver_id> already gets new_message and is not pushed
+                if enable_notification and not await UserPresenceService().is_online(
+                    msg.receiver_id, UserPresenceService.CHAT_ROOM
+                ):
+                    await NotificationOutboxService.enqueue(
+                        session,
+                        to_id=msg.receiver_id,
+                        title=f"From: {msg.sender_name}",
+                        message=msg.content,
+                        dedupe_key=f"message:{msg.message_id}",
+                    )
                 await session.commit()
 
                 await session.refresh(
                     msg,
                     attribute_names=["sender", "receiver"]
                 )
-                await msg.send_notification(enable=enable_notification)
                 await self._emit_message_notifications(msg, sender, receiver)
                 return "Message sent successfully."
             except (IntegrityError, SQLAlchemyError) as e:
@@ -252,15 +342,35 @@ class MessageService:
     async def mark_messages_as_read(self, user_id: str, conversation_partner_id: str):
         async with AsyncSession() as session:
             try:
+                await session.execute(
+                    update(ConversationSummaryModel)
+                    .where(
+                        ConversationSummaryModel.owner_id == user_id,
+                        ConversationSummaryModel.partner_id == conversation_partner_id,
+                    )
+                    .values(
+                        unread_count=0,
+                        last_read_at=func.now(),
+                        updated_at=func.now(),
+                        change_xid=CURRENT_XID,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
                 return "Messages marked as read"
             except Exception as e:
+                await session.rollback()
                 traceback.print_exc()
                 raise e
 
     async def get_unread_message_count(self, user_id: str):
         async with AsyncSession() as session:
             try:
-                return {"unread_count": 0}
+                unread = await session.scalar(
+                    select(func.coalesce(func.sum(ConversationSummaryModel.unread_count), 0))
+                    .where(ConversationSummaryModel.owner_id == user_id)
+                )
+                return {"unread_count": unread}
             except Exception as e:
                 traceback.print_exc()
                 raise e
@@ -278,6 +388,8 @@ class MessageService:
                 if message.sender_id != user_id:
                     raise ApiException("Permission denied")
                 await session.delete(message)
+                await session.flush()
+                await self._record_deletion(session, message)
                 await session.commit()
                 sio = self._get_sio()
                 deletion_payload = {
@@ -0,0 +1,133 @@
+import logging
+import uuid
+from collections import Counter
+from sqlalchemy import func, select
+from src.extensions import AsyncSession, redis_client, settings
+from src.models.notification import NotificationModel
+
+logger = logging.getLogger(__name__)
+
+class NotificationCounterService:
+    """
+    Unread notification count per user in "notifications:unread:<user_id>", so the app badge
+    is one GET instead of a count over the whole inbox.
+
+    - the counter is seeded from the database on first read and expires after
+      notification_unread_ttl_seconds
+    - a seed is only written when no increment or decrement reached the unseeded counter while
+      the database was read: the reader sets "<key>:seeding" to its token first, updates that
+      find no counter delete it, and the seed script checks the token is still there. A seed
+      that raced an update is skipped and the next read counts again, it is never stale
+    - update the counter after the commit that inserted or changed the rows
+    """
+    SEEDING_TTL_SECONDS = 30
+
+    # note: KEYS are the counters then their seeding markers, returns -1 for unseeded users
+    INCR_LUA = """
+    local n = #KEYS / 2
+    local counts = {}
+    for i = 1, n do
+        local key = KEYS[i]
+        if redis.call('EXISTS', key) == 1 then
+            local value = redis.call('INCRBY', key, ARGV[i])
+            if value < 0 then
+                redis.call('SET', key, 0, 'KEEPTTL')
+                value = 0
+            end
+            counts[i] = value
+        else
+            redis.call('DEL', KEYS[n + i])
+            counts[i] = -1
+        end
+    end
+    return counts
+    """
+
+    # note: returns the stored count, or -1 when the seed was invalidated meanwhile
+    SEED_LUA = """
+    local current = redis.call('GET', KEYS[1])
+    if current then
+        return tonumber(current)
+    end
+    if redis.call('GET', KEYS[2]) ~= ARGV[1] then
+        return -1
+    end
+    redis.call('DEL', KEYS[2])
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return tonumber(ARGV[2])
+    """
+
+    def __init__(self):
+        self.ttl = settings.get("notification_unread_ttl_seconds", 86400)
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"notifications:unread:{user_id}"
+
+    @classmethod
+    def _seeding_key(cls, user_id: str) -> str:
+        return f"{cls._key(user_id)}:seeding"
+
+    async def _apply(self, deltas: dict[str, int]) -> dict[str, int]:
+        deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+        if not deltas:
+            return {}
+        if not hasattr(self, "_incr_script"):
+            self._incr_script = redis_client.register_script(self.INCR_LUA)
+        try:
+            user_ids = list(deltas)
+            counts = await self._incr_script(
+                keys=[self._key(user_id) for user_id in user_ids] + [self._seeding_key(user_id) for user_id in user_ids],
+                args=[deltas[user_id] for user_id in user_ids],
+            )
+            return {user_id: count for user_id, count in zip(user_ids, counts) if count >= 0}
+        except Exception as e:
+            # note: a missed update is repaired when the counter expires and is re-seeded
+            logger.error(f"❌ Failed to update unread counters: {e}")
+            return {}
+
+    async def increment(self, user_ids) -> dict[str, int]:
+        """
+        One increment per occurrence of a user id, returns the new counts of seeded users.
+        """
+        return await self._apply(Counter(user_ids))
+
+    async def decrement(self, user_id: str, amount: int = 1) -> dict[str, int]:
+        return await self._apply({user_id: -amount})
+
+    async def reset(self, user_id: str):
+        try:
+            await redis_client.set(self._key(user_id), 0, ex=self.ttl)
+        except Exception as e:
+            logger.error(f"❌ Failed to reset unread counter for {user_id}: {e}")
+
+    async def get(self, user_id: str) -> int:
+        token = uuid.uuid4().hex
+        try:
+            cached = await redis_client.get(self._key(user_id))
+            if cached is not None:
+                return int(cached)
+            await redis_client.set(self._seeding_key(user_id), token, ex=self.SEEDING_TTL_SECONDS)
+        except Exception as e:
+            logger.error(f"❌ Failed to read unread counter for {user_id}: {e}")
+
+        async with AsyncSession() as session:
+            count = await session.scalar(
+                select(func.count())
+                .select_from(NotificationModel)
+                .where(NotificationModel.to_id == user_id, NotificationModel.status == "unread")
+            )
+
+        if not hasattr(self, "_seed_script"):
+            self._seed_script = redis_client.register_script(self.SEED_LUA)
+        try:
+            stored = await self._seed_script(
+                keys=[self._key(user_id), self._seeding_key(user_id)],
+                args=[token, count, self.ttl],
+            )
+            # note: a counter seeded by another request meanwhile is newer than this read
+            if int(stored) >= 0:
+                return int(stored)
+        except Exception as e:
+            logger.error(f"❌ Failed to seed unread counter for {user_id}: {e}")
+        return count
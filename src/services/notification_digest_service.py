@@ -0,0 +1,210 @@
+import hashlib
+import json
+import logging
+import time
+from src.extensions import AsyncSession, redis_client, settings
+from src.services.notification_outbox_service import NotificationOutboxService
+from src.services.notification_service import publish_notifications, route_notifications
+
+logger = logging.getLogger(__name__)
+
+class NotificationDigestService:
+    """
+    Groups notifications per recipient and collapse key (e.g. "schedule:<league_id>") over a
+    short window and sends one inbox row and push per group instead of one per item.
+
+    - "digest:items:<collapse_key>:<user_id>" is a hash of item key -> item, re-adding an item
+      (a match rescheduled within the window) replaces it
+    - "digest:due" is a sorted set of "<collapse_key>|<user_id>" scored by flush time, the window
+      starts at the first item so a busy admin cannot delay a digest forever
+    - a flush leases its groups in "digest:processing" and moves their items to
+      "digest:claimed:<collapse_key>:<user_id>", a flush that fails or dies gives them back to
+      the due set once the lease expires, a group still leased is pushed back instead of claimed
+    - pushes are capped per user per hour, over the cap the inbox row is still written
+    """
+    # note: claims due groups and leases their items in one step so two workers never flush the same group
+    CLAIM_LUA = """
+    local now = tonumber(ARGV[1])
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+    for _, member in ipairs(expired) do
+        local suffix = member:gsub('|', ':', 1)
+        local items_key = ARGV[4] .. suffix
+        local claimed_key = ARGV[5] .. suffix
+        local items = redis.call('HGETALL', claimed_key)
+        for i = 1, #items, 2 do
+            redis.call('HSETNX', items_key, items[i], items[i + 1])
+        end
+        redis.call('DEL', claimed_key)
+        redis.call('ZREM', KEYS[2], member)
+        if #items > 0 then
+            redis.call('EXPIRE', items_key, tonumber(ARGV[6]))
+            redis.call('ZADD', KEYS[1], now, member)
+        end
+    end
+
+    local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, tonumber(ARGV[2]))
+    local claimed = {}
+    for _, member in ipairs(due) do
+        redis.call('ZREM', KEYS[1], member)
+        if redis.call('ZSCORE', KEYS[2], member) then
+            redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), member)
+        else
+            local suffix = member:gsub('|', ':', 1)
+            local items_key = ARGV[4] .. suffix
+            local claimed_key = ARGV[5] .. suffix
+            if redis.call('EXISTS', items_key) == 1 then
+                redis.call('RENAME', items_key, claimed_key)
+                redis.call('ZADD', KEYS[2], now + tonumber(ARGV[3]), member)
+                table.insert(claimed, member)
+                table.insert(claimed, redis.call('HVALS', claimed_key))
+            end
+        end
+    end
+    return claimed
+    """
+
+    DUE_KEY = "digest:due"
+    PROCESSING_KEY = "digest:processing"
+    MESSAGE_LIMIT = 255
+
+    def __init__(self):
+        self.enabled = settings.get("notification_digest_enabled", False)
+        self.window_seconds = settings.get("notification_digest_window_seconds", 60)
+        self.batch_size = settings.get("notification_digest_batch_size", 200)
+        self.max_pushes_per_hour = settings.get("notification_max_pushes_per_hour", 10)
+        self.lease_seconds = settings.get("notification_digest_lease_seconds", 300)
+
+    @staticmethod
+    def _items_key(collapse_key: str, user_id: str) -> str:
+        return f"digest:items:{collapse_key}:{user_id}"
+
+    @staticmethod
+    def _claimed_key(collapse_key: str, user_id: str) -> str:
+        return f"digest:claimed:{collapse_key}:{user_id}"
+
+    @staticmethod
+    def _rate_key(user_id: str, hour: int) -> str:
+        return f"digest:rate:{user_id}:{hour}"
+
+    async def add(self, user_ids, collapse_key: str, item_key: str, notification: dict, line: str, summary_title: str):
+        """
+        notification is what the user gets when the item ends up alone in its group, line is
+        its entry in the summary of a larger group.
+        """
+        item = json.dumps({**notification, "line": line, "summary_title": summary_title})
+        flush_at = time.time() + self.window_seconds
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for user_id in dict.fromkeys(user_ids):
+                items_key = self._items_key(collapse_key, user_id)
+                pipe.hset(items_key, item_key, item)
+                # note: outlives the window so a slow flush never finds an expired group
+                pipe.expire(items_key, self.window_seconds + 3600)
+                pipe.zadd(self.DUE_KEY, {f"{collapse_key}|{user_id}": flush_at}, nx=True)
+            await pipe.execute()
+
+    async def _claim(self) -> list[tuple[str, str, list[dict]]]:
+        if not hasattr(self, "_claim_script"):
+            self._claim_script = redis_client.register_script(self.CLAIM_LUA)
+        claimed = await self._claim_script(
+            keys=[self.DUE_KEY, self.PROCESSING_KEY],
+            args=[
+                time.time(), self.batch_size, self.lease_seconds,
+                "digest:items:", "digest:claimed:", self.window_seconds + 3600,
+            ],
+        )
+        groups = []
+        for member, items in zip(claimed[::2], claimed[1::2]):
+            collapse_key, user_id = member.split("|", 1)
+            groups.append((collapse_key, user_id, [json.loads(item) for item in items]))
+        return groups
+
+    async def _ack(self, groups: list[tuple[str, str, list[dict]]]):
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for collapse_key, user_id, _ in groups:
+                pipe.zrem(self.PROCESSING_KEY, f"{collapse_key}|{user_id}")
+                pipe.delete(self._claimed_key(collapse_key, user_id))
+            await pipe.execute()
+
+    def _summarize(self, collapse_key: str, user_id: str, items: list[dict]) -> dict:
+        if len(items) == 1:
+            item = items[0]
+            payload = {key: value for key, value in item.items() if key not in ("line", "summary_title")}
+        else:
+            message = "\n".join(item["line"] for item in items)
+            if len(message) > self.MESSAGE_LIMIT:
+                message = message[:self.MESSAGE_LIMIT - 1] + "…"
+            payload = {
+                "title": f"{items[-1]['summary_title']} ({len(items)})",
+                "message": message,
+                "data": {"collapse_key": collapse_key},
+            }
+        return {
+            **payload,
+            "to_id": user_id,
+            # note: stable across retries, a flush that committed but lost its lease is not pushed twice
+            "dedupe_key": f"digest:{collapse_key}:{user_id}:{self._fingerprint(items)}",
+        }
+
+    @staticmethod
+    def _fingerprint(items: list[dict]) -> str:
+        encoded = sorted(json.dumps(item, sort_keys=True) for item in items)
+        return hashlib.sha1("\n".join(encoded).encode()).hexdigest()[:16]
+
+    async def _within_rate(self, user_ids: list[str]) -> set[str]:
+        if not user_ids:
+            return set()
+        hour = int(time.time() // 3600)
+        counts = await redis_client.mget([self._rate_key(user_id, hour) for user_id in user_ids])
+        return {user_id for user_id, count in zip(user_ids, counts) if int(count or 0) < self.max_pushes_per_hour}
+
+    async def _count_pushes(self, user_ids: list[str]):
+        # note: only pushes that were queued count against the hourly cap
+        hour = int(time.time() // 3600)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.incr(self._rate_key(user_id, hour))
+                pipe.expire(self._rate_key(user_id, hour), 3600)
+            await pipe.execute()
+
+    async def flush_batch(self) -> dict:
+        groups = await self._claim()
+        if not groups:
+            return {"groups": 0, "queued": 0, "capped": 0}
+
+        payloads = [self._summarize(collapse_key, user_id, items) for collapse_key, user_id, items in groups]
+        async with AsyncSession() as session:
+            try:
+                notifications, online, _ = await route_notifications(session, payloads, enable=False)
+                offline = [data for data in payloads if data["to_id"] not in online]
+                allowed = await self._within_rate([data["to_id"] for data in offline])
+                pushes = [data for data in offline if data["to_id"] in allowed]
+                queued = await NotificationOutboxService.enqueue_many(session, pushes)
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                # note: the groups stay leased and go back to the due set once the lease expires
+                logger.error(f"❌ Failed to flush {len(groups)} notification digests: {e}")
+                raise e
+
+        await self._ack(groups)
+        if queued:
+            await self._count_pushes([data["to_id"] for data in pushes])
+        await publish_notifications(notifications, online)
+        return {"groups": len(groups), "queued": queued, "capped": sum(data["to_id"] not in allowed for data in offline)}
+
+    async def flush(self) -> int:
+        flushed = 0
+        while True:
+            stats = await self.flush_batch()
+            flushed += stats["groups"]
+            if stats["groups"] < self.batch_size:
+                return flushed
+
+    async def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "window_seconds": self.window_seconds,
+            "pending_groups": await redis_client.zcard(self.DUE_KEY),
+            "processing_groups": await redis_client.zcard(self.PROCESSING_KEY),
+            "due_groups": await redis_client.zcount(self.DUE_KEY, "-inf", time.time()),
+        }
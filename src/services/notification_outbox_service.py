@@ -0,0 +1,193 @@
+from sqlalchemy import String, Text, case, column, func, literal, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from src.extensions import AsyncSession, settings
+from src.models.notification_outbox import NotificationOutboxModel
+from src.models.user import UserModel
+from src.services.fcm_token_service import FcmTokenService
+from src.services.notification_service import send_notifications
+
+class NotificationOutboxService:
+    """
+    Push notifications are written to notification_outbox_table in the caller's transaction
+    and sent later by the dispatcher job, so requests never wait on FCM. A row targets either
+    a user's token (to_id) or an FCM topic.
+
+    - the dispatcher claims due rows with FOR UPDATE SKIP LOCKED and leases them by pushing
+      next_attempt_at forward, several workers can drain the outbox at once
+    - failed rows back off exponentially and turn "dead" after outbox_max_attempts
+    """
+    def __init__(self):
+        self.batch_size = settings.get("outbox_batch_size", 500)
+        self.max_attempts = settings.get("outbox_max_attempts", 6)
+        self.base_backoff = settings.get("outbox_base_backoff_seconds", 5)
+        self.max_backoff = settings.get("outbox_max_backoff_seconds", 3600)
+        self.lease_seconds = settings.get("outbox_lease_seconds", 60)
+
+    @staticmethod
+    def _row(payload: dict) -> dict:
+        return {
+            "to_id": payload.get("to_id"),
+            "topic": payload.get("topic"),
+            "title": payload.get("title"),
+            "body": payload["message"],
+            "data": payload.get("data"),
+            "dedupe_key": payload.get("dedupe_key"),
+        }
+
+    @classmethod
+    async def enqueue_many(cls, session, payloads: list[dict]) -> int:
+        if not payloads:
+            return 0
+        result = await session.execute(
+            pg_insert(NotificationOutboxModel)
+            .values([cls._row(payload) for payload in payloads])
+            .on_conflict_do_nothing(index_elements=["dedupe_key"])
+            .returning(NotificationOutboxModel.outbox_id)
+        )
+        return len(result.all())
+
+    @classmethod
+    async def enqueue(cls, session, to_id: str, title: str | None, message: str, data: dict | None = None, dedupe_key: str | None = None) -> bool:
+        return bool(await cls.enqueue_many(session, [{
+            "to_id": to_id,
+            "title": title,
+            "message": message,
+            "data": data,
+            "dedupe_key": dedupe_key,
+        }]))
+
+    @staticmethod
+    def _seconds(value):
+        return func.make_interval(0, 0, 0, 0, 0, 0, value)
+
+    async def _claim(self, session) -> list:
+        due = (
+            select(NotificationOutboxModel.outbox_id)
+            .where(
+                NotificationOutboxModel.status == "pending",
+                NotificationOutboxModel.next_attempt_at <= func.now(),
+            )
+            .order_by(NotificationOutboxModel.next_attempt_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(
+            update(NotificationOutboxModel)
+            .where(NotificationOutboxModel.outbox_id.in_(due))
+            .values(
+                attempts=NotificationOutboxModel.attempts + 1,
+                next_attempt_at=func.now() + self._seconds(self.lease_seconds),
+            )
+            .returning(
+                NotificationOutboxModel.outbox_id,
+                NotificationOutboxModel.to_id,
+                NotificationOutboxModel.topic,
+                NotificationOutboxModel.title,
+                NotificationOutboxModel.body,
+                NotificationOutboxModel.data,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.all()
+
+    async def _mark_sent(self, session, outbox_ids: list[str]):
+        if outbox_ids:
+            await session.execute(
+                update(NotificationOutboxModel)
+                .where(NotificationOutboxModel.outbox_id.in_(outbox_ids))
+                .values(status="sent", sent_at=func.now(), last_error=None)
+                .execution_options(synchronize_session=False)
+            )
+
+    async def _mark_failed(self, session, errors: dict[str, str], permanent: bool = False):
+        if not errors:
+            return
+        rows = values(
+            column("outbox_id", String),
+            column("error", Text),
+            name="outbox_errors",
+        ).data(list(errors.items()))
+
+        model = NotificationOutboxModel
+        give_up = model.attempts >= self.max_attempts
+        backoff = func.least(self.max_backoff, self.base_backoff * func.power(2, model.attempts - 1))
+        await session.execute(
+            update(model)
+            .where(model.outbox_id == rows.c.outbox_id)
+            .values(
+                status="dead" if permanent else case(
+                    (give_up, literal("dead", model.status.type)),
+                    else_=literal("pending", model.status.type),
+                ),
+                next_attempt_at=func.now() + self._seconds(backoff),
+                last_error=rows.c.error,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def dispatch_batch(self) -> dict:
+        async with AsyncSession() as session:
+            claimed = await self._claim(session)
+            await session.commit()
+            if not claimed:
+                return {"claimed": 0, "sent": 0, "failed": 0}
+
+            # note: a token that keeps failing is skipped like in recipient selection
+            token_service = FcmTokenService()
+            tokens = {
+                user.user_id: user.fcm_token
+                for user in (await session.execute(
+                    select(UserModel.user_id, UserModel.fcm_token, UserModel.fcm_token_health)
+                    .where(UserModel.user_id.in_({row.to_id for row in claimed if row.to_id}))
+                )).all()
+                if token_service.is_healthy(user)
+            }
+
+            deliverable = [row for row in claimed if row.topic or tokens.get(row.to_id)]
+            payloads = [
+                {
+                    "to_id": row.to_id,
+                    "fcm_token": None if row.topic else tokens[row.to_id],
+                    "topic": row.topic,
+                    "title": row.title,
+                    "message": row.body,
+                    "data": row.data,
+                }
+                for row in deliverable
+            ]
+            result = await send_notifications(payloads, enable=True)
+
+            errors = {deliverable[f.index].outbox_id: f"{f.code}: {f.error}" for f in result.failures}
+            permanent = {
+                deliverable[f.index].outbox_id for f in result.failures if f.kind in ("dead_token", "invalid_message")
+            }
+            await self._mark_sent(session, [row.outbox_id for row in deliverable if row.outbox_id not in errors])
+            await self._mark_failed(session, {k: v for k, v in errors.items() if k not in permanent})
+            # note: retrying an uninstalled app's token or a rejected payload never succeeds
+            await self._mark_failed(session, {k: errors[k] for k in permanent}, permanent=True)
+            await token_service.record_results(session, payloads, result)
+            # note: nothing to send to until the user registers a device or the token recovers
+            await self._mark_failed(
+                session,
+                {row.outbox_id: "no healthy fcm token" for row in claimed if not row.topic and not tokens.get(row.to_id)},
+                permanent=True,
+            )
+            await session.commit()
+
+        return {"claimed": len(claimed), "sent": result.sent, "failed": len(result.failures)}
+
+    async def dispatch(self) -> int:
+        claimed = 0
+        while True:
+            stats = await self.dispatch_batch()
+            claimed += stats["claimed"]
+            if stats["claimed"] < self.batch_size:
+                return claimed
+
+    async def get_stats(self) -> dict:
+        async with AsyncSession() as session:
+            result = await session.execute(
+                select(NotificationOutboxModel.status, func.count())
+                .group_by(NotificationOutboxModel.status)
+            )
+            return dict(result.all())
@@ -1,64 +1,295 @@
+import asyncio
 from asyncio import to_thread
-from sqlalchemy import select
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from src.extensions import AsyncSession
 from src.models.notification import NotificationModel
-from src.extensions import settings
+from src.services.notification_counter_service import NotificationCounterService
 from src.utils.api_response import ApiException
-from firebase_admin import messaging
-from dataclasses import dataclass
+from src.utils.db_utils import decode_cursor, encode_cursor
+from firebase_admin import exceptions, messaging
+from dataclasses import dataclass, field
 
 @dataclass
-class NotificationResult:
-    title: str
-    message: str
+class FanoutFailure:
+    user_id: str | None
+    fcm_token: str | None
+    code: str | None
+    error: str
+    index: int | None = None
+    kind: str = "transient"
 
-async def create_notification(data: dict):
-    async with AsyncSession() as session:
+def classify_fcm_error(error: Exception) -> str:
+    """
+    "dead_token" when FCM rejects the registration token itself (app uninstalled, token from
+    another sender, malformed token), "invalid_message" when it rejects the message (payload
+    too large, bad field) and resending it cannot succeed, "transient" for anything worth retrying.
+    Failures of a whole send_each call are reported as "batch_error".
+    """
+    if isinstance(error, (messaging.UnregisteredError, messaging.SenderIdMismatchError)):
+        return "dead_token"
+    if isinstance(error, exceptions.InvalidArgumentError):
+        # note: invalid-argument covers the payload too, only a complaint about the token prunes it
+        return "dead_token" if "registration token" in str(error).lower() else "invalid_message"
+    return "transient"
+
+@dataclass
+class FanoutResult:
+    inserted: int = 0
+    queued: int = 0
+    emitted: int = 0
+    sent: int = 0
+    failures: list[FanoutFailure] = field(default_factory=list)
+
+    def to_json(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "queued": self.queued,
+            "emitted": self.emitted,
+            "sent": self.sent,
+            "failed": len(self.failures),
+            "failures": [vars(f) for f in self.failures],
+        }
+
+FCM_BATCH_SIZE = 500
+# note: FCM rejects messages over 4 KB, a long chat message is cut well below that
+FCM_BODY_MAX_CHARS = 1000
+
+def _push_body(message: str) -> str:
+    if len(message) <= FCM_BODY_MAX_CHARS:
+        return message
+    return message[:FCM_BODY_MAX_CHARS - 1] + "…"
+
+def _notification_row(data: dict) -> dict:
+    return {
+        "action_type": data.get("action_type", "message_only"),
+        "action_payload": data.get("action_payload"),
+        "title": data.get("title"),
+        "message": data["message"],
+        "to_id": data["to_id"],
+        "status": data.get("status", "unread"),
+        "dedupe_key": data.get("dedupe_key"),
+    }
+
+async def insert_notifications(session, payloads: list[dict]) -> list[NotificationModel]:
+    # note: ORM bulk insert, asyncpg sends it as one multi-row INSERT ... RETURNING per 1000 rows,
+    # rows whose (to_id, dedupe_key) already exists are skipped and not returned
+    if not payloads:
+        return []
+    result = await session.scalars(
+        pg_insert(NotificationModel)
+        .on_conflict_do_nothing(index_elements=["to_id", "dedupe_key"])
+        .returning(NotificationModel),
+        [_notification_row(data) for data in payloads],
+    )
+    return list(result.all())
+
+async def route_notifications(session, payloads: list[dict], enable: bool = False) -> tuple[list[NotificationModel], set[str], int]:
+    """
+    Inserts the inbox rows and, when enabled, queues pushes in the outbox only for recipients
+    with no live socket, a payload with "push": False only gets its inbox row. Returns the rows and the online recipients, hand both to
+    publish_notifications after the commit, and the number of queued pushes.
+    """
+    from src.services.notification_outbox_service import NotificationOutboxService
+    from src.services.user_presence_service import UserPresenceService
+
+    notifications = await insert_notifications(session, payloads)
+    # note: payloads deduped by the inbox are not pushed again either
+    inserted = {(notif.to_id, notif.dedupe_key) for notif in notifications}
+    payloads = [data for data in payloads if (data["to_id"], data.get("dedupe_key")) in inserted]
+    online = await UserPresenceService().online_users(
+        (data["to_id"] for data in payloads), UserPresenceService.NOTIFY_ROOM
+    )
+    queued = 0
+    if enable:
+        queued = await NotificationOutboxService.enqueue_many(
+            session, [data for data in payloads if data["to_id"] not in online and data.get("push", True)]
+        )
+    return notifications, online, queued
+
+async def publish_notifications(notifications: list[NotificationModel], online: set[str]) -> int:
+    """
+    Post-commit side of new inbox rows: bumps the unread counters and emits new_notification,
+    with the recipient's unread_count when known, to online recipients.
+    """
+    from src.extensions import socket_service
+
+    unread = await NotificationCounterService().increment(
+        notif.to_id for notif in notifications if notif.status == "unread"
+    )
+    emitted = 0
+    for notif in notifications:
+        if notif.to_id not in online:
+            continue
         try:
-            notif = NotificationModel(
-                action_type=data.get("action_type", "message_only"),
-                action_payload=data.get("action_payload"),
-                title=data.get("title"),
-                message=data["message"],
-                to_id=data["to_id"],
-                status=data.get("status", "unread"),
+            payload = notif.to_json()
+            if notif.to_id in unread:
+                payload["unread_count"] = unread[notif.to_id]
+            await socket_service.sio.emit("new_notification", payload, room=f"notify:{notif.to_id}")
+            emitted += 1
+        except Exception as e:
+            print(f"Failed to emit notification {notif.notification_id}: {e}")
+    return emitted
+
+async def send_notifications(payloads: list[dict], enable: bool = False) -> FanoutResult:
+    result = FanoutResult()
+    targets = [(i, data) for i, data in enumerate(payloads) if data.get("fcm_token") or data.get("topic")]
+    if not enable or not targets:
+        return result
+
+    chunks = [targets[i:i + FCM_BATCH_SIZE] for i in range(0, len(targets), FCM_BATCH_SIZE)]
+    messages = [
+        [
+            messaging.Message(
+                notification=messaging.Notification(title=data.get("title"), body=_push_body(data["message"])),
+                data={key: str(value) for key, value in data["data"].items()} if data.get("data") else None,
+                token=data.get("fcm_token"),
+                topic=data.get("topic"),
+            )
+            for _, data in chunk
+        ]
+        for chunk in chunks
+    ]
+    responses = await asyncio.gather(
+        *(to_thread(messaging.send_each, batch) for batch in messages),
+        return_exceptions=True,
+    )
+
+    for chunk, response in zip(chunks, responses):
+        if isinstance(response, Exception):
+            # note: the whole HTTP call failed, report every token of the chunk
+            result.failures.extend(
+                FanoutFailure(data.get("to_id"), data.get("fcm_token"), getattr(response, "code", None), str(response), i,
+                              "batch_error")
+                for i, data in chunk
             )
-            session.add(notif)
+            continue
+        result.sent += response.success_count
+        for (i, data), send_response in zip(chunk, response.responses):
+            if not send_response.success:
+                error = send_response.exception
+                result.failures.append(
+                    FanoutFailure(data.get("to_id"), data.get("fcm_token"), getattr(error, "code", None), str(error), i,
+                                  classify_fcm_error(error))
+                )
+    return result
+
+async def fanout_notifications(payloads: list[dict], enable: bool = False) -> FanoutResult:
+    """
+    Inserts one notification per payload in a single statement. Recipients with a live socket
+    get it over the socket, the rest, when enabled, get a push queued in the notification outbox
+    in the same transaction. The outbox dispatcher sends them through FCM send_each in batches
+    of 500. Payloads use the NotificationModel columns, dedupe_key is optional.
+    """
+    async with AsyncSession() as session:
+        try:
+            notifications, online, queued = await route_notifications(session, payloads, enable)
             await session.commit()
-            
-            return NotificationResult(
-                title=notif.title,
-                message=notif.message
+        except SQLAlchemyError as e:
+            await session.rollback()
+            raise e
+
+    emitted = await publish_notifications(notifications, online)
+    return FanoutResult(inserted=len(notifications), queued=queued, emitted=emitted)
+
+async def broadcast_notification(topic: str, recipient_ids: list[str], notification: dict, enable: bool = False) -> FanoutResult:
+    """
+    Topic counterpart of fanout_notifications: one inbox row per recipient in a single statement
+    and, when enabled, a single outbox row the dispatcher sends to the FCM topic. The dedupe_key
+    of the notification applies to that outbox row. A topic push reaches online recipients too,
+    they also get the row over the socket.
+    """
+    from src.services.notification_outbox_service import NotificationOutboxService
+    from src.services.user_presence_service import UserPresenceService
+
+    recipient_ids = list(dict.fromkeys(recipient_ids))
+    async with AsyncSession() as session:
+        try:
+            notifications = await insert_notifications(
+                session, [{**notification, "to_id": user_id} for user_id in recipient_ids]
             )
+            queued = 0
+            if enable and notifications:
+                queued = await NotificationOutboxService.enqueue_many(session, [{**notification, "topic": topic}])
+            await session.commit()
         except SQLAlchemyError as e:
             await session.rollback()
             raise e
-        
-async def send_notification(receiver_token, notif: NotificationResult, enable: bool = False):
-    if enable and receiver_token:
-        message = messaging.Message(
-            notification=messaging.Notification(
-                title=notif.title,
-                body=notif.message
-            ),
-            token=receiver_token
-        )
-        await to_thread(messaging.send, message)
-            
+
+    online = await UserPresenceService().online_users(recipient_ids, UserPresenceService.NOTIFY_ROOM)
+    emitted = await publish_notifications(notifications, online)
+    return FanoutResult(inserted=len(notifications), queued=queued, emitted=emitted)
+
 class NotificationService:
-    async def get_notifications(self, user_id: str):
+    PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
+    def __init__(self):
+        self.counter = NotificationCounterService()
+
+    async def get_notifications(self, user_id: str, cursor: str | None = None, limit: int | None = None) -> dict:
+        """
+        One page of the inbox, newest first. next_cursor is None on the last page, pass it back
+        as cursor for the following page.
+        """
+        limit = min(max(int(limit or self.PAGE_SIZE), 1), self.MAX_PAGE_SIZE)
+        stmt = (
+            select(NotificationModel)
+            .where(NotificationModel.to_id == user_id)
+            .order_by(NotificationModel.created_at.desc(), NotificationModel.notification_id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            created_at, notification_id = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(NotificationModel.created_at, NotificationModel.notification_id) < tuple_(created_at, notification_id)
+            )
+
+        async with AsyncSession() as session:
+            notifications = (await session.scalars(stmt)).all()
+
+        page = notifications[:limit]
+        next_cursor = None
+        if len(notifications) > limit:
+            next_cursor = encode_cursor(page[-1].created_at, page[-1].notification_id)
+        return {
+            "notifications": page,
+            "next_cursor": next_cursor,
+            "unread_count": await self.counter.get(user_id),
+        }
+
+    async def get_unread_count(self, user_id: str) -> int:
+        return await self.counter.get(user_id)
+
+    async def mark_read(self, user_id: str, notification_ids: list[str] | None = None) -> int:
+        """
+        Marks the given notifications, or the whole inbox when none are given, as read.
+        """
+        stmt = (
+            update(NotificationModel)
+            .where(NotificationModel.to_id == user_id, NotificationModel.status == "unread")
+            .values(status="read")
+            .execution_options(synchronize_session=False)
+        )
+        if notification_ids is not None:
+            if not notification_ids:
+                return 0
+            stmt = stmt.where(NotificationModel.notification_id.in_(notification_ids))
+
         async with AsyncSession() as session:
             try:
-                result = await session.execute(
-                    select(NotificationModel)
-                    .where(NotificationModel.to_id == user_id)
-                    .order_by(NotificationModel.created_at.desc())
-                )
-                
-                return result.scalars().all()
+                result = await session.execute(stmt)
+                await session.commit()
             except SQLAlchemyError as e:
-                return []
+                await session.rollback()
+                raise e
+
+        if notification_ids is None:
+            await self.counter.reset(user_id)
+        elif result.rowcount:
+            await self.counter.decrement(user_id, result.rowcount)
+        return result.rowcount
 
     async def create_notification(self, data: dict):
         async with AsyncSession() as session:
@@ -74,10 +305,13 @@ class NotificationService:
                 session.add(notif)
                 await session.commit()
                 await session.refresh(notif)
-                return notif
             except SQLAlchemyError as e:
                 await session.rollback()
                 return None
+
+        if notif.status == "unread":
+            await self.counter.increment([notif.to_id])
+        return notif
             
     async def delete_one(self, notification_id: str):
         async with AsyncSession() as session:
@@ -87,7 +321,10 @@ class NotificationService:
                     raise ApiException("Notification not found")
                 await session.delete(category)
                 await session.commit()
-                return "Notification deleted successfully."
             except (IntegrityError, SQLAlchemyError) as e:
                 await session.rollback()
-                raise e
\ No newline at end of file
+                raise e
+
+        if category.status == "unread":
+            await self.counter.decrement(category.to_id)
+        return "Notification deleted successfully."
@@ -1,12 +1,16 @@
 import redis.asyncio as redis
 import json
 import os
+import time
 from dotenv import load_dotenv
 from sqlalchemy import select
 from src.models.league_admin import LeagueAdministratorModel
-from src.extensions import AsyncSession
+from src.extensions import AsyncSession, settings
 from src.models.match import LeagueMatchModel
-from sqlalchemy.orm import joinedload
+from src.models.team import LeagueTeamModel, TeamModel
+from sqlalchemy.orm import aliased
+from src.utils.codec import StorageCodec
+from src.utils.merge_patch import apply_merge_patch
 
 load_dotenv()
 
@@ -18,78 +22,451 @@ class RedisService:
             redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
             print(f"Connecting to Redis at {redis_url}...")
             cls._instance.r = redis.from_url(redis_url, decode_responses=True)
+            # note: binary client for codec-encoded live state (msgpack / zstd)
+            cls._instance.rb = redis.from_url(redis_url)
+            cls._instance.codec = StorageCodec(
+                settings.get("live_storage_codec", "msgpack"),
+                compress_threshold=settings.get("live_zstd_threshold", 4096),
+            )
         return cls._instance
 
+    STATE_TTL = 86400
+    STREAM_MAXLEN = 1000
+    SNAPSHOT_INTERVAL = 50
+
+    # note: INCR + XADD in one script so sequence numbers and stream ids never diverge
+    # note: ARGV[6] is the seq the writer diffed against, -1 tells it another writer got in first
+    APPEND_EVENT_LUA = """
+    if ARGV[6] ~= '' and (tonumber(redis.call('GET', KEYS[1])) or 0) ~= tonumber(ARGV[6]) then
+        return -1
+    end
+    local seq = redis.call('INCR', KEYS[1])
+    redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[4], seq .. '-0', 'type', ARGV[1], 'data', ARGV[2], 'ts', ARGV[3])
+    redis.call('EXPIRE', KEYS[1], ARGV[5])
+    redis.call('EXPIRE', KEYS[2], ARGV[5])
+    return seq
+    """
+
+    @staticmethod
+    def _seq_key(room_name: str) -> str:
+        return f"live:{room_name}:seq"
+
+    @staticmethod
+    def _events_key(room_name: str) -> str:
+        return f"live:{room_name}:events"
+
+    @staticmethod
+    def _snapshot_key(room_name: str) -> str:
+        return f"live:{room_name}:snapshot"
+
+    SEQ_CONFLICT = -1
+
+    async def append_event(self, room_name: str, event_type: str, data: dict, expected_seq: int | None = None) -> int | None:
+        try:
+            if not hasattr(self, "_append_event_script"):
+                self._append_event_script = self.rb.register_script(self.APPEND_EVENT_LUA)
+            seq = await self._append_event_script(
+                keys=[self._seq_key(room_name), self._events_key(room_name)],
+                args=[
+                    event_type, self.codec.encode(data), time.time(), self.STREAM_MAXLEN, self.STATE_TTL,
+                    "" if expected_seq is None else expected_seq,
+                ],
+            )
+            seq = int(seq)
+        except Exception as e:
+            print(f"Error appending event to Redis for {room_name}: {e}")
+            return None
+
+        # note: every writer of the log snapshots here so replays stay bounded, the live
+        # namespace and the offline sync alike
+        if seq > 0 and seq % self.SNAPSHOT_INTERVAL == 0:
+            snapshot_seq, state = await self.get_snapshot(room_name)
+            events = await self.get_events_since(room_name, snapshot_seq, until_seq=seq)
+            await self.save_snapshot(room_name, seq, self.fold_events(state, events))
+        return seq
+
+    async def get_events_since(self, room_name: str, seq: int = 0, until_seq: int | None = None) -> list[dict]:
+        try:
+            entries = await self.rb.xrange(
+                self._events_key(room_name),
+                min=f"{seq + 1}-0",
+                max="+" if until_seq is None else f"{until_seq}-0",
+            )
+            return [self._decode_event(entry_id, fields) for entry_id, fields in entries]
+        except Exception as e:
+            print(f"Error reading events from Redis for {room_name}: {e}")
+        return []
+
+    def _decode_event(self, entry_id: bytes, fields: dict) -> dict:
+        return {
+            "seq": int(entry_id.split(b"-")[0]),
+            "type": fields[b"type"].decode(),
+            "data": self.codec.decode(fields.get(b"data")),
+            "ts": float(fields.get(b"ts") or 0),
+        }
+
+    async def get_latest_seq(self, room_name: str) -> int:
+        try:
+            seq = await self.r.get(self._seq_key(room_name))
+            return int(seq) if seq else 0
+        except Exception as e:
+            print(f"Error getting sequence from Redis for {room_name}: {e}")
+        return 0
+
+    async def get_snapshot(self, room_name: str) -> tuple[int, dict | None]:
+        try:
+            snapshot = self.codec.decode(await self.rb.get(self._snapshot_key(room_name)))
+            if snapshot:
+                return snapshot.get("seq", 0), snapshot.get("state")
+
+            # note: rooms started before the event log only have the legacy full-state key
+            state = self.codec.decode(await self.rb.get(room_name))
+            if state:
+                return 0, state
+        except Exception as e:
+            print(f"Error getting snapshot from Redis for {room_name}: {e}")
+        return 0, None
+
+    async def save_snapshot(self, room_name: str, seq: int, state: dict):
+        try:
+            snapshot = self.codec.encode({"seq": seq, "state": state})
+            await self.rb.set(self._snapshot_key(room_name), snapshot, ex=self.STATE_TTL)
+        except Exception as e:
+            print(f"Error saving snapshot in Redis for {room_name}: {e}")
+
+    @staticmethod
+    def fold_events(state: dict | None, events: list[dict]) -> dict | None:
+        for event in events:
+            if event["type"] == "patch":
+                state = apply_merge_patch(state, event["data"])
+        return state
+
+    async def load_state(self, room_name: str) -> tuple[int, dict | None]:
+        snapshot_seq, state = await self.get_snapshot(room_name)
+        events = await self.get_events_since(room_name, snapshot_seq)
+        seq = events[-1]["seq"] if events else snapshot_seq
+        return seq, self.fold_events(state, events)
+
     async def get_state(self, room_name: str):
+        _, state = await self.load_state(room_name)
+        return state
+
+    async def get_resume_payload(self, room_name: str, last_seq: int | None = None) -> dict:
+        snapshot_seq, state = await self.get_snapshot(room_name)
+
+        # note: a last_seq ahead of the log means the room was reset, so resend the snapshot
+        resumable = (
+            last_seq is not None
+            and snapshot_seq <= last_seq <= await self.get_latest_seq(room_name)
+        )
+        if resumable:
+            events = await self.get_events_since(room_name, last_seq)
+            return {
+                "room": room_name,
+                "seq": events[-1]["seq"] if events else last_seq,
+                "snapshot": None,
+                "snapshot_seq": None,
+                "events": events,
+                "clock": await self.get_clock(room_name),
+            }
+
+        events = await self.get_events_since(room_name, snapshot_seq)
+        return {
+            "room": room_name,
+            "seq": events[-1]["seq"] if events else snapshot_seq,
+            "snapshot": state,
+            "snapshot_seq": snapshot_seq,
+            "events": events,
+            "clock": await self.get_clock(room_name),
+        }
+            
+    # -------------------------
+    # Game clock
+    # -------------------------
+    # note: the clock is stored as (remaining_ms, anchor_ms, running), viewers compute
+    # remaining_ms - (now - anchor_ms) locally, so only control changes go over the wire.
+    # TIME inside the script keeps every worker on the same Redis clock.
+    CLOCK_CONTROL_LUA = """
+    local now_t = redis.call('TIME')
+    local now = tonumber(now_t[1]) * 1000 + math.floor(tonumber(now_t[2]) / 1000)
+    local clock = {}
+    local raw = redis.call('HGETALL', KEYS[1])
+    for i = 1, #raw, 2 do clock[raw[i]] = raw[i + 1] end
+
+    local running = clock['running'] == '1'
+    local period = tonumber(clock['period'] or '1')
+    local remaining = tonumber(clock['remaining_ms'] or ARGV[3])
+    if running then
+        remaining = math.max(0, remaining - (now - tonumber(clock['anchor_ms'])))
+    end
+
+    local op = ARGV[1]
+    if op == 'start' then
+        running = remaining > 0
+    elseif op == 'stop' then
+        running = false
+    elseif op == 'adjust' then
+        remaining = math.max(0, remaining + tonumber(ARGV[2]))
+    elseif op == 'set' then
+        remaining = math.max(0, tonumber(ARGV[2]))
+    elseif op == 'period' then
+        running = false
+        period = tonumber(ARGV[2])
+        remaining = tonumber(ARGV[3])
+    end
+
+    local version = redis.call('HINCRBY', KEYS[1], 'version', 1)
+    redis.call('HSET', KEYS[1],
+        'running', running and '1' or '0',
+        'period', period,
+        'remaining_ms', remaining,
+        'anchor_ms', now)
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+    redis.call('XADD', KEYS[2], 'MAXLEN', '~', 16, '*',
+        'running', running and '1' or '0',
+        'period', period,
+        'remaining_ms', remaining,
+        'anchor_ms', now,
+        'version', version)
+    redis.call('EXPIRE', KEYS[2], ARGV[4])
+    return {running and 1 or 0, period, remaining, now, version}
+    """
+
+    CLOCK_OPERATIONS = ("start", "stop", "adjust", "set", "period")
+
+    @staticmethod
+    def _clock_key(room_name: str) -> str:
+        return f"live:{room_name}:clock"
+
+    @staticmethod
+    def _clock_log_key(room_name: str) -> str:
+        # note: short capped stream of clock changes for readers that tail Redis (SSE)
+        return f"live:{room_name}:clock:log"
+
+    @staticmethod
+    def _decode_clock(values) -> dict:
+        running, period, remaining_ms, anchor_ms, version = values
+        return {
+            "running": bool(int(running)),
+            "period": int(period),
+            "remaining_ms": int(remaining_ms),
+            "anchor_ms": int(anchor_ms),
+            "version": int(version),
+        }
+
+    async def control_clock(self, room_name: str, operation: str, value: int = 0, period_length_ms: int = 600000) -> dict | None:
+        if operation not in self.CLOCK_OPERATIONS:
+            return None
         try:
-            state_json = await self.r.get(room_name)
-            if state_json:
-                return json.loads(state_json)
+            if not hasattr(self, "_clock_control_script"):
+                self._clock_control_script = self.r.register_script(self.CLOCK_CONTROL_LUA)
+            values = await self._clock_control_script(
+                keys=[self._clock_key(room_name), self._clock_log_key(room_name)],
+                args=[operation, int(value), int(period_length_ms), self.STATE_TTL],
+            )
+            return {**self._decode_clock(values), "server_time_ms": int(values[3])}
         except Exception as e:
-            print(f"Error getting state from Redis for {room_name}: {e}")
+            print(f"Error updating game clock in Redis for {room_name}: {e}")
         return None
 
-    async def set_state(self, room_name: str, state: dict):
+    async def get_clock(self, room_name: str) -> dict | None:
         try:
-            state_json = json.dumps(state)
-            await self.r.set(room_name, state_json, ex=86400)
+            async with self.r.pipeline(transaction=False) as pipe:
+                pipe.hmget(self._clock_key(room_name), "running", "period", "remaining_ms", "anchor_ms", "version")
+                pipe.time()
+                values, (seconds, micros) = await pipe.execute()
+            if values[0] is None:
+                return None
+            return {**self._decode_clock(values), "server_time_ms": seconds * 1000 + micros // 1000}
         except Exception as e:
-            print(f"Error setting state in Redis for {room_name}: {e}")
-            
-    async def save_admin_live_match(self, admin_id: str, match_id: str):
+            print(f"Error getting game clock from Redis for {room_name}: {e}")
+        return None
+
+    # -------------------------
+    # Box score
+    # -------------------------
+    # note: one hash per match, fields are "<player_id>|<stat>" counters plus "<player_id>|side"
+    @staticmethod
+    def _box_score_key(match_id: str) -> str:
+        return f"live:{match_id}:box"
+
+    async def get_box_score(self, match_id: str) -> dict:
+        players: dict[str, dict] = {}
+        try:
+            fields = await self.r.hgetall(self._box_score_key(match_id))
+        except Exception as e:
+            print(f"Error getting box score from Redis for {match_id}: {e}")
+            fields = {}
+
+        for field, value in fields.items():
+            player_id, _, stat = field.rpartition("|")
+            player = players.setdefault(player_id, {"player_id": player_id, "side": None, "summary": {}})
+            if stat == "side":
+                player["side"] = value
+            else:
+                player["summary"][stat] = int(value)
+
+        totals = {"home": 0, "away": 0}
+        for player in players.values():
+            summary = player["summary"]
+            # note: scorers that only record made shots never send "pts"
+            player["total_score"] = summary["pts"] if "pts" in summary else (
+                2 * summary.get("fg2m", 0) + 3 * summary.get("fg3m", 0) + summary.get("ftm", 0)
+            )
+            if player["side"] in totals:
+                totals[player["side"]] += player["total_score"]
+
+        return {
+            "league_match_id": match_id,
+            "home_total_score": totals["home"],
+            "away_total_score": totals["away"],
+            "players": list(players.values()),
+        }
+
+    # -------------------------
+    # Offline sync dedupe
+    # -------------------------
+    # note: SADD on the applied-keys set gates the increment, a replayed key is a no-op
+    SYNC_STAT_LUA = """
+    if redis.call('SADD', KEYS[1], ARGV[1]) == 0 then
+        return {0}
+    end
+    redis.call('HSET', KEYS[2], ARGV[2] .. '|side', ARGV[3])
+    local value = redis.call('HINCRBY', KEYS[2], ARGV[2] .. '|' .. ARGV[4], ARGV[5])
+    redis.call('EXPIRE', KEYS[1], ARGV[6])
+    redis.call('EXPIRE', KEYS[2], ARGV[6])
+    return {1, value}
+    """
+
+    @staticmethod
+    def _applied_key(match_id: str) -> str:
+        return f"live:{match_id}:applied"
+
+    async def incr_box_score_once(
+        self, match_id: str, idempotency_key: str, player_id: str, side: str, stat: str, delta: int = 1
+    ) -> tuple[bool, int | None]:
+        if not hasattr(self, "_sync_stat_script"):
+            self._sync_stat_script = self.r.register_script(self.SYNC_STAT_LUA)
+        result = await self._sync_stat_script(
+            keys=[self._applied_key(match_id), self._box_score_key(match_id)],
+            args=[idempotency_key, player_id, side, stat, delta, self.STATE_TTL],
+        )
+        if not int(result[0]):
+            return False, None
+        return True, int(result[1])
+
+    async def append_event_once(self, match_id: str, idempotency_key: str, event_type: str, data: dict) -> tuple[bool, int | None]:
+        applied_key = self._applied_key(match_id)
+        if not await self.r.sadd(applied_key, idempotency_key):
+            return False, None
+        await self.r.expire(applied_key, self.STATE_TTL)
+
+        seq = await self.append_event(match_id, event_type, data)
+        if seq is None:
+            # note: release the key so the device can retry the event
+            await self.r.srem(applied_key, idempotency_key)
+            raise RuntimeError("Failed to append event")
+        return True, seq
+
+    LIVE_ADMINS_KEY = "live_admins"
+
+    async def _build_live_admin_entry(self, admin_id: str, match_id: str) -> dict | None:
+        HomeLT = aliased(LeagueTeamModel)
+        HomeT = aliased(TeamModel)
+        AwayLT = aliased(LeagueTeamModel)
+        AwayT = aliased(TeamModel)
+
+        async with AsyncSession() as session:
+            result = await session.execute(
+                select(
+                    LeagueAdministratorModel.organization_name,
+                    LeagueAdministratorModel.organization_logo_url,
+                    LeagueMatchModel.league_id,
+                    LeagueMatchModel.display_name,
+                    HomeT.team_name.label("home_team_name"),
+                    HomeT.team_logo_url.label("home_team_logo"),
+                    AwayT.team_name.label("away_team_name"),
+                    AwayT.team_logo_url.label("away_team_logo"),
+                )
+                .select_from(LeagueMatchModel)
+                .join(
+                    LeagueAdministratorModel,
+                    LeagueAdministratorModel.league_administrator_id == admin_id
+                )
+                .outerjoin(HomeLT, LeagueMatchModel.home_team_id == HomeLT.league_team_id)
+                .outerjoin(HomeT, HomeLT.team_id == HomeT.team_id)
+                .outerjoin(AwayLT, LeagueMatchModel.away_team_id == AwayLT.league_team_id)
+                .outerjoin(AwayT, AwayLT.team_id == AwayT.team_id)
+                .where(LeagueMatchModel.league_match_id == match_id)
+            )
+            row = result.mappings().first()
+
+        if not row:
+            return None
+
+        return {
+            "league_administrator_id": admin_id,
+            "league_administrator": row.organization_name,
+            "league_administrator_logo": row.organization_logo_url,
+            "league_id": row.league_id,
+            "league_match_id": match_id,
+            "display_name": row.display_name,
+            "home_team_name": row.home_team_name,
+            "home_team_logo": row.home_team_logo,
+            "away_team_name": row.away_team_name,
+            "away_team_logo": row.away_team_logo,
+        }
+
+    async def save_admin_live_match(self, admin_id: str, match_id: str) -> tuple[dict | None, dict | None]:
+        """
+        Returns the saved entry and the entry it replaced, an admin starting a new match
+        without stopping the old one overwrites it.
+        """
         try:
-            await self.r.hset("live_admins", admin_id, match_id)
+            entry = await self._build_live_admin_entry(admin_id, match_id)
+            if not entry:
+                return None, None
+            async with self.r.pipeline(transaction=True) as pipe:
+                pipe.hget(self.LIVE_ADMINS_KEY, admin_id)
+                pipe.hset(self.LIVE_ADMINS_KEY, admin_id, json.dumps(entry))
+                previous_json, _ = await pipe.execute()
+            return entry, self._decode_live_admin(previous_json, admin_id)
         except Exception as e:
             print(f"Error saving live admin match: {e}")
+        return None, None
 
-    async def remove_admin_live_match(self, admin_id: str):
+    async def remove_admin_live_match(self, admin_id: str) -> dict | None:
         try:
-            await self.r.hdel("live_admins", admin_id)
+            async with self.r.pipeline(transaction=True) as pipe:
+                pipe.hget(self.LIVE_ADMINS_KEY, admin_id)
+                pipe.hdel(self.LIVE_ADMINS_KEY, admin_id)
+                entry_json, removed = await pipe.execute()
+            if removed:
+                return self._decode_live_admin(entry_json, admin_id) or {"league_administrator_id": admin_id}
         except Exception as e:
             print(f"Error removing live admin match: {e}")
+        return None
+
+    @staticmethod
+    def _decode_live_admin(entry_json: str | None, admin_id: str) -> dict | None:
+        if not entry_json:
+            return None
+        try:
+            entry = json.loads(entry_json)
+        except ValueError:
+            entry = None
+        if isinstance(entry, dict):
+            return entry
+        # note: entries written before the directory was denormalized hold a bare match id
+        return {"league_administrator_id": admin_id, "league_match_id": entry_json}
 
     async def get_all_admin_live_matches(self) -> list[dict[str, str]]:
         try:
-            async with AsyncSession() as session:
-                data = await self.r.hgetall("live_admins")
-                if not data:
-                    return []
-
-                match_ids = list(data.values())
-                admin_ids = list(data.keys())
-
-                # Fetch matches
-                matches = (
-                    await session.execute(
-                        select(LeagueMatchModel)
-                        .where(LeagueMatchModel.league_match_id.in_(match_ids))
-                    )
-                ).scalars().all()
-                match_map = {m.league_match_id: m for m in matches}
-
-                # Fetch admins
-                admins = (
-                    await session.execute(
-                        select(LeagueAdministratorModel)
-                        .where(LeagueAdministratorModel.league_administrator_id.in_(admin_ids))
-                    )
-                ).scalars().all()
-                admin_map = {a.league_administrator_id: a for a in admins}
-
-                result = []
-                for admin_id, match_id in data.items():
-                    match = match_map.get(match_id)
-                    admin = admin_map.get(admin_id)
-                    if not match or not admin:
-                        continue
-                    result.append({
-                        "league_administrator_id": admin_id,
-                        "league_administrator": admin.organization_name,
-                        "league_match_id": match_id,
-                        "home_team_name": match.home_team.team.team_name if match.home_team else None,
-                        "away_team_name": match.away_team.team.team_name if match.away_team else None,
-                    })
-                return result
+            entries = await self.r.hgetall(self.LIVE_ADMINS_KEY)
+            return [
+                self._decode_live_admin(entry_json, admin_id)
+                for admin_id, entry_json in entries.items() if entry_json
+            ]
         except Exception as e:
             print(f"Error getting live admins: {e}")
             return []
@@ -1,60 +1,84 @@
 import asyncio
 import os
+import socket
 import logging
 from apscheduler.triggers.cron import CronTrigger
 from src.services.scheduler.scheduler import SchedulerManager
-from src.services.scheduler.job import cleanup_task, scheduled_database_task
+from src.services.scheduler.work_partitioner import WorkPartitioner
+from src.services.scheduler.job import cleanup_task, dispatch_due_reminders, dispatch_notification_outbox, flush_notification_digests, scheduled_database_task
 from src.extensions import settings, redis_client
 from apscheduler.triggers.interval import IntervalTrigger
 
 logger = logging.getLogger(__name__)
 
 class ClusterWorker:
+    LOCK_TTL = 30
+    RENEW_INTERVAL = 10
+
+    # note: only the holder may extend the lock, a paused leader that lost it must not steal it back
+    RENEW_LOCK_LUA = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        return redis.call('EXPIRE', KEYS[1], ARGV[2])
+    end
+    return 0
+    """
+
     def __init__(self, scheduler_manager: SchedulerManager):
         self.scheduler = scheduler_manager
         self.lock_key = "worker_leader_lock"
-        self.identity = str(os.getpid())
+        self.identity = f"{socket.gethostname()}:{os.getpid()}"
         self.is_leader = False
+        self.mode = settings.get("worker_mode", "leader")
+        self.partitioner = WorkPartitioner(self.identity) if self.mode == "partitioned" else None
         self._maintain_task = None
+        self._wakeup_task = None
+        self._partition_tasks: list[asyncio.Task] = []
 
     async def start(self):
         print("🚀 ClusterWorker: Starting up...")
         if not settings.get("enable_worker", False):
             return
-        try:
-            acquired = await redis_client.set(
-                self.lock_key, 
-                self.identity, 
-                nx=True, 
-                ex=30
-            )
-
-            if acquired:
-                await self._become_leader()
-            else:
-                current = await redis_client.get(self.lock_key)
-                logger.info(f"💤 Node {self.identity} is follower. Leader is {current}")
+        # note: every worker runs the scheduler, followers stay paused so add_job still
+        # writes to the shared job store instead of a pending list nobody processes
+        self.scheduler.start(paused=True)
+        self._maintain_task = asyncio.create_task(self._maintain_leadership())
 
-        except Exception as e:
-            logger.error(f"❌ Error during worker startup: {e}")
+        if self.partitioner:
+            await self.partitioner.start()
+            # note: the outbox claims rows with SKIP LOCKED and digests are claimed in Redis,
+            # so every worker can poll both next to its own reminder partitions
+            self._partition_tasks = [
+                asyncio.create_task(self._run_partitioned_work()),
+                asyncio.create_task(self._poll(dispatch_notification_outbox, settings.get("outbox_poll_seconds", 2))),
+                asyncio.create_task(self._poll(flush_notification_digests, settings.get("notification_digest_poll_seconds", 10))),
+            ]
 
     async def stop(self):
         """
         Called on application shutdown.
         """
-        # Stop the maintenance loop
-        if self._maintain_task:
-            self._maintain_task.cancel()
-            try:
-                await self._maintain_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self._maintain_task, self._wakeup_task, *self._partition_tasks):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
 
-        # If leader, stop scheduler and release lock
+        self.scheduler.shutdown()
+        if self.partitioner:
+            await self.partitioner.stop()
         if self.is_leader:
-            self.scheduler.shutdown()
             await self._release_lock()
 
+    async def _try_acquire(self) -> bool:
+        return bool(await redis_client.set(self.lock_key, self.identity, nx=True, ex=self.LOCK_TTL))
+
+    async def _renew(self) -> bool:
+        if not hasattr(self, "_renew_script"):
+            self._renew_script = redis_client.register_script(self.RENEW_LOCK_LUA)
+        return bool(await self._renew_script(keys=[self.lock_key], args=[self.identity, self.LOCK_TTL]))
+
     async def _become_leader(self):
         """
         Logic to execute when this node becomes the leader.
@@ -65,11 +89,19 @@ class ClusterWorker:
         # 1. Register Jobs (Define your Cron/Intervals here)
         self._register_default_jobs()
 
-        # 2. Start Scheduler
-        self.scheduler.start()
+        # 2. Resume the scheduler, persisted jobs from the previous leader run from here
+        self.scheduler.resume()
 
-        # 3. Start Lock Maintenance Loop
-        self._maintain_task = asyncio.create_task(self._maintain_leadership())
+        # 3. Pick up jobs added by followers
+        self._wakeup_task = asyncio.create_task(self._listen_wakeups())
+
+    def _step_down(self):
+        logger.warning(f"⚠️ Node {self.identity} lost leadership")
+        self.is_leader = False
+        self.scheduler.pause()
+        if self._wakeup_task:
+            self._wakeup_task.cancel()
+            self._wakeup_task = None
 
     def _register_default_jobs(self):
         # self.scheduler.add_job(
@@ -83,16 +115,74 @@ class ClusterWorker:
         #     job_id="cleanup_service",
         #     trigger=IntervalTrigger(seconds=5)
         # )
-        ...
+
+        if self.partitioner:
+            # note: every worker polls its own reminder partitions and the shared queues, see start
+            for job_id in ("match_reminders", "notification_outbox", "notification_digests"):
+                self.scheduler.remove_job(job_id)
+        else:
+            self.scheduler.add_job(
+                func=dispatch_notification_outbox,
+                job_id="notification_outbox",
+                trigger=IntervalTrigger(seconds=settings.get("outbox_poll_seconds", 2))
+            )
+
+            self.scheduler.add_job(
+                func=flush_notification_digests,
+                job_id="notification_digests",
+                trigger=IntervalTrigger(seconds=settings.get("notification_digest_poll_seconds", 10))
+            )
+
+            self.scheduler.add_job(
+                func=dispatch_due_reminders,
+                job_id="match_reminders",
+                trigger=IntervalTrigger(seconds=settings.get("reminder_poll_seconds", 30))
+            )
 
     async def _maintain_leadership(self):
-        while self.is_leader:
+        while True:
             try:
-                await asyncio.sleep(20)
-                await redis_client.expire(self.lock_key, 30)
+                if self.is_leader:
+                    if not await self._renew():
+                        self._step_down()
+                elif await self._try_acquire():
+                    await self._become_leader()
+                else:
+                    current = await redis_client.get(self.lock_key)
+                    logger.debug(f"💤 Node {self.identity} is follower. Leader is {current}")
             except Exception as e:
                 logger.error(f"⚠️ Error maintaining leadership: {e}")
-                
+            await asyncio.sleep(self.RENEW_INTERVAL)
+
+    async def _run_partitioned_work(self):
+        partitions = settings.get("reminder_partitions", 16)
+        while True:
+            try:
+                owned = [p for p in range(partitions) if self.partitioner.owns(f"reminders:{p}")]
+                if owned:
+                    await dispatch_due_reminders(owned)
+            except Exception as e:
+                logger.error(f"❌ Error running partitioned work: {e}")
+            await asyncio.sleep(settings.get("reminder_poll_seconds", 30))
+
+    async def _poll(self, func, interval: float):
+        while True:
+            try:
+                await func()
+            except Exception as e:
+                logger.error(f"❌ Error running {func.__name__}: {e}")
+            await asyncio.sleep(interval)
+
+    async def _listen_wakeups(self):
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.scheduler.WAKEUP_CHANNEL)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    self.scheduler.wakeup()
+        finally:
+            await pubsub.unsubscribe(self.scheduler.WAKEUP_CHANNEL)
+
     async def _release_lock(self):
         try:
             current = await redis_client.get(self.lock_key)
@@ -100,4 +190,4 @@ class ClusterWorker:
                 await redis_client.delete(self.lock_key)
                 logger.info("👋 Leadership released.")
         except Exception as e:
-            logger.error(f"Error releasing lock: {e}")
\ No newline at end of file
+            logger.error(f"Error releasing lock: {e}")
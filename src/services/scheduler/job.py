@@ -1,14 +1,12 @@
-
-
 import asyncio
+import time
 from src.extensions import notification_limit
 from sqlalchemy import select
 import logging
 from sqlalchemy.orm import selectinload
 from src.models.team import LeagueTeamModel
 from src.extensions import db_session
-from src.services.notification_service import create_notification, send_notification
-from src.utils.notification_utils import get_valid_fcm_for_match
+from src.utils.notification_utils import notify_match_teams
 
 logger = logging.getLogger(__name__)
 
@@ -29,68 +27,92 @@ async def cleanup_task():
         except Exception as e:
             print(f"❌ INTERVAL: Error: {e}")
             
-async def monitor_match_status(league_match_id: str):
-    from src.container import scheduler_manager
+def _lead_label(lead_minutes: int) -> str:
+    if lead_minutes % 60 == 0:
+        hours = lead_minutes // 60
+        return f"{hours} hour{'s' if hours != 1 else ''}"
+    return f"{lead_minutes} minute{'s' if lead_minutes != 1 else ''}"
+
+async def send_match_reminder(league_match_id: str, lead_minutes: int, scheduled_ts: int):
     from src.models.match import LeagueMatchModel 
 
     async with db_session() as session:
-        try:
-            stmt = (
-                select(LeagueMatchModel)
-                .options(
-                    selectinload(LeagueMatchModel.home_team).selectinload(LeagueTeamModel.team),
-                    selectinload(LeagueMatchModel.away_team).selectinload(LeagueTeamModel.team),
-                )
-                .where(LeagueMatchModel.league_match_id == league_match_id)
+        stmt = (
+            select(LeagueMatchModel)
+            .options(
+                selectinload(LeagueMatchModel.home_team).selectinload(LeagueTeamModel.team),
+                selectinload(LeagueMatchModel.away_team).selectinload(LeagueTeamModel.team),
             )
+            .where(LeagueMatchModel.league_match_id == league_match_id)
+        )
 
-            result = await session.execute(stmt)
-            match_data = result.scalar_one_or_none()
+        result = await session.execute(stmt)
+        match_data = result.scalar_one_or_none()
 
-            if not match_data:
-                logger.warning(f"❌ Match {league_match_id} not found. Removing job.")
-                scheduler_manager.remove_job(league_match_id)
-                return
+        if not match_data:
+            logger.warning(f"❌ Match {league_match_id} not found. Dropping reminder.")
+            return
 
-            home_team_name = match_data.home_team.team.team_name
-            away_team_name = match_data.away_team.team.team_name
-            
-            if match_data.status != "Scheduled":
-                scheduler_manager.remove_job(league_match_id)
-            else:
-                recipients = await get_valid_fcm_for_match(session, league_match_id, limit=notification_limit)
-                
-                if len(recipients.home) > 0:
-                    for recipient in recipients.home:
-                        print(f"Home: {recipient}")
-                        data_payload = {
-                            "title": "Upcoming Game Reminder!",
-                            "message": (
-                                f"Your team, the {home_team_name}, has a game "
-                                f"against the team {away_team_name} "
-                                f"scheduled for {match_data.scheduled_date.strftime('%Y-%m-%d %I:%M %p')}."
-                            ),
-                            "to_id": recipient.user_id,
-                            "fcm_token": recipient.fcm_token,
-                        }
-                        
-                        notif = await create_notification(data=data_payload)
-                        await send_notification(recipient.fcm_token, notif, enable=True)
-                
-                if len(recipients.away) > 0:
-                    for recipient in recipients.away:
-                        data_payload = {
-                            "title": "Upcoming Game Reminder!",
-                            "message": (
-                                f"Your team, the {away_team_name}, has a game "
-                                f"against the team {home_team_name} "
-                                f"scheduled for {match_data.scheduled_date.strftime('%Y-%m-%d %I:%M %p')}."
-                            ),
-                            "to_id": recipient.user_id,
-                            "fcm_token": recipient.fcm_token,
-                        }
-                        notif = await create_notification(data=data_payload)
-                        await send_notification(recipient.fcm_token, notif, enable=True)
-                        
-        except Exception as e:
-            logger.error(f"❌ Error monitoring match {league_match_id}: {e}")
\ No newline at end of file
+        # note: unscheduled or moved since the reminder was queued, the new schedule has its own reminders
+        if (
+            match_data.status != "Scheduled"
+            or not match_data.scheduled_date
+            or int(match_data.scheduled_date.timestamp()) != scheduled_ts
+        ):
+            return
+
+        scheduled_for = match_data.scheduled_date.strftime('%Y-%m-%d %I:%M %p')
+        await notify_match_teams(
+            session,
+            match_data,
+            title="Upcoming Game Reminder!",
+            message_for=lambda team_name, opponent_name: (
+                f"Your team, the {team_name}, has a game "
+                f"against the team {opponent_name} "
+                f"in {_lead_label(lead_minutes)}, scheduled for {scheduled_for}."
+            ),
+            dedupe_key=f"reminder:{league_match_id}:{lead_minutes}:{scheduled_ts}",
+            limit=notification_limit,
+        )
+
+async def dispatch_notification_outbox():
+    from src.services.notification_outbox_service import NotificationOutboxService
+
+    try:
+        await NotificationOutboxService().dispatch()
+    except Exception as e:
+        logger.error(f"❌ Error dispatching notification outbox: {e}")
+
+async def flush_notification_digests():
+    from src.services.notification_digest_service import NotificationDigestService
+
+    try:
+        await NotificationDigestService().flush()
+    except Exception as e:
+        logger.error(f"❌ Error flushing notification digests: {e}")
+
+async def dispatch_due_reminders(partitions: list[int] | None = None):
+    from src.services.scheduler.match_reminders import MatchReminderService
+
+    service = MatchReminderService()
+    for partition in range(service.partitions) if partitions is None else partitions:
+        while True:
+            members = await service.claim_due(partition)
+            if not members:
+                break
+
+            done = []
+            for member in members:
+                league_match_id, lead_minutes, scheduled_ts = service.decode_member(member)
+                try:
+                    await send_match_reminder(league_match_id, lead_minutes, scheduled_ts)
+                    done.append(member)
+                except Exception as e:
+                    logger.error(f"❌ Error sending reminder {member}: {e}")
+                    # note: the lease puts it back in the due set, give up once the match has started
+                    if time.time() >= scheduled_ts:
+                        done.append(member)
+            await service.ack(partition, *done)
+
+            if len(members) < service.batch_size:
+                break
@@ -1,16 +1,13 @@
-from apscheduler.triggers.cron import CronTrigger
-from apscheduler.triggers.interval import IntervalTrigger
-from src.services.notification_service import create_notification, send_notification
 from src.models.team import LeagueTeamModel
-from src.services.scheduler.job import monitor_match_status
+from src.services.scheduler.match_reminders import MatchReminderService
 from src.extensions import notification_limit
 from src.models.match import LeagueMatchModel
-from src.container import scheduler_manager
 from src.extensions import db_session
 from src.utils.api_response import ApiException
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
-from src.utils.notification_utils import get_valid_fcm_for_match
+from src.services.notification_digest_service import NotificationDigestService
+from src.utils.notification_utils import get_team_recipient_ids, notify_match_teams
 
 async def monitor_match_status_wrapper(league_match_id: str):
     print("⏳ Setting up monitor for match:", league_match_id)
@@ -29,63 +26,45 @@ async def monitor_match_status_wrapper(league_match_id: str):
             raise ApiException("Match not found")
     
         if not match_data.scheduled_date:
+            await MatchReminderService().cancel(league_match_id)
             raise ApiException("Match does not have a scheduled date")
     
-        home_team_name = match_data.home_team.team.team_name
-        away_team_name = match_data.away_team.team.team_name
-        
-        recipients = await get_valid_fcm_for_match(session, league_match_id, limit=notification_limit)
-        
-        if len(recipients.home) > 0 :
-            for recipient in recipients.home:
-                data_payload = {
-                    "title": "Upcoming Game Reminder!",
-                    "message": (
-                        f"Your team, the {home_team_name}, has a game "
-                        f"against the team {away_team_name} "
-                        f"scheduled for {match_data.scheduled_date.strftime('%Y-%m-%d %I:%M %p')}."
-                    ),
-                    "to_id": recipient.user_id,
-                    "fcm_token": recipient.fcm_token,
-                }
-                
-                notif = await create_notification(data=data_payload)
-                await send_notification(recipient.fcm_token, notif, enable=True)
-        
-        if len(recipients.away) > 0 :
-            for recipient in recipients.away:
-                data_payload = {
-                    "title": "Upcoming Game Reminder!",
-                    "message": (
-                        f"Your team, the {away_team_name}, has a game "
-                        f"against the team {home_team_name} "
-                        f"scheduled for {match_data.scheduled_date.strftime('%Y-%m-%d %I:%M %p')}."
-                    ),
-                    "to_id": recipient.user_id,
-                    "fcm_token": recipient.fcm_token,
-                }
-                notif = await create_notification(data=data_payload)
-                await send_notification(recipient.fcm_token, notif, enable=True)
-                
+        scheduled_for = match_data.scheduled_date.strftime('%Y-%m-%d %I:%M %p')
+        message_for = lambda team_name, opponent_name: (
+            f"Your team, the {team_name}, has a game "
+            f"against the team {opponent_name} "
+            f"scheduled for {scheduled_for}."
+        )
 
-        from datetime import datetime, timezone
-        
-        h = match_data.scheduled_date.hour
-        m = match_data.scheduled_date.minute
-        
-        trigger = CronTrigger(hour=h, minute=m, timezone=timezone.utc)
-        
-        now = datetime.now(timezone.utc)
-        scheduled_today = now.replace(hour=h, minute=m, second=0, microsecond=0)
-        
-        if now >= scheduled_today:
-            await monitor_match_status(league_match_id)
+        digest = NotificationDigestService()
+        if digest.enabled:
+            # note: scheduling a whole round sends each player one summary instead of one push per game
+            for league_team, opponent in (
+                (match_data.home_team, match_data.away_team),
+                (match_data.away_team, match_data.home_team),
+            ):
+                await digest.add(
+                    await get_team_recipient_ids(session, league_team.team_id),
+                    collapse_key=f"schedule:{match_data.league_id}",
+                    item_key=league_match_id,
+                    notification={
+                        "title": "Upcoming Game Reminder!",
+                        "message": message_for(league_team.team.team_name, opponent.team.team_name),
+                    },
+                    line=f"{league_team.team.team_name} vs {opponent.team.team_name}, {scheduled_for}",
+                    summary_title="Games scheduled",
+                )
+        else:
+            await notify_match_teams(
+                session,
+                match_data,
+                title="Upcoming Game Reminder!",
+                message_for=message_for,
+                dedupe_key=f"match-scheduled:{league_match_id}:{int(match_data.scheduled_date.timestamp())}",
+                limit=notification_limit,
+            )
 
-        scheduler_manager.add_job(
-            func=monitor_match_status,
-            job_id=league_match_id, 
-            trigger=trigger,
-            league_match_id=league_match_id
-        )
+        # note: one-shot reminders at the configured lead times, polled by dispatch_due_reminders
+        await MatchReminderService().schedule(league_match_id, match_data.scheduled_date)
 
         return f"{match_data.display_name} ({match_data.scheduled_date})"
\ No newline at end of file
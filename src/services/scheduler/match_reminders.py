@@ -0,0 +1,147 @@
+import logging
+import time
+import zlib
+from datetime import datetime, timezone
+from src.extensions import db_session, settings, redis_client
+
+logger = logging.getLogger(__name__)
+
+class MatchReminderService:
+    """
+    One-shot match reminders kept in Redis instead of one scheduler job per match.
+
+    - "reminders:due:<partition>" is a sorted set of "<league_match_id>|<lead_minutes>|<scheduled_ts>"
+      scored by the time the reminder is due, the partition is crc32(league_match_id) % partitions
+    - the poll job claims due members in batches and leases them in "reminders:processing:<partition>",
+      a worker that dies mid-batch gives its lease back to the due set once it expires
+    - scheduled_ts pins a reminder to the schedule it was created for, a rescheduled match
+      never fires reminders for its old date
+    """
+
+    # note: ZRANGEBYSCORE + ZREM + ZADD in one script so two workers never claim the same reminder
+    CLAIM_LUA = """
+    local now = tonumber(ARGV[1])
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+    for _, member in ipairs(expired) do
+        redis.call('ZREM', KEYS[2], member)
+        redis.call('ZADD', KEYS[1], now, member)
+    end
+
+    local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, tonumber(ARGV[2]))
+    for _, member in ipairs(due) do
+        redis.call('ZREM', KEYS[1], member)
+        redis.call('ZADD', KEYS[2], now + tonumber(ARGV[3]), member)
+    end
+    return due
+    """
+
+    def __init__(self):
+        self.lead_times = settings.get("reminder_lead_times_minutes", [1440, 60])
+        self.batch_size = settings.get("reminder_batch_size", 100)
+        self.lease_seconds = settings.get("reminder_lease_seconds", 300)
+        self.partitions = settings.get("reminder_partitions", 16)
+
+    def partition_of(self, league_match_id: str) -> int:
+        return zlib.crc32(league_match_id.encode()) % self.partitions
+
+    @staticmethod
+    def _due_key(partition: int) -> str:
+        return f"reminders:due:{partition}"
+
+    @staticmethod
+    def _processing_key(partition: int) -> str:
+        return f"reminders:processing:{partition}"
+
+    @staticmethod
+    def _match_key(league_match_id: str) -> str:
+        return f"reminders:match:{league_match_id}"
+
+    @staticmethod
+    def encode_member(league_match_id: str, lead_minutes: int, scheduled_ts: int) -> str:
+        return f"{league_match_id}|{lead_minutes}|{scheduled_ts}"
+
+    @staticmethod
+    def decode_member(member: str) -> tuple[str, int, int]:
+        league_match_id, lead_minutes, scheduled_ts = member.rsplit("|", 2)
+        return league_match_id, int(lead_minutes), int(scheduled_ts)
+
+    async def schedule(self, league_match_id: str, scheduled_date: datetime) -> list[int]:
+        scheduled_ts = int(scheduled_date.timestamp())
+        now = time.time()
+        members = {
+            self.encode_member(league_match_id, lead, scheduled_ts): scheduled_ts - lead * 60
+            for lead in self.lead_times
+            if scheduled_ts - lead * 60 > now
+        }
+
+        match_key = self._match_key(league_match_id)
+        due_key = self._due_key(self.partition_of(league_match_id))
+        old_members = await redis_client.smembers(match_key)
+        async with redis_client.pipeline(transaction=True) as pipe:
+            if old_members:
+                pipe.zrem(due_key, *old_members)
+            pipe.delete(match_key)
+            if members:
+                pipe.zadd(due_key, members)
+                pipe.sadd(match_key, *members)
+                pipe.expireat(match_key, scheduled_ts + 86400)
+            await pipe.execute()
+
+        scheduled = [self.decode_member(member)[1] for member in members]
+        logger.info(f"⏰ Reminders for match {league_match_id}: {scheduled or 'none'} minutes before start")
+        return scheduled
+
+    async def cancel(self, league_match_id: str):
+        match_key = self._match_key(league_match_id)
+        old_members = await redis_client.smembers(match_key)
+        async with redis_client.pipeline(transaction=True) as pipe:
+            if old_members:
+                pipe.zrem(self._due_key(self.partition_of(league_match_id)), *old_members)
+            pipe.delete(match_key)
+            await pipe.execute()
+
+    async def schedule_upcoming(self) -> int:
+        # note: seeds the due set from the database, for matches scheduled before reminders lived in Redis
+        from sqlalchemy import select
+        from src.models.match import LeagueMatchModel
+
+        async with db_session() as session:
+            result = await session.execute(
+                select(LeagueMatchModel.league_match_id, LeagueMatchModel.scheduled_date)
+                .where(
+                    LeagueMatchModel.status == "Scheduled",
+                    LeagueMatchModel.scheduled_date > datetime.now(timezone.utc),
+                )
+            )
+            rows = result.all()
+
+        for row in rows:
+            await self.schedule(row.league_match_id, row.scheduled_date)
+        return len(rows)
+
+    async def claim_due(self, partition: int) -> list[str]:
+        if not hasattr(self, "_claim_script"):
+            self._claim_script = redis_client.register_script(self.CLAIM_LUA)
+        return await self._claim_script(
+            keys=[self._due_key(partition), self._processing_key(partition)],
+            args=[time.time(), self.batch_size, self.lease_seconds],
+        )
+
+    async def ack(self, partition: int, *members: str):
+        if members:
+            await redis_client.zrem(self._processing_key(partition), *members)
+
+    async def pending_count(self) -> dict:
+        now = time.time()
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for partition in range(self.partitions):
+                pipe.zcard(self._due_key(partition))
+                pipe.zcount(self._due_key(partition), "-inf", now)
+                pipe.zcard(self._processing_key(partition))
+            counts = await pipe.execute()
+        return {
+            "partitions": self.partitions,
+            "scheduled": sum(counts[0::3]),
+            "overdue": sum(counts[1::3]),
+            "processing": sum(counts[2::3]),
+        }
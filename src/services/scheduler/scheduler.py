@@ -1,28 +1,83 @@
+import asyncio
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.redis import RedisJobStore
+from apscheduler.schedulers.base import STATE_PAUSED, STATE_RUNNING
 from apscheduler.triggers.base import BaseTrigger
+from redis import ConnectionPool
+from src.config import Config
+from src.extensions import settings, redis_client
 from typing import Callable
 import logging
 
 logger = logging.getLogger(__name__)
 class SchedulerManager:
+    """
+    Jobs live in Redis by default so they survive the leader and every worker can add them.
+    Followers run the scheduler paused (writes go straight to the job store) and publish a
+    wakeup so the leader picks up jobs that are due before its next planned wakeup.
+    Jobs that cannot be pickled (closures, lambdas) go to the process-local "memory" store.
+    """
+    WAKEUP_CHANNEL = "scheduler:wakeup"
+
     def __init__(self):
-        self._scheduler = AsyncIOScheduler()
+        self._scheduler = AsyncIOScheduler(
+            jobstores=self._build_jobstores(),
+            job_defaults={
+                "coalesce": True,
+                "misfire_grace_time": settings.get("scheduler_misfire_grace_seconds", 300),
+            },
+        )
+
+    @staticmethod
+    def _build_jobstores() -> dict:
+        jobstores = {"memory": MemoryJobStore()}
+        if settings.get("scheduler_jobstore", "redis") == "redis" and Config.REDIS_URL:
+            # note: a pool from the URL keeps rediss:// and unix:// options out of Redis(**kwargs),
+            # the db comes from the URL and RedisJobStore's own db is ignored
+            jobstores["default"] = RedisJobStore(
+                jobs_key="scheduler:jobs",
+                run_times_key="scheduler:run_times",
+                connection_pool=ConnectionPool.from_url(Config.REDIS_URL),
+            )
+        else:
+            jobstores["default"] = MemoryJobStore()
+        return jobstores
 
-    def start(self):
+    @property
+    def running(self) -> bool:
+        return self._scheduler.state == STATE_RUNNING
+
+    def start(self, paused: bool = False):
         if not self._scheduler.running:
-            self._scheduler.start()
-            logger.info("✅ SchedulerManager: Started.")
+            self._scheduler.start(paused=paused)
+            logger.info(f"✅ SchedulerManager: Started{' (paused)' if paused else ''}.")
+
+    def resume(self):
+        if self._scheduler.state == STATE_PAUSED:
+            self._scheduler.resume()
+            logger.info("▶️ SchedulerManager: Resumed, processing persisted jobs.")
+
+    def pause(self):
+        if self._scheduler.state == STATE_RUNNING:
+            self._scheduler.pause()
+            logger.info("⏸️ SchedulerManager: Paused.")
+
+    def wakeup(self):
+        if self._scheduler.state == STATE_RUNNING:
+            self._scheduler.wakeup()
 
     def shutdown(self):
         if self._scheduler.running:
             self._scheduler.shutdown()
             logger.info("🛑 SchedulerManager: Shut down.")
 
-    def add_job(self, func: Callable, job_id: str, trigger: BaseTrigger, replace: bool = True, **job_kwargs):
+    def add_job(self, func: Callable, job_id: str, trigger: BaseTrigger, replace: bool = True, persistent: bool = True, **job_kwargs):
+        jobstore = "default" if persistent else "memory"
         try:
-            if self._scheduler.get_job(job_id):
+            if self._scheduler.get_job(job_id, jobstore):
                 if replace:
-                    self._scheduler.remove_job(job_id)
+                    self._scheduler.remove_job(job_id, jobstore)
                 else:
                     logger.warning(f"⚠️ Job {job_id} already exists. Skipping.")
                     return
@@ -31,19 +86,29 @@ class SchedulerManager:
                 func,
                 trigger=trigger,
                 id=job_id,
+                jobstore=jobstore,
                 replace_existing=True,
                 kwargs=job_kwargs
             )
-            logger.info(f"➕ Job '{job_id}' scheduled with args: {job_kwargs}")
+            logger.info(f"➕ Job '{job_id}' scheduled in '{jobstore}' with args: {job_kwargs}")
+            if persistent and not self.running:
+                self._notify_leader()
         except Exception as e:
             logger.error(f"❌ Failed to add job {job_id}: {e}")
 
+    def _notify_leader(self):
+        try:
+            asyncio.get_running_loop().create_task(redis_client.publish(self.WAKEUP_CHANNEL, "1"))
+        except RuntimeError:
+            pass
+
     def remove_job(self, job_id: str) -> bool:
-        if self._scheduler.get_job(job_id):
-            self._scheduler.remove_job(job_id)
+        job = self._scheduler.get_job(job_id)
+        if job:
+            job.remove()
             logger.info(f"➖ Job '{job_id}' removed.")
             return True
         return False
-        
+
     def get_job(self, job_id: str):
-        return self._scheduler.get_job(job_id)
\ No newline at end of file
+        return self._scheduler.get_job(job_id)
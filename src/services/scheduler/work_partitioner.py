@@ -0,0 +1,95 @@
+import asyncio
+import bisect
+import hashlib
+import logging
+import time
+from src.extensions import settings, redis_client
+
+logger = logging.getLogger(__name__)
+
+class WorkPartitioner:
+    """
+    Spreads keyed background work over every live worker.
+
+    - each worker heartbeats into the "workers:alive" sorted set (score = last beat)
+    - live workers are placed on a consistent-hash ring with virtual nodes, a key belongs
+      to the first worker clockwise from md5(key)
+    - the ring is rebuilt on every beat, a worker that joins or stops beating only moves
+      the keys next to its own points
+    """
+    ALIVE_KEY = "workers:alive"
+
+    def __init__(self, identity: str):
+        self.identity = identity
+        self.heartbeat_interval = settings.get("worker_heartbeat_seconds", 5)
+        self.worker_ttl = settings.get("worker_ttl_seconds", 15)
+        self.virtual_nodes = settings.get("worker_virtual_nodes", 64)
+        self.members: list[str] = [identity]
+        self._ring: list[tuple[int, str]] = []
+        self._points: list[int] = []
+        self._task: asyncio.Task | None = None
+        self._build_ring(self.members)
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        # note: md5 spreads near-identical keys ("reminders:1", "reminders:2") far better than crc32
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+    def _build_ring(self, members: list[str]):
+        self._ring = sorted(
+            (self._hash(f"{member}#{i}"), member)
+            for member in members
+            for i in range(self.virtual_nodes)
+        )
+        self._points = [point for point, _ in self._ring]
+
+    def owner(self, key: str) -> str:
+        index = bisect.bisect(self._points, self._hash(key)) % len(self._ring)
+        return self._ring[index][1]
+
+    def owns(self, key: str) -> bool:
+        return self.owner(key) == self.identity
+
+    async def heartbeat(self) -> bool:
+        now = time.time()
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.ALIVE_KEY, {self.identity: now})
+            pipe.zremrangebyscore(self.ALIVE_KEY, "-inf", now - self.worker_ttl)
+            pipe.zrange(self.ALIVE_KEY, 0, -1)
+            _, _, members = await pipe.execute()
+
+        members = sorted(members)
+        if members == self.members:
+            return False
+        logger.info(f"🔀 Rebalancing work: {len(self.members)} -> {len(members)} workers")
+        self.members = members
+        self._build_ring(members)
+        return True
+
+    async def start(self):
+        await self.heartbeat()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        try:
+            # note: leave right away instead of waiting for the ttl so peers rebalance on their next beat
+            await redis_client.zrem(self.ALIVE_KEY, self.identity)
+        except Exception as e:
+            logger.error(f"Error leaving worker ring: {e}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logger.error(f"⚠️ Worker heartbeat failed: {e}")
+
+    def get_stats(self) -> dict:
+        return {"identity": self.identity, "workers": self.members}
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import pickle
+import re
+import zlib
+from importlib.metadata import PackageNotFoundError, version
+from bidict import ValueDuplicationError
+from socketio.async_redis_manager import AsyncRedisManager, RedisError
+
+class ShardedAsyncRedisManager(AsyncRedisManager):
+    """
+    AsyncRedisManager that spreads pub/sub traffic over several Redis channels.
+
+    - named rooms (user:<id>, entity:<id>, match rooms) publish on
+      "<channel>:shard:<crc32(namespace, room) % shards>" and a worker only subscribes
+      to the shards of rooms it has members in
+    - sids carry the id of the worker that owns them, messages for a single socket go to
+      that worker's "<channel>:host:<tag>" channel or are handled locally without Redis
+    - broadcasts and multi-room emits stay on the base channel every worker listens to
+    """
+    name = 'aioredis-sharded'
+    SID_PATTERN = re.compile(r"^([0-9a-f]{8})\.")
+    # note: overrides private AsyncRedisManager methods, keep in step with requirements.txt
+    SUPPORTED_SOCKETIO_VERSION = "5.13.0"
+
+    @classmethod
+    def is_supported(cls) -> bool:
+        try:
+            installed = version("python-socketio")
+        except PackageNotFoundError:
+            return False
+        if installed != cls.SUPPORTED_SOCKETIO_VERSION:
+            logging.getLogger(__name__).warning(
+                f"⚠️ python-socketio {installed} is not {cls.SUPPORTED_SOCKETIO_VERSION}, using the stock AsyncRedisManager"
+            )
+            return False
+        return True
+
+    def __init__(self, url='redis://localhost:6379/0', channel='socketio', shards=16,
+                 write_only=False, logger=None, redis_options=None):
+        self.shards = max(1, int(shards))
+        self._shard_refs: dict[str, int] = {}
+        self._subscribed: set[str] = set()
+        self._listening = False
+        self._reconcile_lock = asyncio.Lock()
+        super().__init__(url=url, channel=channel, write_only=write_only,
+                         logger=logger, redis_options=redis_options)
+        self.host_tag = self.host_id[:8]
+
+    # -------------------------
+    # Channel routing
+    # -------------------------
+    def _host_channel(self, host_tag: str) -> str:
+        return f"{self.channel}:host:{host_tag}"
+
+    def _shard_channel(self, namespace: str, room: str) -> str:
+        shard = zlib.crc32(f"{namespace or '/'}|{room}".encode()) % self.shards
+        return f"{self.channel}:shard:{shard}"
+
+    def _is_named_room(self, room) -> bool:
+        return isinstance(room, str) and not self.SID_PATTERN.match(room)
+
+    def _channel_for(self, namespace: str, room) -> str:
+        if room is None or not isinstance(room, str):
+            return self.channel
+        match = self.SID_PATTERN.match(room)
+        if match:
+            return self._host_channel(match.group(1))
+        return self._shard_channel(namespace, room)
+
+    def _channel_for_message(self, message: dict) -> str:
+        method = message.get('method')
+        if method == 'callback':
+            return self._host_channel(message['host_id'][:8])
+        if method in ('disconnect', 'enter_room', 'leave_room'):
+            return self._channel_for(message.get('namespace'), message.get('sid'))
+        return self._channel_for(message.get('namespace'), message.get('room'))
+
+    async def _publish(self, data):
+        retry = True
+        channel = self._channel_for_message(data)
+        while True:
+            try:
+                if not retry:
+                    self._redis_connect()
+                return await self.redis.publish(channel, pickle.dumps(data))
+            except RedisError:
+                if retry:
+                    self._get_logger().error('Cannot publish to redis... retrying')
+                    retry = False
+                else:
+                    self._get_logger().error('Cannot publish to redis... giving up')
+                    break
+
+    async def emit(self, event, data, namespace=None, room=None, skip_sid=None,
+                   callback=None, to=None, **kwargs):
+        room = to or room
+        # note: replies to a socket on this worker never need to leave the process
+        if isinstance(room, str) and self.is_connected(room, namespace or '/'):
+            kwargs['ignore_queue'] = True
+        return await super().emit(event, data, namespace=namespace, room=room,
+                                  skip_sid=skip_sid, callback=callback, **kwargs)
+
+    # -------------------------
+    # Host tagged sids
+    # -------------------------
+    async def connect(self, eio_sid, namespace):
+        sid = f"{self.host_tag}.{self.server.eio.generate_id()}"
+        try:
+            self.basic_enter_room(sid, namespace, None, eio_sid=eio_sid)
+        except ValueDuplicationError:
+            return None
+        self.basic_enter_room(sid, namespace, sid, eio_sid=eio_sid)
+        return sid
+
+    # -------------------------
+    # Shard subscriptions
+    # -------------------------
+    def basic_enter_room(self, sid, namespace, room, eio_sid=None):
+        is_new = self._is_named_room(room) and room not in self.rooms.get(namespace, {})
+        super().basic_enter_room(sid, namespace, room, eio_sid=eio_sid)
+        if is_new:
+            channel = self._shard_channel(namespace, room)
+            self._shard_refs[channel] = self._shard_refs.get(channel, 0) + 1
+            self._schedule_reconcile()
+
+    def basic_leave_room(self, sid, namespace, room):
+        existed = self._is_named_room(room) and room in self.rooms.get(namespace, {})
+        super().basic_leave_room(sid, namespace, room)
+        if existed and room not in self.rooms.get(namespace, {}):
+            channel = self._shard_channel(namespace, room)
+            self._shard_refs[channel] -= 1
+            if self._shard_refs[channel] <= 0:
+                del self._shard_refs[channel]
+            self._schedule_reconcile()
+
+    async def enter_room(self, sid, namespace, room, eio_sid=None):
+        result = await super().enter_room(sid, namespace, room, eio_sid=eio_sid)
+        # note: wait for the shard subscription so emits right after a join are not missed
+        await self._reconcile()
+        return result
+
+    def _wanted_channels(self) -> set[str]:
+        return {self.channel, self._host_channel(self.host_tag), *self._shard_refs}
+
+    def _schedule_reconcile(self):
+        if not self._listening:
+            return
+        try:
+            asyncio.get_running_loop().create_task(self._reconcile())
+        except RuntimeError:
+            pass
+
+    async def _reconcile(self):
+        if not self._listening:
+            return
+        async with self._reconcile_lock:
+            wanted = self._wanted_channels()
+            subscribe = wanted - self._subscribed
+            unsubscribe = self._subscribed - wanted
+            if subscribe:
+                await self.pubsub.subscribe(*subscribe)
+            if unsubscribe:
+                await self.pubsub.unsubscribe(*unsubscribe)
+            self._subscribed = wanted
+
+    async def _redis_listen_with_retries(self):
+        retry_sleep = 1
+        connect = False
+        while True:
+            try:
+                if connect:
+                    self._redis_connect()
+                    self._subscribed = set()
+                    await self._reconcile()
+                    retry_sleep = 1
+                async for message in self.pubsub.listen():
+                    yield message
+            except RedisError:
+                self._get_logger().error('Cannot receive from redis... retrying in '
+                                         '{} secs'.format(retry_sleep))
+                connect = True
+                await asyncio.sleep(retry_sleep)
+                retry_sleep = min(retry_sleep * 2, 60)
+
+    async def _listen(self):
+        self._listening = True
+        await self._reconcile()
+        async for message in self._redis_listen_with_retries():
+            channel = message.get('channel')
+            if isinstance(channel, bytes):
+                channel = channel.decode('utf-8')
+            if channel in self._subscribed and message['type'] == 'message' and 'data' in message:
+                yield message['data']
+
+    def get_shard_stats(self) -> dict:
+        return {
+            "shards": self.shards,
+            "host_tag": self.host_tag,
+            "subscribed_channels": sorted(self._subscribed),
+        }
@@ -3,13 +3,14 @@ import traceback
 from urllib.parse import parse_qs
 import socketio
 from socketio.async_redis_manager import AsyncRedisManager
+from src.services.sharded_redis_manager import ShardedAsyncRedisManager
 
 class SocketIOService:
-    def __init__(self, redis_url: str = None):
+    def __init__(self, redis_url: str = None, shards: int = 0):
         self.sio = socketio.AsyncServer(
             async_mode="asgi",
             cors_allowed_origins="*",
-            client_manager=AsyncRedisManager(redis_url) if redis_url else None,
+            client_manager=self._create_client_manager(redis_url, shards),
         )
         self.app = socketio.ASGIApp(self.sio, static_files={})
         self.message_service = None
@@ -17,8 +18,25 @@ class SocketIOService:
         self.live_match_namespace = None
         self.notification_service = None
         self.notification_event = None
+        self.presence_service = None
         self.register_handlers()
 
+    @staticmethod
+    def _create_client_manager(redis_url: str = None, shards: int = 0):
+        if not redis_url:
+            return None
+        # note: every worker must run with the same shard count
+        if shards and shards > 1 and ShardedAsyncRedisManager.is_supported():
+            return ShardedAsyncRedisManager(redis_url, shards=shards)
+        return AsyncRedisManager(redis_url)
+
+    # Lazy load UserPresenceService, it imports src.extensions which builds this service
+    def _get_presence_service(self):
+        if self.presence_service is None:
+            from src.services.user_presence_service import UserPresenceService
+            self.presence_service = UserPresenceService()
+        return self.presence_service
+
     # Lazy load MessageService
     def _get_message_service(self):
         if self.message_service is None:
@@ -81,11 +99,13 @@ class SocketIOService:
                 user_id = auth["user_id"]
 
             if user_id:
+                # note: no presence yet, the socket counts as online once it joins a delivery room
                 await sio.save_session(sid, {"user_id": user_id})
 
         @sio.event
         async def disconnect(sid):
             print(f"Socket disconnected: {sid}")
+            await self._get_presence_service().disconnect(sid)
 
         @sio.on("ping")
         async def on_ping(sid, data):
@@ -112,6 +132,8 @@ class SocketIOService:
                 session = await sio.get_session(sid)
                 session["user_id"] = user_id
                 await sio.save_session(sid, session)
+                presence = self._get_presence_service()
+                await presence.join(sid, presence.CHAT_ROOM, user_id)
 
             if entity_id:
                 room = f"entity:{entity_id}"
@@ -125,6 +147,9 @@ class SocketIOService:
             if user_id:
                 room = f"user:{user_id}"
                 await sio.leave_room(sid, room)
+                # note: only chat presence ends, the socket may still be in notify:<user_id>
+                presence = self._get_presence_service()
+                await presence.leave(sid, presence.CHAT_ROOM, user_id)
 
             if entity_id:
                 room = f"entity:{entity_id}"
@@ -139,3 +164,5 @@ class SocketIOService:
                 session = await sio.get_session(sid)
                 session["user_id"] = user_id
                 await sio.save_session(sid, session)
+                presence = self._get_presence_service()
+                await presence.join(sid, presence.CHAT_ROOM, user_id)
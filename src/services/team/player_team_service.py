@@ -1,15 +1,24 @@
 from sqlalchemy import select, and_, update
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy.orm import joinedload
-from src.services.notification_service import NotificationService
+from src.services.notification_service import publish_notifications, route_notifications
+from src.services.fcm_topic_service import FcmTopicService
+from src.utils.notification_utils import ROSTER_STATUSES
 from src.models.team import TeamModel
 from src.utils.api_response import ApiException
 from src.models.player import PlayerModel, PlayerTeamModel
 from src.extensions import AsyncSession
 
-notif_service = NotificationService()
-
 class PlayerTeamService:
+    def __init__(self):
+        self.topic_service = FcmTopicService()
+
+    async def _roster_tokens(self, session, team_id: str, player_team_ids: list[str]) -> list[str]:
+        # note: only read when topic maintenance will use them
+        if not self.topic_service.enabled:
+            return []
+        return await self.topic_service.roster_tokens(session, team_id, player_team_ids, include_owner=False)
+
     async def add_player_to_team(self, user_id: str, data: dict):
         async with AsyncSession() as session:
             try:
@@ -46,16 +55,24 @@ class PlayerTeamService:
                     is_accepted=status
                 )
                 session.add(new_player_team)
+                await session.flush()
 
-                await session.commit()
-
+                notifications, online = [], set()
                 if status == "Invited":
-                    await self._send_team_invite_notification(
+                    notifications, online = await self._send_team_invite_notification(
+                        session,
                         to_user_id=player.user.user_id,
                         player_team_id=new_player_team.player_team_id,
                         team_name=team.team_name,
                         status=status
                     )
+
+                await session.commit()
+                await publish_notifications(notifications, online)
+                if status in ROSTER_STATUSES:
+                    self.topic_service.sync_team(team.team_id, joined=[new_player_team.player_team_id])
+
+                if status == "Invited":
                     return f"{player.full_name} invited to {team.team_name} successfully."
 
                 return "Success"
@@ -64,10 +81,11 @@ class PlayerTeamService:
                 await session.rollback()
                 raise e
 
-    async def _send_team_invite_notification(self, to_user_id: str, player_team_id: str, team_name: str, status: str):
+    async def _send_team_invite_notification(self, session, to_user_id: str, player_team_id: str, team_name: str, status: str):
+        # note: inbox row and push are written in the invite's transaction, publish the
+        # returned row once it commits
         friendly_message = f"You have been invited to join {team_name}."
-
-        await notif_service.create_notification({
+        payload = {
             "to_id": to_user_id,
             "message": friendly_message,
             "title": f"Team Invite: {team_name}",
@@ -75,7 +93,11 @@ class PlayerTeamService:
             "action_payload": {
                 "player_team_id": player_team_id,
             },
-        })
+            "data": {"player_team_id": player_team_id},
+            "dedupe_key": f"team_invite:{player_team_id}",
+        }
+        notifications, online, _ = await route_notifications(session, [payload], enable=True)
+        return notifications, online
     
     async def get_player_team(self, session, player_team_id) -> PlayerTeamModel:
         return await session.get(PlayerTeamModel, player_team_id)
@@ -94,6 +116,7 @@ class PlayerTeamService:
                 session.add_all(new_player_teams)
 
                 await session.commit()
+                self.topic_service.sync_team(data.get('team_id'), joined=[pt.player_team_id for pt in new_player_teams])
 
                 return f"Total added players: {len(new_player_teams)}"
             except (IntegrityError, SQLAlchemyError) as e:
@@ -126,6 +149,12 @@ class PlayerTeamService:
                 session.add_all(new_player_teams)
                 await session.commit()
 
+                joined_by_team = {}
+                for pt in new_player_teams:
+                    joined_by_team.setdefault(pt.team_id, []).append(pt.player_team_id)
+                for team_id, joined in joined_by_team.items():
+                    self.topic_service.sync_team(team_id, joined=joined)
+
                 return f"Total added players: {len(new_player_teams)}"
 
             except (IntegrityError, SQLAlchemyError):
@@ -140,8 +169,18 @@ class PlayerTeamService:
                 if not player_team:
                     raise ApiException("No Player found")
                 
+                was_on_roster = player_team.is_accepted in ROSTER_STATUSES
                 player_team.copy_with(**data)
                 await session.commit()
+
+                is_on_roster = player_team.is_accepted in ROSTER_STATUSES
+                if is_on_roster and not was_on_roster:
+                    self.topic_service.sync_team(player_team.team_id, joined=[player_team_id])
+                elif was_on_roster and not is_on_roster:
+                    self.topic_service.sync_team(
+                        player_team.team_id,
+                        left_tokens=await self._roster_tokens(session, player_team.team_id, [player_team_id]),
+                    )
                 
                 return "Player updated successfully"
         except (IntegrityError, SQLAlchemyError) as e:
@@ -218,7 +257,9 @@ class PlayerTeamService:
             if not player_team:
                 raise ApiException("Player not found in this team", 404)
 
+            left_tokens = await self._roster_tokens(session, player_team.team_id, [player_team_id])
             await session.delete(player_team)
             await session.commit()
+            self.topic_service.sync_team(player_team.team_id, left_tokens=left_tokens)
             
             return "Player successfully removed from team"
\ No newline at end of file
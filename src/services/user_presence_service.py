@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from src.extensions import settings, redis_client
+
+logger = logging.getLogger(__name__)
+
+class UserPresenceService:
+    """
+    Which users can be reached over a live socket, per delivery room, across every worker.
+
+    - one sorted set per delivery room, "presence:user:<user_id>" for chat and
+      "presence:notify:<user_id>" for notifications, members are sids scored by the time their
+      entry expires, so a user with a phone and a browser open has two members
+    - a socket counts only for the rooms it joined, a chat-only socket does not stop a
+      notification push and the other way round
+    - each worker re-extends the entries of its own sockets every ttl / 3 seconds, sockets of a
+      worker that died without a disconnect fall out once their score passes
+    """
+    CHAT_ROOM = "user"
+    NOTIFY_ROOM = "notify"
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(UserPresenceService, cls).__new__(cls)
+            cls._instance.ttl = settings.get("user_presence_ttl_seconds", 60)
+            cls._instance._local = {}
+            cls._instance._refresh_task = None
+        return cls._instance
+
+    @staticmethod
+    def room(room_type: str, user_id: str) -> str:
+        return f"{room_type}:{user_id}"
+
+    @staticmethod
+    def _key(room: str) -> str:
+        return f"presence:{room}"
+
+    async def join(self, sid: str, room_type: str, user_id: str):
+        room = self.room(room_type, user_id)
+        rooms = self._local.setdefault(sid, set())
+        if room in rooms:
+            return
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zadd(self._key(room), {sid: time.time() + self.ttl})
+                pipe.expire(self._key(room), self.ttl)
+                await pipe.execute()
+            rooms.add(room)
+            self._ensure_refreshing()
+        except Exception as e:
+            logger.error(f"❌ Failed to register presence in {room}: {e}")
+
+    async def leave(self, sid: str, room_type: str, user_id: str):
+        room = self.room(room_type, user_id)
+        rooms = self._local.get(sid)
+        if not rooms or room not in rooms:
+            return
+        rooms.discard(room)
+        if not rooms:
+            self._local.pop(sid, None)
+        try:
+            await redis_client.zrem(self._key(room), sid)
+        except Exception as e:
+            logger.error(f"❌ Failed to clear presence in {room}: {e}")
+
+    async def disconnect(self, sid: str):
+        rooms = self._local.pop(sid, None)
+        if not rooms:
+            return
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for room in rooms:
+                    pipe.zrem(self._key(room), sid)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ Failed to clear presence for {sid}: {e}")
+
+    async def online_users(self, user_ids, room_type: str) -> set[str]:
+        """
+        The users with at least one live socket in their room_type room, the room the event is
+        emitted to.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return set()
+        try:
+            now = time.time()
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.zcount(self._key(self.room(room_type, user_id)), now, "+inf")
+                counts = await pipe.execute()
+            return {user_id for user_id, count in zip(user_ids, counts) if count}
+        except Exception as e:
+            # note: unknown presence falls back to push delivery
+            logger.error(f"❌ Failed to read presence: {e}")
+            return set()
+
+    async def is_online(self, user_id: str, room_type: str) -> bool:
+        return user_id in await self.online_users([user_id], room_type)
+
+    def _ensure_refreshing(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self):
+        while self._local:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                expires_at = time.time() + self.ttl
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    for sid, rooms in list(self._local.items()):
+                        for room in list(rooms):
+                            key = self._key(room)
+                            pipe.zadd(key, {sid: expires_at})
+                            pipe.zremrangebyscore(key, "-inf", time.time())
+                            pipe.expire(key, self.ttl)
+                    await pipe.execute()
+            except Exception as e:
+                logger.error(f"⚠️ Presence refresh failed: {e}")
@@ -0,0 +1,81 @@
+import json
+from typing import Any
+import orjson
+import ormsgpack
+import zstandard
+
+class JsonCodec:
+    name = "json"
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def decode(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+class OrjsonCodec:
+    name = "orjson"
+
+    def encode(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def decode(self, data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+class MsgpackCodec:
+    name = "msgpack"
+
+    def encode(self, obj: Any) -> bytes:
+        return ormsgpack.packb(obj)
+
+    def decode(self, data: bytes) -> Any:
+        return ormsgpack.unpackb(data)
+
+class StorageCodec:
+    """
+    Self-describing codec for values kept in Redis: a one byte tag followed by the payload.
+    Values written before the codec existed are plain JSON and are still readable.
+    """
+    MSGPACK = b"M"
+    MSGPACK_ZSTD = b"Z"
+    ORJSON = b"J"
+
+    def __init__(self, name: str = "msgpack", compress_threshold: int | None = 4096, level: int = 3):
+        self.name = name
+        self.compress_threshold = compress_threshold
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def encode(self, obj: Any) -> bytes:
+        if self.name == "json":
+            return json.dumps(obj).encode("utf-8")
+        if self.name == "orjson":
+            return self.ORJSON + orjson.dumps(obj)
+
+        payload = ormsgpack.packb(obj)
+        if self.compress_threshold is not None and len(payload) > self.compress_threshold:
+            return self.MSGPACK_ZSTD + self._compressor.compress(payload)
+        return self.MSGPACK + payload
+
+    def decode(self, data: bytes | str | None) -> Any:
+        if data is None:
+            return None
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        tag, payload = data[:1], data[1:]
+        if tag == self.MSGPACK:
+            return ormsgpack.unpackb(payload)
+        if tag == self.MSGPACK_ZSTD:
+            return ormsgpack.unpackb(self._decompressor.decompress(payload))
+        if tag == self.ORJSON:
+            return orjson.loads(payload)
+        return json.loads(data)
+
+WIRE_CODECS = {
+    "json": None,  # note: plain dicts, serialized by Socket.IO itself
+    "msgpack": MsgpackCodec(),
+}
+
+def get_wire_codec(name: str | None):
+    return WIRE_CODECS.get(name or "json")
@@ -1,3 +1,5 @@
+import base64
+import binascii
 from datetime import datetime, timezone
 import uuid
 from sqlalchemy import String, DateTime
@@ -34,5 +36,30 @@ def PublicIDGenerator(prefix: str) -> Mapped[str]:
         default=lambda: f"{prefix}-{uuid.uuid4().hex[:6]}"
     )
 
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    from src.utils.api_response import ApiException
+
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ApiException("Invalid cursor")
+
+def encode_xid_cursor(xid: int, row_id: str) -> str:
+    return base64.urlsafe_b64encode(f"x{xid}|{row_id}".encode()).decode()
+
+def decode_xid_cursor(cursor: str) -> tuple[int, str] | None:
+    # note: None for anything else, including the timestamp cursors handed out before
+    try:
+        xid, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        if not xid.startswith("x"):
+            return None
+        return int(xid[1:]), row_id
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+
 def str_to_bool(value: str) -> bool:
     return value.lower() in ("true", "1", "yes", "on")
\ No newline at end of file
@@ -0,0 +1,71 @@
+from copy import deepcopy
+from typing import Any
+
+# note: JSON Merge Patch (RFC 7386) helpers used by the live scorebook event log.
+# A patch is a dict whose keys overwrite the target, nested dicts merge recursively
+# and a None value removes the key. A state therefore cannot hold None as a dict value,
+# the key would vanish for delta viewers, find_null_path finds such values so they can be rejected.
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    if not isinstance(patch, dict):
+        return deepcopy(patch)
+
+    result = deepcopy(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        elif isinstance(value, dict):
+            result[key] = apply_merge_patch(result.get(key), value)
+        else:
+            result[key] = deepcopy(value)
+    return result
+
+def find_null_path(value: Any, path: str = "") -> str | None:
+    # note: lists are replaced whole by a patch, only dict values need checking
+    if not isinstance(value, dict):
+        return None
+    for key, item in value.items():
+        item_path = f"{path}.{key}" if path else str(key)
+        if item is None:
+            return item_path
+        found = find_null_path(item, item_path)
+        if found:
+            return found
+    return None
+
+def create_merge_patch(source: Any, target: Any) -> Any:
+    if not isinstance(source, dict) or not isinstance(target, dict):
+        return deepcopy(target)
+
+    patch = {}
+    for key in source.keys() - target.keys():
+        patch[key] = None
+
+    for key, value in target.items():
+        if key not in source:
+            patch[key] = deepcopy(value)
+        elif source[key] != value:
+            if isinstance(source[key], dict) and isinstance(value, dict):
+                patch[key] = create_merge_patch(source[key], value)
+            else:
+                patch[key] = deepcopy(value)
+    return patch
+
+class MergePatchConflict(ValueError):
+    pass
+
+def compose_merge_patches(first: dict, second: dict) -> dict:
+    """
+    One patch that applies like first then second. Raises MergePatchConflict when first
+    removes or replaces a key with a non-dict and second rebuilds it as a dict, merge patch
+    cannot say "replace with exactly this dict" so the caller has to send the full state.
+    """
+    result = deepcopy(first)
+    for key, value in second.items():
+        if isinstance(value, dict) and key in result and not isinstance(result[key], dict):
+            raise MergePatchConflict(key)
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = compose_merge_patches(result[key], value)
+        else:
+            result[key] = deepcopy(value)
+    return result
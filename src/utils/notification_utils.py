@@ -1,21 +1,56 @@
 from typing import Dict, List, Optional
 from dataclasses import dataclass
-from sqlalchemy import select
+from sqlalchemy import select, union
 from src.models.player import LeaguePlayerModel, PlayerModel, PlayerTeamModel
 from src.models.match import LeagueMatchModel
 from src.models.team import LeagueTeamModel, TeamModel
+from src.models.user import UserModel
 from sqlalchemy.orm import joinedload
+from src.services.fcm_token_service import FcmTokenService
 
 @dataclass(frozen=True, slots=True)
 class FCMUser:
     user_id: str
-    fcm_token: str
+    # note: None when the user has no token or it is not healthy, they still get the inbox row
+    fcm_token: Optional[str]
 
 @dataclass(frozen=True, slots=True)
 class MatchFCMRecipients:
     home: List[FCMUser]
     away: List[FCMUser]
 
+ROSTER_STATUSES = ("Accepted", "Guest")
+
+def team_roster_stmt(team_id: str, player_team_ids: Optional[List[str]] = None, include_owner: bool = True):
+    """
+    Flat select of (user_id, fcm_token) for the team owner and its roster, the audience of the
+    "team-<team_id>" topic. With player_team_ids only those players are selected, whatever
+    their status.
+    """
+    players = (
+        select(UserModel.user_id, UserModel.fcm_token)
+        .join(PlayerModel, PlayerModel.user_id == UserModel.user_id)
+        .join(PlayerTeamModel, PlayerTeamModel.player_id == PlayerModel.player_id)
+        .where(PlayerTeamModel.team_id == team_id)
+    )
+    if player_team_ids is None:
+        players = players.where(PlayerTeamModel.is_accepted.in_(ROSTER_STATUSES))
+    else:
+        players = players.where(PlayerTeamModel.player_team_id.in_(player_team_ids))
+    if not include_owner:
+        return players
+
+    owner = (
+        select(UserModel.user_id, UserModel.fcm_token)
+        .join(TeamModel, TeamModel.user_id == UserModel.user_id)
+        .where(TeamModel.team_id == team_id)
+    )
+    return union(players, owner)
+
+async def get_team_recipient_ids(session, team_id: str) -> List[str]:
+    result = await session.execute(team_roster_stmt(team_id))
+    return [row.user_id for row in result.all()]
+
 async def get_valid_fcm_for_match(
     session,
     league_match_id: str,
@@ -49,6 +84,7 @@ async def get_valid_fcm_for_match(
     if not match:
         return MatchFCMRecipients(home=[], away=[])
 
+    token_service = FcmTokenService()
     home_candidates = []
     away_candidates = []
     seen = set()
@@ -56,12 +92,9 @@ async def get_valid_fcm_for_match(
     def collect(user, target_list):
         if not user or not user.user_id or user.user_id in seen:
             return
-        if not user.fcm_token or not user.fcm_token.strip():
-            return
-        if user.user_id in seen:
-            return
         seen.add(user.user_id)
-        target_list.append(FCMUser(user_id=user.user_id, fcm_token=user.fcm_token.strip()))
+        fcm_token = user.fcm_token.strip() if token_service.is_healthy(user) else None
+        target_list.append(FCMUser(user_id=user.user_id, fcm_token=fcm_token))
 
     for league_team, target in [
         (match.home_team, home_candidates),
@@ -94,4 +127,58 @@ async def get_valid_fcm_for_match(
             away_users.append(away_candidates[j])
             j += 1
 
-    return MatchFCMRecipients(home=home_users, away=away_users)
\ No newline at end of file
+    return MatchFCMRecipients(home=home_users, away=away_users)
+
+async def notify_match_teams(
+    session,
+    match: LeagueMatchModel,
+    title: str,
+    message_for,
+    dedupe_key: str,
+    limit: Optional[int] = None
+):
+    """
+    Sends each side of a match its own notification, message_for(team_name, opponent_name)
+    builds the text. With fcm_topic_broadcasts on, each side is one "team-<team_id>" topic push
+    plus one inbox insert for the roster. A topic push goes to every subscribed token: it ignores
+    limit and does not skip online recipients, who get the socket event and the push. Otherwise
+    it is one inbox row per recipient and one push per healthy token of an offline recipient,
+    honouring limit.
+    match needs home_team.team and away_team.team loaded.
+    """
+    from src.extensions import settings
+    from src.services.fcm_topic_service import FcmTopicService
+    from src.services.notification_service import broadcast_notification, fanout_notifications
+
+    sides = (
+        (match.home_team, match.home_team.team.team_name, match.away_team.team.team_name),
+        (match.away_team, match.away_team.team.team_name, match.home_team.team.team_name),
+    )
+
+    if settings.get("fcm_topic_broadcasts", False):
+        for league_team, team_name, opponent_name in sides:
+            await broadcast_notification(
+                FcmTopicService.team_topic(league_team.team_id),
+                await get_team_recipient_ids(session, league_team.team_id),
+                {
+                    "title": title,
+                    "message": message_for(team_name, opponent_name),
+                    "dedupe_key": f"{dedupe_key}:{league_team.team_id}",
+                },
+                enable=True,
+            )
+        return
+
+    recipients = await get_valid_fcm_for_match(session, match.league_match_id, limit=limit)
+    payloads = [
+        {
+            "title": title,
+            "message": message_for(team_name, opponent_name),
+            "to_id": recipient.user_id,
+            "dedupe_key": f"{dedupe_key}:{recipient.user_id}",
+            "push": recipient.fcm_token is not None,
+        }
+        for team_recipients, (_, team_name, opponent_name) in zip((recipients.home, recipients.away), sides)
+        for recipient in team_recipients
+    ]
+    await fanout_notifications(payloads, enable=True)
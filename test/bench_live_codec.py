@@ -0,0 +1,109 @@
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.codec import JsonCodec, MsgpackCodec, OrjsonCodec, StorageCodec
+from src.utils.merge_patch import create_merge_patch
+
+# note: encode/decode cost and size of live scorebook payloads per codec
+# usage: python test/bench_live_codec.py [iterations]
+
+STATS = ["pts", "fgm", "fga", "3pm", "3pa", "ftm", "fta", "reb", "ast", "stl", "blk", "tov", "pf"]
+
+def make_player(i: int) -> dict:
+    return {
+        "player_team_id": f"player-team-{i:04d}",
+        "full_name": f"Player Number {i}",
+        "jersey_number": i,
+        "is_starting": i % 5 == 0,
+        "is_on_court": i % 2 == 0,
+        "stats": {stat: random.randint(0, 20) for stat in STATS},
+    }
+
+def make_state(players_per_team: int = 12, plays: int = 60) -> dict:
+    return {
+        "league_match_id": "league-match-0001",
+        "period": 3,
+        "clock": {"running": True, "remaining_ms": 412000},
+        "home": {
+            "team_name": "Bogo City Ballers",
+            "score": 74,
+            "fouls": 4,
+            "timeouts": 2,
+            "players": [make_player(i) for i in range(players_per_team)],
+        },
+        "away": {
+            "team_name": "San Remigio Hawks",
+            "score": 69,
+            "fouls": 5,
+            "timeouts": 1,
+            "players": [make_player(i + 100) for i in range(players_per_team)],
+        },
+        "play_by_play": [
+            {"period": 1 + n // 20, "clock_ms": 600000 - n * 9000, "side": "home" if n % 2 else "away",
+             "player_team_id": f"player-team-{n % 12:04d}", "action": random.choice(STATS)}
+            for n in range(plays)
+        ],
+    }
+
+def make_delta(state: dict) -> dict:
+    newer = json.loads(json.dumps(state))
+    newer["home"]["score"] += 2
+    newer["home"]["players"][3]["stats"]["pts"] += 2
+    newer["clock"]["remaining_ms"] -= 1500
+    return {"room": "league-match-0001", "from_seq": 41, "seq": 42, "patch": create_merge_patch(state, newer)}
+
+def bench(codec, payload, iterations: int) -> dict:
+    encoded = codec.encode(payload)
+    assert codec.decode(encoded) == payload
+
+    def timed(fn):
+        runs = []
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                fn()
+            runs.append((time.perf_counter() - start) / iterations * 1e6)
+        return statistics.median(runs)
+
+    return {
+        "size": len(encoded),
+        "encode_us": timed(lambda: codec.encode(payload)),
+        "decode_us": timed(lambda: codec.decode(encoded)),
+    }
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    random.seed(7)
+    state = make_state()
+    payloads = {
+        "snapshot": {"seq": 42, "state": state},
+        "delta": make_delta(state),
+    }
+    codecs = {
+        "json": JsonCodec(),
+        "orjson": OrjsonCodec(),
+        "msgpack": MsgpackCodec(),
+        "msgpack+zstd": StorageCodec("msgpack", compress_threshold=0),
+        "storage (default)": StorageCodec("msgpack", compress_threshold=4096),
+    }
+
+    for label, payload in payloads.items():
+        baseline = None
+        print(f"\n{label} ({iterations} iterations)")
+        print(f"{'codec':<20}{'bytes':>10}{'ratio':>8}{'encode µs':>12}{'decode µs':>12}")
+        for name, codec in codecs.items():
+            result = bench(codec, payload, iterations)
+            baseline = baseline or result["size"]
+            print(
+                f"{name:<20}{result['size']:>10}{result['size'] / baseline:>8.2f}"
+                f"{result['encode_us']:>12.2f}{result['decode_us']:>12.2f}"
+            )
+
+if __name__ == "__main__":
+    main()
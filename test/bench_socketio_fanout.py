@@ -0,0 +1,107 @@
+import asyncio
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import socketio
+from socketio.async_redis_manager import AsyncRedisManager
+from src.services.sharded_redis_manager import ShardedAsyncRedisManager
+
+# note: multi-worker fan-out of user:<id> emits, plain AsyncRedisManager vs sharded channels.
+# Every worker is a separate process with its own manager, like hypercorn workers.
+# usage: REDIS_URL=redis://localhost:6379/15 python test/bench_socketio_fanout.py [emits] [users] [shards]
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/15")
+SHARDS = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+
+def make_manager(mode: str, write_only: bool = False):
+    channel = f"bench-{mode}"
+    if mode == "sharded":
+        return ShardedAsyncRedisManager(REDIS_URL, channel=channel, shards=SHARDS, write_only=write_only)
+    return AsyncRedisManager(REDIS_URL, channel=channel, write_only=write_only)
+
+async def run_worker(mode: str, index: int, workers: int, users: int, ready, results):
+    manager = make_manager(mode)
+    server = socketio.AsyncServer(async_mode="asgi", client_manager=manager)
+    delivered = 0
+    done = asyncio.Event()
+
+    async def send_eio_packet(eio_sid, pkt):
+        nonlocal delivered
+        delivered += 1
+        if "bench_done" in str(pkt.data):
+            done.set()
+
+    server._send_eio_packet = send_eio_packet
+    manager.initialize()
+
+    for user in range(index, users, workers):
+        sid = await manager.connect(f"eio-{index}-{user}", "/")
+        await manager.enter_room(sid, "/", f"user:{user}")
+
+    await asyncio.sleep(0.5)
+    ready.set()
+    cpu_start = time.process_time()
+    await done.wait()
+    results.put({"worker": index, "cpu": time.process_time() - cpu_start, "delivered": delivered})
+
+def worker_main(*args):
+    asyncio.run(run_worker(*args))
+
+async def run_publisher(mode: str, emits: int, users: int):
+    manager = make_manager(mode, write_only=True)
+    server = socketio.AsyncServer(async_mode="asgi", client_manager=manager)
+    manager.initialize()
+    payload = {"message": "x" * 200, "sender": "bench"}
+    for _ in range(emits):
+        await server.emit("new_message", payload, room=f"user:{random.randrange(users)}")
+    await asyncio.sleep(0.5)
+    await server.emit("bench_done", {})
+
+def bench(mode: str, workers: int, emits: int, users: int) -> dict:
+    ready_events = [mp.Event() for _ in range(workers)]
+    results = mp.Queue()
+    processes = [
+        mp.Process(target=worker_main, args=(mode, i, workers, users, ready_events[i], results))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for event in ready_events:
+        event.wait(30)
+
+    start = time.perf_counter()
+    asyncio.run(run_publisher(mode, emits, users))
+    rows = [results.get(timeout=60) for _ in processes]
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.join()
+
+    cpu = sum(row["cpu"] for row in rows)
+    return {
+        "cpu_ms": cpu * 1000,
+        "cpu_us_per_emit": cpu / emits * 1e6,
+        "delivered": sum(row["delivered"] for row in rows),
+        "elapsed_s": elapsed,
+    }
+
+def main():
+    emits = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    print(f"{emits} emits to {users} user rooms, {SHARDS} shards, redis {REDIS_URL}")
+    print(f"{'workers':>8}{'mode':>10}{'cpu ms':>10}{'µs/emit':>10}{'delivered':>11}{'wall s':>8}")
+    for workers in (1, 2, 4, 8):
+        for mode in ("plain", "sharded"):
+            result = bench(mode, workers, emits, users)
+            print(
+                f"{workers:>8}{mode:>10}{result['cpu_ms']:>10.0f}{result['cpu_us_per_emit']:>10.1f}"
+                f"{result['delivered']:>11}{result['elapsed_s']:>8.2f}"
+            )
+
+if __name__ == "__main__":
+    main()
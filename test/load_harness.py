@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import socketio
+
+# note: headless load harness for the real-time layer.
+# Starts the ASGI app from src.server.create_app under hypercorn (one or more server
+# processes sharing Redis), then drives scorers/viewers on /live and chat/notification
+# traffic on the default namespace from this process.
+#
+#   python test/load_harness.py --rooms 20 --viewers 50 --duration 30
+#   python test/load_harness.py --redis fake --no-db --servers 2
+#   python test/load_harness.py --chat-users <user_id>,<user_id> --notify
+#
+# --redis fake runs an in-process fakeredis TCP server, --no-db skips the database
+# startup hook (chat and notifications need real user ids and a database).
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_fake_redis() -> str:
+    from fakeredis import TcpFakeServer
+
+    port = free_port()
+    server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"redis://127.0.0.1:{port}/0"
+
+def run_server(port: int, redis_url: str, no_db: bool):
+    os.environ["REDIS_URL"] = redis_url
+
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config as HypercornConfig
+    from src.server import create_app
+
+    app = create_app()
+    if no_db:
+        app.other_asgi_app.before_serving_funcs.clear()
+        app.other_asgi_app.after_serving_funcs.clear()
+
+    config = HypercornConfig()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.loglevel = "WARNING"
+    asyncio.run(serve(app, config))
+
+def rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.counts: dict[str, int] = {}
+
+    def record(self, kind: str, sent_at: float | None):
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        if sent_at:
+            self.latencies.setdefault(kind, []).append((time.time() - sent_at) * 1000)
+
+    def report(self, duration: float):
+        print(f"\n{'stream':<16}{'messages':>10}{'msg/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for kind, count in sorted(self.counts.items()):
+            values = sorted(self.latencies.get(kind, [])) or [0.0]
+            p50 = statistics.median(values)
+            p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+            print(f"{kind:<16}{count:>10}{count / duration:>10.0f}{p50:>10.1f}{p99:>10.1f}")
+
+async def connect_client(url: str, auth: dict | None = None) -> socketio.AsyncClient:
+    client = socketio.AsyncClient(reconnection=False)
+    await client.connect(url, namespaces=["/", "/live"], transports=["websocket"], auth=auth)
+    return client
+
+async def run_viewer(url: str, room: str, recorder: Recorder, clients: list):
+    # note: without protocol 2 the namespace treats the viewer as legacy and sends no deltas
+    client = await connect_client(url, auth={"protocol": "2"})
+    clients.append(client)
+
+    @client.on("scorebook_delta", namespace="/live")
+    async def on_delta(frame):
+        recorder.record("live_delta", (frame.get("patch") or {}).get("bench_sent_at"))
+
+    await client.emit("join", {"room": room}, namespace="/live")
+    await client.emit("viewer_request_initial_state", {"room": room}, namespace="/live")
+
+async def run_scorer(url: str, room: str, rate: float, stop: asyncio.Event, clients: list):
+    client = await connect_client(url)
+    clients.append(client)
+    await client.emit("join", {"room": room}, namespace="/live")
+    score = 0
+    while not stop.is_set():
+        score += 1
+        await client.emit("scorebook_patch", {
+            "room": room,
+            "patch": {"home_total_score": score, "bench_sent_at": time.time()},
+        }, namespace="/live")
+        await asyncio.sleep(1 / rate)
+
+async def run_chat(url: str, sender_id: str, receiver_id: str, rate: float, notify: bool,
+                   recorder: Recorder, stop: asyncio.Event, clients: list):
+    sender = await connect_client(url)
+    receiver = await connect_client(url)
+    clients.extend([sender, receiver])
+
+    @receiver.on("new_message")
+    async def on_message(payload):
+        content = payload.get("content", "")
+        recorder.record("chat", float(content.split(":")[1]) if content.startswith("bench:") else None)
+
+    @receiver.on("new_notification")
+    async def on_notification(payload):
+        message = payload.get("message", "")
+        recorder.record("notification", float(message.split(":")[1]) if message.startswith("bench:") else None)
+
+    await receiver.emit("join_user_room", {"user_id": receiver_id})
+    await receiver.emit("join_notification_room", {"user_id": receiver_id})
+    await asyncio.sleep(0.5)
+
+    while not stop.is_set():
+        await sender.emit("send_message", {
+            "sender_id": sender_id,
+            "receiver_id": receiver_id,
+            "content": f"bench:{time.time()}",
+        })
+        if notify:
+            await sender.emit("send_notification", {
+                "to_id": receiver_id,
+                "title": "Load harness",
+                "message": f"bench:{time.time()}",
+            })
+        await asyncio.sleep(1 / rate)
+
+async def drive(args, urls: list[str], server_pids: list[int]):
+    recorder = Recorder()
+    stop = asyncio.Event()
+    clients: list[socketio.AsyncClient] = []
+    rss_before = sum(rss_kb(pid) for pid in server_pids)
+
+    # note: spread connections round-robin over the server processes
+    url_for = lambda i: urls[i % len(urls)]
+    connected = 0
+    for r in range(args.rooms):
+        room = f"bench-room-{r}"
+        for v in range(args.viewers):
+            await run_viewer(url_for(connected), room, recorder, clients)
+            connected += 1
+
+    tasks = []
+    for r in range(args.rooms):
+        for s in range(args.scorers):
+            tasks.append(asyncio.create_task(
+                run_scorer(url_for(connected), f"bench-room-{r}", args.rate, stop, clients)
+            ))
+            connected += 1
+
+    users = [u for u in (args.chat_users or "").split(",") if u]
+    for i in range(0, len(users) - 1, 2):
+        tasks.append(asyncio.create_task(
+            run_chat(url_for(i), users[i], users[i + 1], args.chat_rate, args.notify, recorder, stop, clients)
+        ))
+
+    await asyncio.sleep(2)
+    rss_after = sum(rss_kb(pid) for pid in server_pids)
+    print(f"connections: {len(clients)}  server rss: {rss_before / 1024:.1f} MiB -> {rss_after / 1024:.1f} MiB"
+          f"  (~{(rss_after - rss_before) / max(len(clients), 1):.1f} KiB per connection)")
+
+    recorder.counts.clear()
+    recorder.latencies.clear()
+    started = time.time()
+    await asyncio.sleep(args.duration)
+    stop.set()
+    duration = time.time() - started
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    recorder.report(duration)
+    await asyncio.gather(*(client.disconnect() for client in clients), return_exceptions=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Socket.IO fan-out load harness")
+    parser.add_argument("--redis", default=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                        help='Redis url, or "fake" for an in-process fakeredis server')
+    parser.add_argument("--servers", type=int, default=1, help="hypercorn server processes")
+    parser.add_argument("--rooms", type=int, default=10)
+    parser.add_argument("--scorers", type=int, default=1, help="scorers per room")
+    parser.add_argument("--viewers", type=int, default=20, help="viewers per room")
+    parser.add_argument("--rate", type=float, default=5, help="scorebook patches per second per scorer")
+    parser.add_argument("--chat-users", help="comma separated user ids, paired as sender,receiver")
+    parser.add_argument("--chat-rate", type=float, default=2)
+    parser.add_argument("--notify", action="store_true", help="also send notifications to the chat receivers")
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--no-db", action="store_true", help="skip the database startup check")
+    args = parser.parse_args()
+
+    redis_url = start_fake_redis() if args.redis == "fake" else args.redis
+
+    ports = [free_port() for _ in range(args.servers)]
+    servers = [mp.Process(target=run_server, args=(port, redis_url, args.no_db), daemon=True) for port in ports]
+    for server in servers:
+        server.start()
+
+    urls = [f"http://127.0.0.1:{port}" for port in ports]
+    for port in ports:
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                time.sleep(0.5)
+
+    try:
+        asyncio.run(drive(args, urls, [server.pid for server in servers]))
+    finally:
+        for server in servers:
+            server.terminate()
+
+if __name__ == "__main__":
+    main()
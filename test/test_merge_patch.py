@@ -0,0 +1,55 @@
+import pytest
+from src.utils.merge_patch import (
+    MergePatchConflict,
+    apply_merge_patch,
+    compose_merge_patches,
+    create_merge_patch,
+    find_null_path,
+)
+
+def apply_all(target, patches):
+    for patch in patches:
+        target = apply_merge_patch(target, patch)
+    return target
+
+@pytest.mark.parametrize("target, first, second", [
+    ({"a": 1, "b": 2}, {"a": 3}, {"b": None}),
+    ({"a": {"x": 1, "y": 2}}, {"a": {"x": None}}, {"a": {"z": 3}}),
+    ({"a": {"x": 1}}, {"a": {"x": 2}}, {"a": None}),
+    ({}, {"a": {"x": 1}}, {"a": {"y": {"z": 1}}}),
+    ({"a": [1, 2]}, {"a": [3]}, {"b": [4]}),
+    ({"a": {"x": {"y": 1}}}, {"a": {"x": {"y": 2}}}, {"a": {"x": {"y": None, "z": 1}}}),
+])
+def test_compose_matches_sequential_apply(target, first, second):
+    composed = compose_merge_patches(first, second)
+    assert apply_merge_patch(target, composed) == apply_all(target, [first, second])
+
+@pytest.mark.parametrize("first, second", [
+    ({"a": None}, {"a": {"x": 1}}),
+    ({"a": 5}, {"a": {"x": 1}}),
+    ({"a": {"b": None}}, {"a": {"b": {"x": 1}}}),
+])
+def test_compose_rejects_rebuilt_dicts(first, second):
+    with pytest.raises(MergePatchConflict):
+        compose_merge_patches(first, second)
+
+def test_rebuilt_dict_is_not_expressible_as_one_patch():
+    target = {"a": {"y": 2}}
+    assert apply_all(target, [{"a": None}, {"a": {"x": 1}}]) == {"a": {"x": 1}}
+
+def test_compose_does_not_mutate_inputs():
+    first = {"a": {"x": 1}}
+    second = {"a": {"y": 2}}
+    compose_merge_patches(first, second)
+    assert first == {"a": {"x": 1}} and second == {"a": {"y": 2}}
+
+def test_create_patch_round_trips():
+    source = {"a": 1, "b": {"x": 1, "y": 2}, "c": [1]}
+    target = {"a": 1, "b": {"x": 3}, "d": "new"}
+    assert apply_merge_patch(source, create_merge_patch(source, target)) == target
+
+def test_null_state_values_are_found():
+    assert find_null_path({"a": 1, "b": {"x": [None], "y": None}}) == "b.y"
+    assert find_null_path({"a": [None], "b": {"x": 1}}) is None
+    # note: the reason they are rejected, a null is lost once the state goes through a patch
+    assert apply_merge_patch({}, create_merge_patch({}, {"a": None})) == {}
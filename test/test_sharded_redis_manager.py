@@ -0,0 +1,73 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import fakeredis
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import socketio
+from socketio.async_redis_manager import AsyncRedisManager
+from src.services.sharded_redis_manager import ShardedAsyncRedisManager
+
+# note: two workers with their own manager on one Redis, like two hypercorn workers
+
+def make_manager(shards: int, server):
+    connection_class = getattr(fakeredis, "FakeAsyncRedisConnection", None) or fakeredis.aioredis.FakeConnection
+    options = {"connection_class": connection_class, "server": server}
+    if shards:
+        return ShardedAsyncRedisManager("redis://localhost", channel="test", shards=shards, redis_options=options)
+    return AsyncRedisManager("redis://localhost", channel="test", redis_options=options)
+
+def make_worker(shards: int, server):
+    manager = make_manager(shards, server)
+    sio = socketio.AsyncServer(async_mode="asgi", client_manager=manager)
+    received = []
+    arrived = asyncio.Event()
+
+    async def send_eio_packet(eio_sid, pkt):
+        # note: pkt.data is the encoded socket.io packet, "2" followed by [event, data]
+        received.append((eio_sid, json.loads(pkt.data[1:])))
+        arrived.set()
+
+    sio._send_eio_packet = send_eio_packet
+    manager.initialize()
+    return sio, manager, received, arrived
+
+async def wait_for(arrived: asyncio.Event):
+    await asyncio.wait_for(arrived.wait(), timeout=5)
+    arrived.clear()
+
+async def round_trip(shards: int):
+    server = fakeredis.FakeServer()
+    sio_a, manager_a, received_a, arrived_a = make_worker(shards, server)
+    sio_b, manager_b, received_b, arrived_b = make_worker(shards, server)
+    await asyncio.sleep(0.2)
+
+    sid = await manager_a.connect("eio-a", "/")
+    await manager_a.enter_room(sid, "/", "user:1")
+    await asyncio.sleep(0.2)
+
+    # note: a room emit from the other worker
+    await sio_b.emit("new_message", {"n": 1}, room="user:1")
+    await wait_for(arrived_a)
+    assert received_a[-1] == ("eio-a", ["new_message", {"n": 1}])
+
+    # note: an emit to the sid itself from the other worker
+    await sio_b.emit("direct", {"n": 2}, to=sid)
+    await wait_for(arrived_a)
+    assert received_a[-1] == ("eio-a", ["direct", {"n": 2}])
+
+    # note: a room the socket left no longer reaches it
+    await manager_a.leave_room(sid, "/", "user:1")
+    await asyncio.sleep(0.2)
+    await sio_b.emit("new_message", {"n": 3}, room="user:1")
+    await asyncio.sleep(0.3)
+    assert len(received_a) == 2
+    assert received_b == []
+
+@pytest.mark.parametrize("shards", [0, 4])
+def test_two_worker_round_trip(shards):
+    asyncio.run(round_trip(shards))